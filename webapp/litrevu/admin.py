@@ -1,7 +1,8 @@
 from django.contrib import admin
-from .models import Ticket, Review, UserFollows
+from .models import Ticket, Review, UserFollows, ImageJob
 
 # Enregistrement simple
 admin.site.register(Ticket)
 admin.site.register(Review)
 admin.site.register(UserFollows)
+admin.site.register(ImageJob)
@@ -0,0 +1,92 @@
+import hashlib
+from . import feed_cache
+
+# Version du format des réponses JSON, incluse dans l'ETag
+API_VERSION = 1
+
+
+def feed_etag(user, raw_cursor):
+    """
+    Calcule l'ETag d'une page du flux JSON sans interroger la base.
+
+    L'ETag dérive de la version du cache de flux de l'utilisateur, changée par
+    les signaux de litrevu/signals.py à chaque publication, modification ou
+    suppression visible dans son flux et à chaque changement d'abonnement.
+
+    Args:
+        user (User): Propriétaire du flux
+        raw_cursor (str): Curseur de la page demandée, tel que reçu
+
+    Returns:
+        str: L'ETag de la page
+    """
+    key = f'{API_VERSION}|{user.id}|{feed_cache.get_version(user.id)}|{raw_cursor or ""}'
+    return hashlib.sha1(key.encode()).hexdigest()
+
+
+def _user(user):
+    return {'id': user.id, 'username': user.username}
+
+
+def serialize_ticket(ticket):
+    """
+    Convertit un ticket en dictionnaire sérialisable en JSON.
+
+    Args:
+        ticket (Ticket): Ticket chargé avec son auteur
+
+    Returns:
+        dict: Le ticket, avec ses statistiques de critiques
+    """
+    data = {
+        'type': 'TICKET',
+        'id': ticket.id,
+        'title': ticket.title,
+        'description': ticket.description,
+        'image': ticket.image.url if ticket.image else None,
+        'user': _user(ticket.user),
+        'time_created': ticket.time_created.isoformat(),
+        'review_count': ticket.review_count,
+        'average_rating': ticket.average_rating,
+    }
+    if hasattr(ticket, 'has_review_from_user'):
+        data['has_review_from_user'] = ticket.has_review_from_user
+    return data
+
+
+def serialize_review(review):
+    """
+    Convertit une critique en dictionnaire sérialisable en JSON.
+
+    Args:
+        review (Review): Critique chargée avec son auteur, son ticket et l'auteur du ticket
+
+    Returns:
+        dict: La critique, avec le ticket critiqué
+    """
+    return {
+        'type': 'REVIEW',
+        'id': review.id,
+        'headline': review.headline,
+        'body': review.body,
+        'rating': review.rating,
+        'user': _user(review.user),
+        'time_created': review.time_created.isoformat(),
+        'ticket': serialize_ticket(review.ticket),
+    }
+
+
+def serialize_posts(posts):
+    """
+    Convertit une page de posts (voir feed.load_page) en liste sérialisable en JSON.
+
+    Args:
+        posts (list): Tickets et critiques portant l'attribut content_type
+
+    Returns:
+        list: Les posts convertis, dans le même ordre
+    """
+    return [
+        serialize_review(post) if post.content_type == 'REVIEW' else serialize_ticket(post)
+        for post in posts
+    ]
@@ -4,3 +4,14 @@ from django.apps import AppConfig
 class LitrevuConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'litrevu'
+
+    def ready(self):
+        from django.conf import settings
+        from django.db.backends.signals import connection_created
+        from .instrumentation import install_query_recorder
+        # Comptage des requêtes SQL pour ServerTimingMiddleware
+        if getattr(settings, 'SERVER_TIMING', True):
+            connection_created.connect(install_query_recorder)
+
+        # Enregistre les signaux d'invalidation du cache des flux
+        from . import signals  # noqa: F401
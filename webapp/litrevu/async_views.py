@@ -0,0 +1,137 @@
+import asyncio
+from asgiref.sync import sync_to_async
+from django.contrib.auth.decorators import login_required
+from django.shortcuts import render
+from .feed import (
+    flux_querysets, posts_querysets, afeed_keys, atimeline_keys, aload_page, decode_cursor, encode_cursor
+)
+from . import cards, feed_cache, follows, live, timeline
+from .routers import read_only
+from .views import follow_username
+from .constants import MAX_RATING
+
+# Versions asynchrones des vues flux, posts et subscriptions de litrevu/views.py,
+# activées par le réglage ASYNC_VIEWS (webapp/urls_async.py). Sous ASGI, elles
+# s'exécutent dans la boucle d'événements au lieu d'occuper un thread du pool
+# pendant toute la requête. Les gabarits et le contexte sont ceux des vues synchrones.
+
+
+async def _current_user(request):
+    """
+    Charge l'utilisateur connecté sans bloquer la boucle d'événements.
+
+    request.user est remplacé par l'utilisateur chargé : le gabarit et les
+    processeurs de contexte y accèdent sans nouvelle requête synchrone.
+    """
+    user = await request.auser()
+    request.user = user
+    return user
+
+
+@read_only
+@login_required
+async def flux(request):
+    """
+    Version asynchrone de la vue flux.
+
+    Les tickets et les critiques de la page sont chargés en parallèle
+    (voir feed.aload_page).
+
+    Args:
+        request (HttpRequest): L'objet requête HTTP
+
+    Returns:
+        HttpResponse: Rendu d'une page du flux
+    """
+    user = await _current_user(request)
+    cursor = decode_cursor(request.GET.get('cursor'))
+
+    async def compute_keys():
+        if timeline.is_enabled():
+            return await atimeline_keys(user, cursor)
+        return await afeed_keys(*flux_querysets(user), cursor)
+
+    keys = await feed_cache.aget_or_compute(
+        user.id, 'flux', encode_cursor(*cursor) if cursor else '', compute_keys
+    )
+    posts, next_cursor = await aload_page(keys, viewer=user)
+    cards.attach(posts, user, 'flux')
+
+    return render(request, 'litrevu/flux.html', {
+        'posts': posts,
+        'next_cursor': next_cursor,
+        'live_events': live.is_available(request),
+        'MAX_RATING': MAX_RATING
+    })
+
+
+@read_only
+@login_required
+async def posts(request):
+    """
+    Version asynchrone de la vue posts.
+
+    Args:
+        request (HttpRequest): L'objet requête HTTP
+
+    Returns:
+        HttpResponse: Rendu de la page contenant les posts de l'utilisateur
+    """
+    user = await _current_user(request)
+    cursor = decode_cursor(request.GET.get('cursor'))
+    keys = await feed_cache.aget_or_compute(
+        user.id, 'posts', encode_cursor(*cursor) if cursor else '',
+        lambda: afeed_keys(*posts_querysets(user), cursor)
+    )
+    posts, next_cursor = await aload_page(keys)
+    cards.attach(posts, user, 'posts')
+
+    return render(request, 'litrevu/posts.html', {
+        'posts': posts,
+        'next_cursor': next_cursor,
+        'MAX_RATING': MAX_RATING
+    })
+
+
+@read_only
+@login_required
+async def subscriptions(request):
+    """
+    Version asynchrone de la vue subscriptions.
+
+    Les deux pages d'abonnements et les compteurs sont lus en parallèle.
+    L'abonnement (POST) reste synchrone : il écrit dans une transaction, que
+    l'ORM asynchrone ne prend pas en charge.
+
+    Args:
+        request (HttpRequest): L'objet requête HTTP
+
+    Returns:
+        HttpResponse: Rendu de la page des abonnements
+    """
+    user = await _current_user(request)
+    error_message = None
+    success_message = None
+
+    if request.method == 'POST':
+        error_message, success_message = await sync_to_async(follow_username)(user, request.POST.get('username'))
+
+    following_cursor = follows.decode_cursor(request.GET.get('following'))
+    followers_cursor = follows.decode_cursor(request.GET.get('followers'))
+    (followed_users, next_following), (followers, next_followers), counts = await asyncio.gather(
+        follows.afollowing_page(user, following_cursor),
+        follows.afollowers_page(user, followers_cursor),
+        follows.acounts_for(user),
+    )
+
+    return render(request, 'litrevu/subscriptions.html', {
+        'followed_users': followed_users,
+        'followers': followers,
+        'following_cursor': following_cursor,
+        'followers_cursor': followers_cursor,
+        'next_following': next_following,
+        'next_followers': next_followers,
+        'counts': counts,
+        'error_message': error_message,
+        'success_message': success_message
+    })
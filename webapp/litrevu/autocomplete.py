@@ -0,0 +1,165 @@
+import re
+import string
+import time
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.db.models.functions import Lower
+from .models import UserFollows
+from .constants import AUTOCOMPLETE_LIMIT, AUTOCOMPLETE_CACHE_TIMEOUT
+
+# Préfixe commun à toutes les clés de cache de l'autocomplétion
+KEY_PREFIX = 'litrevu:autocomplete'
+
+# Longueur maximale d'un nom d'utilisateur Django
+MAX_PREFIX_LENGTH = 150
+
+# Caractères autorisés dans un nom d'utilisateur (UnicodeUsernameValidator)
+_USERNAME_CHARS = re.compile(r'[\w.@+-]+')
+
+# lower() de SQLite ne convertit que les lettres ASCII : la saisie est normalisée de la même façon
+_ASCII_LOWER = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+
+def _version_key(user_id):
+    return f'{KEY_PREFIX}:version:{user_id}'
+
+
+def _counter_key(name):
+    return f'{KEY_PREFIX}:stats:{name}'
+
+
+def _incr(name):
+    """Incrémente un compteur de statistiques stocké dans le cache."""
+    key = _counter_key(name)
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Le compteur a été évincé entre add() et incr()
+        cache.set(key, 1, timeout=None)
+
+
+def _get_version(user_id):
+    """Retourne la version des propositions en cache d'un utilisateur (jeton aléatoire, comme feed_cache)."""
+    key = _version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        version = str(time.time_ns())
+        if not cache.add(key, version, timeout=None):
+            version = cache.get(key, version)
+    return version
+
+
+def invalidate(user_ids):
+    """
+    Invalide les propositions en cache des utilisateurs donnés, immédiatement et
+    à la validation de la transaction en cours.
+
+    Appelé lorsque leurs abonnements changent ; les invalidations du cache des
+    flux ne touchent pas à l'autocomplétion.
+
+    Args:
+        user_ids (iterable): Identifiants des utilisateurs concernés
+    """
+    keys = [_version_key(user_id) for user_id in set(user_ids)]
+    cache.delete_many(keys)
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def normalize(prefix):
+    """
+    Normalise une saisie comme lower(username) dans l'index de la migration 0012.
+
+    Seules les lettres ASCII sont mises en minuscules : « élo » ne trouve pas
+    « Élodie », mais « Élo » et « ÉLO » le trouvent.
+
+    Args:
+        prefix (str): Début du nom d'utilisateur saisi
+
+    Returns:
+        str: Préfixe normalisé
+    """
+    return prefix.strip().translate(_ASCII_LOWER)[:MAX_PREFIX_LENGTH]
+
+
+def prefix_range(prefix):
+    """
+    Retourne les bornes [low, high) des chaînes commençant par un préfixe.
+
+    Une comparaison par intervalle, contrairement à LIKE, est résolue par un
+    parcours de l'index sur lower(username) créé par la migration 0012.
+
+    Args:
+        prefix (str): Préfixe normalisé par normalize()
+
+    Returns:
+        tuple: (low, high)
+    """
+    return prefix, prefix + '\U0010ffff'
+
+
+def _query(user, prefix, limit):
+    """Cherche en une requête les utilisateurs proposables à un abonné."""
+    low, high = prefix_range(prefix)
+    already_followed = UserFollows.objects.filter(user=user, followed_user=OuterRef('pk'))
+    return list(
+        User.objects.annotate(username_lower=Lower('username'))
+        .filter(username_lower__gte=low, username_lower__lt=high, is_active=True)
+        .exclude(pk=user.pk)
+        .exclude(Exists(already_followed))
+        .order_by('username_lower')
+        .values_list('username', flat=True)[:limit]
+    )
+
+
+def suggest(user, prefix, limit=AUTOCOMPLETE_LIMIT):
+    """
+    Propose les noms d'utilisateur commençant par un préfixe, sans tenir compte
+    de la casse des lettres ASCII.
+
+    L'utilisateur lui-même et les utilisateurs qu'il suit déjà sont exclus.
+    Les réponses sont conservées dans un cache propre à l'autocomplétion,
+    invalidé lorsque les abonnements de l'utilisateur changent ; un nouveau
+    compte apparaît au plus tard après AUTOCOMPLETE_CACHE_TIMEOUT.
+
+    Args:
+        user (User): Utilisateur qui cherche à s'abonner
+        prefix (str): Début du nom d'utilisateur saisi
+        limit (int): Nombre maximum de propositions
+
+    Returns:
+        list: Noms d'utilisateur triés par ordre alphabétique
+    """
+    prefix = normalize(prefix)
+    if not _USERNAME_CHARS.fullmatch(prefix):
+        # Aucun nom d'utilisateur ne peut correspondre : inutile d'interroger la base
+        return []
+    key = f'{KEY_PREFIX}:{user.id}:{_get_version(user.id)}:{limit}:{prefix}'
+    suggestions = cache.get(key)
+    if suggestions is not None:
+        _incr('hits')
+        return suggestions
+    _incr('misses')
+    suggestions = _query(user, prefix, limit)
+    cache.set(key, suggestions, timeout=AUTOCOMPLETE_CACHE_TIMEOUT)
+    return suggestions
+
+
+def stats():
+    """
+    Retourne les compteurs de succès et d'échecs du cache de l'autocomplétion.
+
+    Returns:
+        dict: {'hits': int, 'misses': int, 'hit_ratio': float}
+    """
+    counters = cache.get_many([_counter_key('hits'), _counter_key('misses')])
+    hits = counters.get(_counter_key('hits'), 0)
+    misses = counters.get(_counter_key('misses'), 0)
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': hits / total if total else 0.0,
+    }
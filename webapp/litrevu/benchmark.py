@@ -0,0 +1,352 @@
+import asyncio
+import platform
+import statistics
+import subprocess
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+import django
+from asgiref.sync import ThreadSensitiveContext, sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import close_old_connections, connection, connections
+from django.db.models import Count
+from django.test import AsyncClient, Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from .models import Ticket, Review, UserFollows
+
+# Noms d'URL des vues mesurées par défaut
+VIEWS = ('flux', 'posts', 'subscriptions')
+
+# Modes de service comparés par run_concurrency : gestionnaire de requêtes et configuration d'URL
+MODES = {
+    'wsgi': ('wsgi', 'webapp.urls'),
+    'asgi': ('asgi', 'webapp.urls'),
+    'asgi-async': ('asgi', 'webapp.urls_async'),
+}
+
+# Vues en écriture mesurées par run_concurrency : nom d'URL -> données du formulaire envoyé
+WRITE_VIEWS = {
+    'create_ticket': {'title': 'Ticket de mesure', 'description': 'Créé par benchmark_concurrency.'},
+}
+
+# Nombres de clients simultanés mesurés par défaut
+CONCURRENCY_LEVELS = (1, 8, 32)
+
+
+def percentile(sorted_values, fraction):
+    """
+    Retourne un percentile par interpolation linéaire.
+
+    Args:
+        sorted_values (list): Valeurs triées
+        fraction (float): Percentile voulu, entre 0 et 1
+
+    Returns:
+        float: La valeur du percentile
+    """
+    if len(sorted_values) == 1:
+        return sorted_values[0]
+    position = (len(sorted_values) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def sample_users(count, username_prefix=''):
+    """
+    Choisit des utilisateurs représentatifs, du plus suivi au moins suivi.
+
+    Le choix ne dépend que des données : deux mesures sur le même jeu de données
+    utilisent les mêmes utilisateurs, ce qui rend les résultats comparables.
+
+    Args:
+        count (int): Nombre d'utilisateurs voulus
+        username_prefix (str): Restreint le choix aux noms commençant par ce préfixe
+
+    Returns:
+        list: Les utilisateurs, répartis régulièrement sur le classement par nombre d'abonnés
+    """
+    ranked = list(
+        User.objects.filter(username__startswith=username_prefix)
+        .annotate(follower_count=Count('followed_by'))
+        .order_by('-follower_count', 'id')
+        .values_list('id', flat=True)
+    )
+    if len(ranked) > count:
+        step = (len(ranked) - 1) / max(count - 1, 1)
+        ranked = [ranked[round(index * step)] for index in range(count)]
+    users = User.objects.in_bulk(ranked)
+    return [users[user_id] for user_id in ranked]
+
+
+def _git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True, cwd=settings.BASE_DIR
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment():
+    """
+    Décrit l'environnement de mesure, pour comparer des résultats entre commits.
+
+    Returns:
+        dict: Révision, versions, base de données et volumes des tables principales
+    """
+    return {
+        'revision': _git_revision(),
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'database': connection.vendor,
+        'cache': settings.CACHES['default']['BACKEND'],
+        'database_profile': getattr(settings, 'DATABASE_PROFILE', 'development'),
+        'feed_use_timeline': getattr(settings, 'FEED_USE_TIMELINE', False),
+        'session_local_cache': getattr(settings, 'SESSION_LOCAL_CACHE', False),
+        'dataset': {
+            'users': User.objects.count(),
+            'follows': UserFollows.objects.count(),
+            'tickets': Ticket.objects.count(),
+            'reviews': Review.objects.count(),
+        },
+    }
+
+
+def measure_view(client, url, users, iterations, warmup=1, cold_cache=False):
+    """
+    Mesure une vue pour chaque utilisateur de l'échantillon.
+
+    Les durées sont mesurées sans tracemalloc, qui ralentit l'exécution ; le pic
+    mémoire est mesuré lors d'un passage séparé.
+
+    Args:
+        client (Client): Client de test
+        url (str): Adresse de la vue
+        users (list): Utilisateurs connectés tour à tour
+        iterations (int): Nombre de requêtes mesurées par utilisateur
+        warmup (int): Nombre de requêtes non mesurées par utilisateur
+        cold_cache (bool): Vider le cache avant chaque requête
+
+    Returns:
+        dict: Percentiles des durées (ms), requêtes SQL par page et pic mémoire (Kio)
+    """
+    durations, query_counts, peaks = [], [], []
+    for user in users:
+        client.force_login(user)
+        for _ in range(warmup):
+            client.get(url)
+
+        for _ in range(iterations):
+            if cold_cache:
+                cache.clear()
+            start = time.perf_counter()
+            response = client.get(url)
+            durations.append((time.perf_counter() - start) * 1000)
+            if response.status_code != 200:
+                raise RuntimeError(f"{url} a répondu {response.status_code} pour {user.username}")
+
+        if cold_cache:
+            cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            tracemalloc.start()
+            try:
+                client.get(url)
+                peaks.append(tracemalloc.get_traced_memory()[1] / 1024)
+            finally:
+                tracemalloc.stop()
+        query_counts.append(len(queries))
+
+    durations.sort()
+    return {
+        'requests': len(durations),
+        'p50_ms': round(percentile(durations, 0.50), 3),
+        'p95_ms': round(percentile(durations, 0.95), 3),
+        'p99_ms': round(percentile(durations, 0.99), 3),
+        'mean_ms': round(statistics.fmean(durations), 3),
+        'queries_median': statistics.median(query_counts),
+        'queries_max': max(query_counts),
+        'peak_memory_kib': round(max(peaks), 1),
+    }
+
+
+def run(views=None, users=10, iterations=20, warmup=1, cold_cache=False, username_prefix=''):
+    """
+    Mesure les vues demandées et retourne un rapport sérialisable en JSON.
+
+    Args:
+        views (list): Noms d'URL à mesurer (par défaut : VIEWS)
+        users (int): Nombre d'utilisateurs de l'échantillon
+        iterations (int): Nombre de requêtes mesurées par utilisateur et par vue
+        warmup (int): Nombre de requêtes non mesurées par utilisateur et par vue
+        cold_cache (bool): Vider le cache avant chaque requête
+        username_prefix (str): Restreint l'échantillon aux noms commençant par ce préfixe
+
+    Returns:
+        dict: {'environment': ..., 'parameters': ..., 'views': {nom: mesures}}
+    """
+    sample = sample_users(users, username_prefix)
+    if not sample:
+        raise ValueError("Aucun utilisateur à mesurer : générez d'abord un jeu de données.")
+    report = {
+        'environment': environment(),
+        'parameters': {
+            'users': [user.username for user in sample],
+            'iterations': iterations,
+            'warmup': warmup,
+            'cold_cache': cold_cache,
+        },
+        'views': {},
+    }
+    # Le client de test utilise le nom d'hôte 'testserver'
+    with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+        client = Client()
+        for name in views or VIEWS:
+            url = reverse(name)
+            report['views'][name] = measure_view(client, url, sample, iterations, warmup, cold_cache)
+    return report
+
+
+def _latency_report(samples, elapsed):
+    """Débit et percentiles des requêtes réussies ; samples contient des couples (durée, réussite)."""
+    durations = sorted(duration for duration, succeeded in samples if succeeded)
+    if not durations:
+        raise RuntimeError("Aucune requête n'a réussi.")
+    return {
+        'requests': len(samples),
+        'errors': len(samples) - len(durations),
+        'throughput_rps': round(len(durations) / elapsed, 1),
+        'p50_ms': round(percentile(durations, 0.50), 3),
+        'p95_ms': round(percentile(durations, 0.95), 3),
+        'p99_ms': round(percentile(durations, 0.99), 3),
+    }
+
+
+def _succeeded(response):
+    # Une vue en écriture redirige après l'enregistrement ; une erreur ("database is locked"...) répond 500
+    return response.status_code in (200, 302)
+
+
+def _run_wsgi(url, data, users, requests, concurrency):
+    """Un thread par client, comme un serveur WSGI à `concurrency` threads."""
+    clients = []
+    for index in range(concurrency):
+        client = Client(raise_request_exception=False)
+        client.force_login(users[index % len(users)])
+        clients.append(client)
+
+    def worker(client, count):
+        samples = []
+        try:
+            for _ in range(count):
+                start = time.perf_counter()
+                response = client.get(url) if data is None else client.post(url, data)
+                samples.append(((time.perf_counter() - start) * 1000, _succeeded(response)))
+                # Comme à la fin d'une requête WSGI : ferme les connexions au-delà de CONN_MAX_AGE
+                close_old_connections()
+        finally:
+            connections.close_all()
+        return samples
+
+    counts = [requests // concurrency + (index < requests % concurrency) for index in range(concurrency)]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(worker, clients, counts))
+    elapsed = time.perf_counter() - start
+    return _latency_report([sample for samples in results for sample in samples], elapsed)
+
+
+async def _run_asgi(url, data, users, requests, concurrency):
+    """`concurrency` clients simultanés servis par une seule boucle d'événements."""
+    clients = []
+    for index in range(concurrency):
+        client = AsyncClient(raise_request_exception=False)
+        await client.aforce_login(users[index % len(users)])
+        clients.append(client)
+
+    async def worker(client, count):
+        samples = []
+        for _ in range(count):
+            # Comme ASGIHandler : le code synchrone de chaque requête a son propre thread,
+            # et donc ses propres connexions, fermées avec lui
+            async with ThreadSensitiveContext():
+                start = time.perf_counter()
+                response = await (client.get(url) if data is None else client.post(url, data))
+                samples.append(((time.perf_counter() - start) * 1000, _succeeded(response)))
+                await sync_to_async(connections.close_all)()
+        return samples
+
+    counts = [requests // concurrency + (index < requests % concurrency) for index in range(concurrency)]
+    start = time.perf_counter()
+    results = await asyncio.gather(*(worker(client, count) for client, count in zip(clients, counts)))
+    elapsed = time.perf_counter() - start
+    return _latency_report([sample for samples in results for sample in samples], elapsed)
+
+
+def measure_concurrency(mode, url, users, requests, concurrency, data=None):
+    """
+    Mesure le débit d'une vue servie par `concurrency` clients simultanés.
+
+    Args:
+        mode (str): Clé de MODES
+        url (str): Adresse de la vue
+        users (list): Utilisateurs connectés, répartis entre les clients
+        requests (int): Nombre total de requêtes
+        concurrency (int): Nombre de clients simultanés
+        data (dict): Formulaire envoyé en POST ; None pour une requête GET
+
+    Returns:
+        dict: Débit (requêtes par seconde) et percentiles des durées (ms)
+    """
+    handler, urlconf = MODES[mode]
+    with override_settings(ROOT_URLCONF=urlconf):
+        if handler == 'wsgi':
+            return _run_wsgi(url, data, users, requests, concurrency)
+        return asyncio.run(_run_asgi(url, data, users, requests, concurrency))
+
+
+def run_concurrency(views=None, modes=None, users=10, requests=500, levels=CONCURRENCY_LEVELS, username_prefix=''):
+    """
+    Compare le débit des vues sous WSGI et sous ASGI, avec vues synchrones puis asynchrones.
+
+    Les clients de test appellent directement les gestionnaires WSGI et ASGI de
+    Django, sans serveur ni réseau : la mesure porte sur Django et la base.
+    Les vues de WRITE_VIEWS reçoivent des POST et écrivent donc dans la base.
+
+    Args:
+        views (list): Noms d'URL à mesurer (par défaut : VIEWS)
+        modes (list): Modes à comparer (par défaut : tous ceux de MODES)
+        users (int): Nombre d'utilisateurs de l'échantillon
+        requests (int): Nombre de requêtes par vue, par mode et par niveau de concurrence
+        levels (list): Nombres de clients simultanés
+        username_prefix (str): Restreint l'échantillon aux noms commençant par ce préfixe
+
+    Returns:
+        dict: {'environment': ..., 'parameters': ..., 'views': {nom: {mode: {clients: mesures}}}}
+    """
+    sample = sample_users(users, username_prefix)
+    if not sample:
+        raise ValueError("Aucun utilisateur à mesurer : générez d'abord un jeu de données.")
+    report = {
+        'environment': environment(),
+        'parameters': {
+            'users': [user.username for user in sample],
+            'requests': requests,
+            'levels': list(levels),
+        },
+        'views': {},
+    }
+    with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+        for name in views or VIEWS:
+            url = reverse(name)
+            report['views'][name] = {
+                mode: {
+                    str(level): measure_concurrency(mode, url, sample, requests, level, WRITE_VIEWS.get(name))
+                    for level in levels
+                }
+                for mode in modes or MODES
+            }
+    return report
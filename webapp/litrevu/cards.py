@@ -0,0 +1,106 @@
+import hashlib
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+from .constants import MAX_RATING, POST_CARD_CACHE_TIMEOUT, POST_CARD_TEMPLATE_VERSION
+
+# Préfixe commun à toutes les clés de cache des cartes
+KEY_PREFIX = 'litrevu:card'
+
+# Gabarit de chaque type de carte
+TEMPLATES = {
+    'TICKET': 'litrevu/includes/ticket_card.html',
+    'REVIEW': 'litrevu/includes/review_card.html',
+}
+
+
+def _ticket_state(ticket, viewer):
+    """Champs du ticket affichés par les cartes, y compris dans une critique."""
+    return (
+        ticket.id, ticket.title, ticket.description, ticket.image.name, ticket.image_variants_ready,
+        ticket.time_created.isoformat(), ticket.review_count, ticket.rating_sum,
+        ticket.user.username, ticket.user_id == viewer.id,
+    )
+
+
+def _state(post, viewer):
+    """Tout ce dont dépend le rendu d'une carte pour un lecteur donné."""
+    if post.content_type == 'REVIEW':
+        return (
+            post.headline, post.rating, post.body, post.time_created.isoformat(),
+            post.user.username, post.user_id == viewer.id, _ticket_state(post.ticket, viewer),
+        )
+    return _ticket_state(post, viewer) + (getattr(post, 'has_review_from_user', False),)
+
+
+def card_key(post, viewer, variant):
+    """
+    Retourne la clé de cache de la carte d'un post.
+
+    La version de la carte est une empreinte des champs qu'elle affiche : toute
+    modification du post (édition, statistiques des critiques, déclinaisons de
+    l'image prêtes...) produit une nouvelle clé, quelle que soit la façon dont la
+    base a été mise à jour. L'ancienne entrée expire d'elle-même.
+
+    Args:
+        post (Ticket|Review): Post chargé par feed.load_page
+        viewer (User): Utilisateur connecté
+        variant (str): 'flux' ou 'posts'
+
+    Returns:
+        str: Clé de cache
+    """
+    version = hashlib.blake2b(repr(_state(post, viewer)).encode(), digest_size=12).hexdigest()
+    return f'{KEY_PREFIX}:{POST_CARD_TEMPLATE_VERSION}:{variant}:{post.content_type}:{post.id}:{version}'
+
+
+def render_card(post, viewer, variant):
+    """
+    Rend la carte d'un post.
+
+    Args:
+        post (Ticket|Review): Post chargé par feed.load_page
+        viewer (User): Utilisateur connecté
+        variant (str): 'flux' ou 'posts'
+
+    Returns:
+        str: Code HTML de la carte
+    """
+    context = {
+        'post': post,
+        'variant': variant,
+        'author_is_viewer': post.user_id == viewer.id,
+        'MAX_RATING': MAX_RATING,
+    }
+    if post.content_type == 'REVIEW':
+        context['ticket_author_is_viewer'] = post.ticket.user_id == viewer.id
+        context['stars'] = '★' * post.rating + '☆' * (MAX_RATING - post.rating)
+    return render_to_string(TEMPLATES[post.content_type], context)
+
+
+def attach(posts, viewer, variant):
+    """
+    Associe à chaque post le code HTML de sa carte (attribut card), rendu ou lu en cache.
+
+    Les cartes de la page sont lues en une seule requête au cache ; seules les
+    cartes absentes, c'est-à-dire nouvelles ou modifiées, sont rendues.
+
+    Args:
+        posts (list): Posts de la page
+        viewer (User): Utilisateur connecté
+        variant (str): 'flux' ou 'posts'
+
+    Returns:
+        list: Les mêmes posts
+    """
+    keys = [card_key(post, viewer, variant) for post in posts]
+    cached = cache.get_many(keys)
+    rendered = {}
+    for post, key in zip(posts, keys):
+        card = cached.get(key)
+        if card is None:
+            card = rendered[key] = render_card(post, viewer, variant)
+        post.card = mark_safe(card)
+    if rendered:
+        cache.set_many(rendered, timeout=POST_CARD_CACHE_TIMEOUT)
+    return posts
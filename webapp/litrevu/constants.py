@@ -3,11 +3,120 @@
 # Nombre maximum de critiques par ticket
 MAX_RATING = 5
 
+# Nombre de posts affichés par page dans le flux et la page des posts
+FEED_PAGE_SIZE = 20
+
+# Séparateur des composantes du curseur de pagination
+CURSOR_SEPARATOR = '|'
+
+# Durée de vie (en secondes) d'une page de flux en cache
+FEED_CACHE_TIMEOUT = 60 * 15
+
+# Largeurs (en pixels) des déclinaisons générées pour les images de couverture
+THUMBNAIL_WIDTHS = (320, 640)
+
+# Qualité d'encodage des déclinaisons JPEG et WebP
+THUMBNAIL_QUALITY = 80
+
+# Nombre de lignes lues par requête lors d'un export en flux
+EXPORT_CHUNK_SIZE = 2000
+
+# Nombre de lignes écrites par transaction lors d'un import en masse
+IMPORT_BATCH_SIZE = 1000
+
+# Répertoire (dans MEDIA_ROOT) des images de couverture adressées par contenu
+COVERS_DIRECTORY = 'covers'
+
+# Nombre maximum de tentatives d'une tâche de traitement d'image
+IMAGE_JOB_MAX_ATTEMPTS = 3
+
+# Délai (en secondes) au-delà duquel une tâche en cours est considérée comme abandonnée
+IMAGE_JOB_TIMEOUT = 60 * 10
+
+# Nombre de résultats affichés par page de recherche
+SEARCH_PAGE_SIZE = 20
+
+# Dernière page de résultats accessible : au-delà, l'OFFSET coûte cher et dépasse les entiers SQLite
+SEARCH_MAX_PAGE = 1000
+
+# Nombre maximum de mots pris en compte dans une recherche
+SEARCH_MAX_TERMS = 8
+
+# Nombre de tickets dont les statistiques des critiques sont recalculées par requête
+REVIEW_STATS_BATCH_SIZE = 2000
+
+# Nombre d'utilisateurs affichés par page dans les listes d'abonnements et d'abonnés
+SUBSCRIPTIONS_PAGE_SIZE = 50
+
+# Nombre de noms d'utilisateur proposés par l'autocomplétion des abonnements
+AUTOCOMPLETE_LIMIT = 10
+
+# Durée de vie (en secondes) des propositions d'autocomplétion en cache
+AUTOCOMPLETE_CACHE_TIMEOUT = 60
+
+# Nombre maximum d'événements en attente par connexion en direct, au-delà duquel le client doit se resynchroniser
+LIVE_QUEUE_SIZE = 100
+
+# Nombre maximum de connexions en direct simultanées par processus
+LIVE_MAX_CONNECTIONS = 5000
+
+# Intervalle (en secondes) entre deux commentaires de maintien d'une connexion en direct
+LIVE_KEEPALIVE_INTERVAL = 15
+
+# Durée de cache (en secondes) des fichiers envoyés dont le contenu peut changer
+MEDIA_MAX_AGE = 3600
+
+# Durée de cache (en secondes) des images adressées par contenu, qui ne changent jamais
+MEDIA_IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+# Taille des blocs lus pour répondre à une requête Range
+MEDIA_CHUNK_SIZE = 64 * 1024
+
+# Durée (en secondes) pendant laquelle le thread d'écriture regroupe les insertions d'un même lot
+GROUP_COMMIT_WINDOW = 0.002
+
+# Nombre maximum d'insertions validées par une même transaction du thread d'écriture
+GROUP_COMMIT_MAX_BATCH = 200
+
+# Attente maximale (en secondes) de la prise en charge d'une insertion par le thread d'écriture
+GROUP_COMMIT_TIMEOUT = 5
+
+# Délai (en secondes) suggéré par l'en-tête Retry-After lorsqu'une écriture n'a pas pu être validée à temps
+GROUP_COMMIT_RETRY_AFTER = 5
+
+# Nombre maximum de sessions gardées dans le cache local de chaque processus
+SESSION_CACHE_MAX_ENTRIES = 10000
+
+# Durée (en secondes) pendant laquelle une session lue en base est servie depuis le cache local
+SESSION_CACHE_TTL = 30
+
+# Durée de vie (en secondes) d'une carte de post rendue en cache
+POST_CARD_CACHE_TIMEOUT = 24 * 3600
+
+# Version des gabarits de cartes (templates/litrevu/includes), à incrémenter lorsqu'ils changent
+POST_CARD_TEMPLATE_VERSION = 1
+
+# Tentatives de connexion consécutives autorisées par adresse IP, puis tentatives par seconde
+LOGIN_IP_BURST = 20
+LOGIN_IP_RATE = 20 / 60
+
+# Tentatives de connexion consécutives autorisées par nom d'utilisateur, puis tentatives par seconde
+LOGIN_USERNAME_BURST = 5
+LOGIN_USERNAME_RATE = 5 / 300
+
+# Longueur du préfixe regroupant les adresses IPv6 d'un même client
+LOGIN_IPV6_PREFIX = 64
+
 # Messages d'erreur
 ERROR_MESSAGES = {
     'PASSWORD_MISMATCH': 'Les deux mots de passe ne correspondent pas.',
     'USERNAME_EXISTS': 'Ce nom d\'utilisateur existe déjà.',
     'LOGIN_FAILED': "Nom d'utilisateur ou mot de passe incorrect. Veuillez réessayer.",
+    'LOGIN_THROTTLED': 'Trop de tentatives de connexion. Veuillez réessayer dans {seconds} secondes.',
+    'WRITE_TIMEOUT': "Le site est momentanément surchargé : votre publication n'a pas été enregistrée. "
+                     "Veuillez réessayer.",
+    'WRITE_UNCONFIRMED': "L'enregistrement n'a pas pu être confirmé à temps. "
+                         "Vérifiez votre flux avant de réessayer.",
     'CANNOT_FOLLOW_SELF': 'Vous ne pouvez pas vous suivre vous-même.',
     'ALREADY_FOLLOWING': 'Vous suivez déjà {username}.',
     'USER_NOT_FOUND': 'L\'utilisateur {username} n\'existe pas.',
@@ -0,0 +1,73 @@
+from django.db import transaction
+from django.db.models import Count, F
+from .images import variant_name
+from .models import Ticket, CoverImage
+from .constants import THUMBNAIL_WIDTHS
+
+
+def acquire(name, count=1):
+    """
+    Ajoute des références à une image de couverture.
+
+    Args:
+        name (str): Chemin du fichier dans le stockage
+        count (int): Nombre de références ajoutées (une par ticket)
+    """
+    CoverImage.objects.get_or_create(name=name)
+    CoverImage.objects.filter(name=name).update(ref_count=F('ref_count') + count)
+
+
+def release(name, storage):
+    """
+    Retire une référence à une image de couverture.
+
+    Lorsque plus aucun ticket n'utilise le fichier, il est supprimé avec ses
+    déclinaisons après la validation de la transaction.
+
+    Args:
+        name (str): Chemin du fichier dans le stockage
+        storage (Storage): Stockage contenant le fichier
+    """
+    CoverImage.objects.filter(name=name, ref_count__gt=0).update(ref_count=F('ref_count') - 1)
+    transaction.on_commit(lambda: collect(name, storage))
+
+
+def collect(name, storage):
+    """
+    Supprime une image et ses déclinaisons si elle n'est plus référencée.
+
+    Args:
+        name (str): Chemin du fichier dans le stockage
+        storage (Storage): Stockage contenant le fichier
+
+    Returns:
+        bool: True si le fichier a été supprimé
+    """
+    # La ligne supprimée reste verrouillée jusqu'à la fin de la transaction : un envoi
+    # simultané du même contenu (voir ContentAddressedStorage.save) attend que les
+    # fichiers soient effacés, puis les écrit de nouveau
+    with transaction.atomic():
+        deleted, _ = CoverImage.objects.filter(name=name, ref_count=0).delete()
+        if not deleted:
+            return False
+        for path in [name] + [variant_name(name, width) for width in THUMBNAIL_WIDTHS]:
+            storage.delete(path)
+    return True
+
+
+def recount():
+    """
+    Recalcule les compteurs de références à partir des tickets existants.
+
+    Returns:
+        int: Nombre de fichiers distincts référencés
+    """
+    counts = Ticket.objects.exclude(image='').exclude(image__isnull=True).values('image').annotate(
+        total=Count('id')
+    ).order_by()
+    with transaction.atomic():
+        CoverImage.objects.all().delete()
+        covers = CoverImage.objects.bulk_create(
+            CoverImage(name=row['image'], ref_count=row['total']) for row in counts
+        )
+    return len(covers)
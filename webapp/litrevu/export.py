@@ -0,0 +1,101 @@
+import csv
+import heapq
+import json
+from operator import itemgetter
+from .models import Ticket, Review, UserFollows
+from .constants import EXPORT_CHUNK_SIZE
+
+# Colonnes de l'export CSV, communes aux tickets, critiques et abonnements
+CSV_COLUMNS = [
+    'type', 'id', 'time_created', 'title', 'description', 'image',
+    'ticket_id', 'rating', 'headline', 'body', 'followed_user',
+]
+
+TICKET_FIELDS = ('id', 'time_created', 'title', 'description', 'image')
+REVIEW_FIELDS = ('id', 'time_created', 'ticket_id', 'rating', 'headline', 'body')
+
+
+def _typed(rows, record_type):
+    """Ajoute le type d'enregistrement à chaque ligne d'un itérateur."""
+    for row in rows:
+        row['type'] = record_type
+        yield row
+
+
+def export_records(user, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Produit un à un les tickets, critiques et abonnements d'un utilisateur.
+
+    Les tickets et critiques sont lus par blocs, chacun dans l'ordre chronologique,
+    puis fusionnés au fil de l'eau : la mémoire utilisée ne dépend pas de la
+    taille de l'historique. Les abonnements suivent.
+
+    Args:
+        user (User): L'utilisateur dont les données sont exportées
+        chunk_size (int): Nombre de lignes lues par aller-retour avec la base
+
+    Yields:
+        dict: Un enregistrement avec sa clé 'type' ('TICKET', 'REVIEW' ou 'FOLLOW')
+    """
+    tickets = Ticket.objects.filter(user=user).order_by('time_created', 'id').values(*TICKET_FIELDS)
+    reviews = Review.objects.filter(user=user).order_by('time_created', 'id').values(*REVIEW_FIELDS)
+    yield from heapq.merge(
+        _typed(tickets.iterator(chunk_size=chunk_size), 'TICKET'),
+        _typed(reviews.iterator(chunk_size=chunk_size), 'REVIEW'),
+        key=itemgetter('time_created', 'id')
+    )
+
+    follows = UserFollows.objects.filter(user=user).order_by('id').values('id', 'followed_user__username')
+    for follow in follows.iterator(chunk_size=chunk_size):
+        yield {'type': 'FOLLOW', 'id': follow['id'], 'followed_user': follow['followed_user__username']}
+
+
+def _serializable(record):
+    """Convertit les dates d'un enregistrement en chaînes ISO 8601."""
+    if 'time_created' in record:
+        record['time_created'] = record['time_created'].isoformat()
+    return record
+
+
+def ndjson_lines(records):
+    """
+    Sérialise des enregistrements au format NDJSON, une ligne par enregistrement.
+
+    Args:
+        records (iterable): Enregistrements produits par export_records
+
+    Yields:
+        str: Une ligne JSON terminée par un saut de ligne
+    """
+    for record in records:
+        yield json.dumps(_serializable(record), ensure_ascii=False) + '\n'
+
+
+class _Echo:
+    """Pseudo-fichier renvoyant directement ce que csv.writer y écrit."""
+
+    def write(self, value):
+        return value
+
+
+def csv_lines(records):
+    """
+    Sérialise des enregistrements au format CSV, en-tête compris.
+
+    Args:
+        records (iterable): Enregistrements produits par export_records
+
+    Yields:
+        str: Une ligne CSV
+    """
+    writer = csv.DictWriter(_Echo(), fieldnames=CSV_COLUMNS, extrasaction='ignore')
+    yield writer.writeheader()
+    for record in records:
+        yield writer.writerow(_serializable(record))
+
+
+# Sérialiseurs disponibles : format -> (générateur de lignes, type MIME, extension)
+FORMATS = {
+    'ndjson': (ndjson_lines, 'application/x-ndjson', 'ndjson'),
+    'csv': (csv_lines, 'text/csv', 'csv'),
+}
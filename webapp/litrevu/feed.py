@@ -0,0 +1,298 @@
+import asyncio
+from django.db.models import Value, CharField, Q, Exists, OuterRef
+from django.utils.dateparse import parse_datetime
+from .models import Ticket, Review, UserFollows, FeedEntry
+from .constants import FEED_PAGE_SIZE, CURSOR_SEPARATOR
+
+
+def flux_querysets(user):
+    """
+    Construit les querysets des tickets et critiques visibles dans le flux d'un utilisateur.
+
+    Args:
+        user (User): L'utilisateur dont on construit le flux
+
+    Returns:
+        tuple: (tickets, reviews) deux querysets non évalués
+    """
+    # La liste des utilisateurs suivis reste une sous-requête SQL
+    followed_users = UserFollows.objects.filter(user=user).values_list('followed_user', flat=True)
+
+    tickets = Ticket.objects.filter(
+        Q(user__in=followed_users) | Q(user=user)
+    )
+    # Les critiques sur les tickets de l'utilisateur passent par une sous-requête sur
+    # ticket_id plutôt que par une jointure : chaque branche du OR peut alors
+    # utiliser un index de litrevu_review
+    own_tickets = Ticket.objects.filter(user=user).values('id')
+    reviews = Review.objects.filter(
+        Q(user__in=followed_users) |
+        Q(user=user) |
+        Q(ticket__in=own_tickets)
+    )
+    return tickets, reviews
+
+
+def posts_querysets(user):
+    """
+    Construit les querysets des tickets et critiques publiés par un utilisateur.
+
+    Args:
+        user (User): L'auteur des posts
+
+    Returns:
+        tuple: (tickets, reviews) deux querysets non évalués
+    """
+    return Ticket.objects.filter(user=user), Review.objects.filter(user=user)
+
+
+def encode_cursor(time_created, post_id, content_type):
+    """
+    Encode la position d'un post dans le flux sous forme de curseur.
+
+    Args:
+        time_created (datetime): Date de création du dernier post affiché
+        post_id (int): Identifiant du dernier post affiché
+        content_type (str): 'TICKET' ou 'REVIEW'
+
+    Returns:
+        str: Curseur de la forme "<time_created>|<id>|<content_type>"
+    """
+    return CURSOR_SEPARATOR.join([time_created.isoformat(), str(post_id), content_type])
+
+
+def decode_cursor(raw_cursor):
+    """
+    Décode un curseur reçu dans la requête.
+
+    Args:
+        raw_cursor (str): Curseur tel que produit par encode_cursor
+
+    Returns:
+        tuple: (time_created, id, content_type) ou None si le curseur est absent ou invalide
+    """
+    if not raw_cursor:
+        return None
+    try:
+        raw_time, raw_id, content_type = raw_cursor.split(CURSOR_SEPARATOR)
+        time_created = parse_datetime(raw_time)
+        post_id = int(raw_id)
+    except ValueError:
+        return None
+    if time_created is None or content_type not in ('TICKET', 'REVIEW'):
+        return None
+    return time_created, post_id, content_type
+
+
+def _after_cursor(queryset, cursor, content_type, id_field='id'):
+    """
+    Restreint un queryset aux posts situés après le curseur dans l'ordre du flux.
+
+    Le flux est trié par (time_created, id, content_type) décroissants : le type
+    ne sert qu'à départager un ticket et une critique de même date et même id.
+    """
+    if cursor is None:
+        return queryset
+    time_created, post_id, cursor_type = cursor
+    condition = Q(time_created__lt=time_created) | Q(time_created=time_created, **{f'{id_field}__lt': post_id})
+    if content_type is None:
+        # Le type est une colonne de la table (timeline matérialisée)
+        condition |= Q(time_created=time_created, post_type__lt=cursor_type, **{id_field: post_id})
+    elif content_type < cursor_type:
+        condition |= Q(time_created=time_created, **{id_field: post_id})
+    return queryset.filter(condition)
+
+
+def _page_queries(keys, page_size, viewer):
+    """Sépare les clés d'une page en identifiants de tickets et de critiques, avec leurs querysets."""
+    has_next = len(keys) > page_size
+    keys = keys[:page_size]
+
+    ticket_ids = [key['id'] for key in keys if key['content_type'] == 'TICKET']
+    review_ids = [key['id'] for key in keys if key['content_type'] == 'REVIEW']
+    ticket_objects = Ticket.objects.select_related('user')
+    if viewer is not None:
+        # Calcule le drapeau dans la même requête plutôt qu'un exists() par ticket
+        ticket_objects = ticket_objects.annotate(has_review_from_user=Exists(
+            Review.objects.filter(ticket=OuterRef('pk'), user=viewer)
+        ))
+    queries = {
+        'TICKET': (ticket_objects, ticket_ids),
+        'REVIEW': (Review.objects.select_related('user', 'ticket__user'), review_ids),
+    }
+    return keys, has_next, queries
+
+
+def _assemble_page(keys, loaded, has_next):
+    """Ordonne les objets chargés selon les clés et calcule le curseur de la page suivante."""
+    posts = []
+    for key in keys:
+        post = loaded[key['content_type']].get(key['id'])
+        if post is None:
+            # Le post a été supprimé entre les deux requêtes
+            continue
+        post.content_type = key['content_type']
+        posts.append(post)
+
+    next_cursor = None
+    if has_next:
+        last = keys[-1]
+        next_cursor = encode_cursor(last['time_created'], last['id'], last['content_type'])
+    return posts, next_cursor
+
+
+def load_page(keys, page_size=FEED_PAGE_SIZE, viewer=None):
+    """
+    Charge les objets correspondant aux clés d'une page du flux.
+
+    Args:
+        keys (list): Dictionnaires {'id', 'time_created', 'content_type'} ordonnés,
+            avec au plus un élément de plus que page_size
+        page_size (int): Nombre de posts par page
+        viewer (User, optional): Si fourni, chaque ticket reçoit l'attribut
+            has_review_from_user indiquant si cet utilisateur l'a déjà critiqué
+
+    Returns:
+        tuple: (posts, next_cursor) où posts est la liste ordonnée des objets
+               et next_cursor le curseur de la page suivante (None si dernière page)
+    """
+    keys, has_next, queries = _page_queries(keys, page_size, viewer)
+    loaded = {content_type: queryset.in_bulk(ids) for content_type, (queryset, ids) in queries.items()}
+    return _assemble_page(keys, loaded, has_next)
+
+
+async def aload_page(keys, page_size=FEED_PAGE_SIZE, viewer=None):
+    """
+    Version asynchrone de load_page : tickets et critiques sont chargés en parallèle.
+
+    Args:
+        keys (list): Voir load_page
+        page_size (int): Nombre de posts par page
+        viewer (User, optional): Voir load_page
+
+    Returns:
+        tuple: (posts, next_cursor), voir load_page
+    """
+    keys, has_next, queries = _page_queries(keys, page_size, viewer)
+    results = await asyncio.gather(*(queryset.ain_bulk(ids) for queryset, ids in queries.values()))
+    return _assemble_page(keys, dict(zip(queries, results)), has_next)
+
+
+def _feed_keys_query(tickets, reviews, cursor, page_size):
+    """Requête UNION ALL des clés d'une page du flux, voir feed_keys."""
+    ticket_keys = _after_cursor(tickets, cursor, 'TICKET').annotate(
+        content_type=Value('TICKET', CharField())
+    ).values('id', 'time_created', 'content_type')
+    review_keys = _after_cursor(reviews, cursor, 'REVIEW').annotate(
+        content_type=Value('REVIEW', CharField())
+    ).values('id', 'time_created', 'content_type')
+
+    return ticket_keys.union(review_keys, all=True).order_by('-time_created', '-id', '-content_type')[:page_size + 1]
+
+
+def feed_keys(tickets, reviews, cursor=None, page_size=FEED_PAGE_SIZE):
+    """
+    Retourne les clés ordonnées d'une page du flux fusionnant tickets et critiques.
+
+    La fusion et le tri sont faits par une seule requête UNION ALL ne renvoyant que
+    les clés de la page (plus une, pour savoir s'il existe une page suivante).
+
+    Args:
+        tickets (QuerySet): Tickets candidats
+        reviews (QuerySet): Critiques candidates
+        cursor (tuple, optional): Position décodée par decode_cursor
+        page_size (int): Nombre de posts par page
+
+    Returns:
+        list: Dictionnaires {'id', 'time_created', 'content_type'} à passer à load_page
+    """
+    return list(_feed_keys_query(tickets, reviews, cursor, page_size))
+
+
+async def afeed_keys(tickets, reviews, cursor=None, page_size=FEED_PAGE_SIZE):
+    """
+    Version asynchrone de feed_keys.
+
+    Returns:
+        list: Voir feed_keys
+    """
+    return [key async for key in _feed_keys_query(tickets, reviews, cursor, page_size).aiterator()]
+
+
+def _timeline_query(owner, cursor, page_size):
+    """Requête des clés d'une page de la timeline matérialisée, voir timeline_keys."""
+    entries = _after_cursor(FeedEntry.objects.filter(owner=owner), cursor, None, id_field='post_id')
+    return entries.order_by(
+        '-time_created', '-post_id', '-post_type'
+    ).values_list('post_id', 'time_created', 'post_type')[:page_size + 1]
+
+
+def timeline_keys(owner, cursor=None, page_size=FEED_PAGE_SIZE):
+    """
+    Retourne les clés ordonnées d'une page du flux lue depuis la timeline matérialisée.
+
+    Les clés sont lues par un seul parcours de l'index
+    (owner, time_created, post_id, post_type), sans jointure avec UserFollows.
+
+    Args:
+        owner (User): Propriétaire du flux
+        cursor (tuple, optional): Position décodée par decode_cursor
+        page_size (int): Nombre de posts par page
+
+    Returns:
+        list: Dictionnaires {'id', 'time_created', 'content_type'} à passer à load_page
+    """
+    return [
+        {'id': post_id, 'time_created': time_created, 'content_type': post_type}
+        for post_id, time_created, post_type in _timeline_query(owner, cursor, page_size)
+    ]
+
+
+async def atimeline_keys(owner, cursor=None, page_size=FEED_PAGE_SIZE):
+    """
+    Version asynchrone de timeline_keys.
+
+    Returns:
+        list: Voir timeline_keys
+    """
+    return [
+        {'id': post_id, 'time_created': time_created, 'content_type': post_type}
+        async for post_id, time_created, post_type in _timeline_query(owner, cursor, page_size).aiterator()
+    ]
+
+
+def get_feed_page(tickets, reviews, cursor=None, page_size=FEED_PAGE_SIZE, viewer=None):
+    """
+    Retourne une page du flux fusionnant tickets et critiques, triée par la base.
+
+    Les clés de la page sont obtenues par feed_keys, puis les objets sont chargés
+    par id avec leurs relations. Une page coûte donc trois requêtes, quelle que
+    soit la longueur de l'historique ou le nombre de posts affichés.
+
+    Args:
+        tickets (QuerySet): Tickets candidats
+        reviews (QuerySet): Critiques candidates
+        cursor (tuple, optional): Position décodée par decode_cursor
+        page_size (int): Nombre de posts par page
+        viewer (User, optional): Voir load_page
+
+    Returns:
+        tuple: (posts, next_cursor), voir load_page
+    """
+    return load_page(feed_keys(tickets, reviews, cursor, page_size), page_size, viewer)
+
+
+def get_timeline_page(owner, cursor=None, page_size=FEED_PAGE_SIZE, viewer=None):
+    """
+    Retourne une page du flux lue depuis la timeline matérialisée (FeedEntry).
+
+    Args:
+        owner (User): Propriétaire du flux
+        cursor (tuple, optional): Position décodée par decode_cursor
+        page_size (int): Nombre de posts par page
+        viewer (User, optional): Voir load_page
+
+    Returns:
+        tuple: (posts, next_cursor), voir load_page
+    """
+    return load_page(timeline_keys(owner, cursor, page_size), page_size, viewer)
@@ -0,0 +1,195 @@
+import time
+from django.core.cache import cache
+from django.db import transaction
+from .models import UserFollows
+from .constants import FEED_CACHE_TIMEOUT
+
+# Préfixe commun à toutes les clés de cache du flux
+KEY_PREFIX = 'litrevu:feed'
+
+
+def _version_key(user_id):
+    return f'{KEY_PREFIX}:version:{user_id}'
+
+
+def _entry_key(user_id, namespace, version, cursor_key):
+    return f'{KEY_PREFIX}:{namespace}:{user_id}:{version}:{cursor_key}'
+
+
+def _counter_key(name):
+    return f'{KEY_PREFIX}:stats:{name}'
+
+
+def _incr(name):
+    """Incrémente un compteur de statistiques stocké dans le cache."""
+    key = _counter_key(name)
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Le compteur a été évincé entre add() et incr()
+        cache.set(key, 1, timeout=None)
+
+
+async def _aincr(name):
+    """Version asynchrone de _incr."""
+    key = _counter_key(name)
+    await cache.aadd(key, 0, timeout=None)
+    try:
+        await cache.aincr(key)
+    except ValueError:
+        await cache.aset(key, 1, timeout=None)
+
+
+def get_version(user_id):
+    """
+    Retourne la version courante du cache de flux d'un utilisateur.
+
+    La version est un jeton aléatoire plutôt qu'un compteur : si elle est évincée
+    du cache, la nouvelle version ne peut pas coïncider avec une ancienne.
+
+    Args:
+        user_id (int): Identifiant de l'utilisateur
+
+    Returns:
+        str: Jeton de version
+    """
+    key = _version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        version = str(time.time_ns())
+        # add() évite d'écraser une version posée en parallèle
+        if not cache.add(key, version, timeout=None):
+            version = cache.get(key, version)
+    return version
+
+
+async def aget_version(user_id):
+    """
+    Version asynchrone de get_version.
+
+    Args:
+        user_id (int): Identifiant de l'utilisateur
+
+    Returns:
+        str: Jeton de version
+    """
+    key = _version_key(user_id)
+    version = await cache.aget(key)
+    if version is None:
+        version = str(time.time_ns())
+        if not await cache.aadd(key, version, timeout=None):
+            version = await cache.aget(key, version)
+    return version
+
+
+def bump_versions(user_ids):
+    """
+    Invalide le cache de flux des utilisateurs donnés, et d'eux seuls.
+
+    Les entrées existantes ne sont pas supprimées : elles deviennent inaccessibles
+    et expirent d'elles-mêmes.
+
+    Args:
+        user_ids (iterable): Identifiants des utilisateurs concernés
+    """
+    version = str(time.time_ns())
+    cache.set_many({_version_key(user_id): version for user_id in set(user_ids)}, timeout=None)
+
+
+def invalidate(user_ids):
+    """
+    Invalide le cache des utilisateurs donnés, immédiatement et à la validation
+    de la transaction en cours.
+
+    La seconde invalidation écarte une page recalculée par une autre requête
+    avant que l'écriture ne soit visible.
+
+    Args:
+        user_ids (iterable): Identifiants des utilisateurs concernés
+    """
+    user_ids = set(user_ids)
+    bump_versions(user_ids)
+    transaction.on_commit(lambda: bump_versions(user_ids))
+
+
+def audience_of(author_id):
+    """
+    Retourne les utilisateurs dont le flux contient les posts d'un auteur.
+
+    Args:
+        author_id (int): Identifiant de l'auteur
+
+    Returns:
+        set: L'auteur et ses abonnés
+    """
+    followers = UserFollows.objects.filter(followed_user_id=author_id).values_list('user_id', flat=True)
+    return set(followers) | {author_id}
+
+
+def get_or_compute(user_id, namespace, cursor_key, compute, timeout=FEED_CACHE_TIMEOUT):
+    """
+    Retourne une valeur du cache de flux d'un utilisateur, ou la calcule.
+
+    Args:
+        user_id (int): Identifiant de l'utilisateur
+        namespace (str): Page concernée ('flux' ou 'posts')
+        cursor_key (str): Curseur normalisé de la page demandée
+        compute (callable): Fonction calculant la valeur en cas d'absence
+        timeout (int): Durée de vie (en secondes) de la valeur calculée
+
+    Returns:
+        La valeur en cache ou nouvellement calculée
+    """
+    key = _entry_key(user_id, namespace, get_version(user_id), cursor_key)
+    value = cache.get(key)
+    if value is not None:
+        _incr('hits')
+        return value
+    _incr('misses')
+    value = compute()
+    cache.set(key, value, timeout=timeout)
+    return value
+
+
+async def aget_or_compute(user_id, namespace, cursor_key, compute, timeout=FEED_CACHE_TIMEOUT):
+    """
+    Version asynchrone de get_or_compute, pour les vues asynchrones.
+
+    Args:
+        user_id (int): Identifiant de l'utilisateur
+        namespace (str): Page concernée
+        cursor_key (str): Curseur normalisé de la page demandée
+        compute (callable): Fonction asynchrone calculant la valeur en cas d'absence
+        timeout (int): Durée de vie (en secondes) de la valeur calculée
+
+    Returns:
+        La valeur en cache ou nouvellement calculée
+    """
+    key = _entry_key(user_id, namespace, await aget_version(user_id), cursor_key)
+    value = await cache.aget(key)
+    if value is not None:
+        await _aincr('hits')
+        return value
+    await _aincr('misses')
+    value = await compute()
+    await cache.aset(key, value, timeout=timeout)
+    return value
+
+
+def stats():
+    """
+    Retourne les compteurs de succès et d'échecs du cache de flux.
+
+    Returns:
+        dict: {'hits': int, 'misses': int, 'hit_ratio': float}
+    """
+    counters = cache.get_many([_counter_key('hits'), _counter_key('misses')])
+    hits = counters.get(_counter_key('hits'), 0)
+    misses = counters.get(_counter_key('misses'), 0)
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': hits / total if total else 0.0,
+    }
@@ -0,0 +1,217 @@
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from .models import UserFollows, FollowCounts
+from .constants import SUBSCRIPTIONS_PAGE_SIZE
+
+# Nombre d'utilisateurs recomptés par requête
+RECOUNT_BATCH_SIZE = 500
+
+
+def _count_of(field):
+    """Sous-requête comptant les abonnements dont `field` désigne l'utilisateur courant."""
+    counts = UserFollows.objects.filter(**{field: OuterRef('pk')}).order_by().values(field).annotate(
+        total=Count('id')
+    ).values('total')
+    return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+
+def recount(user_ids=None):
+    """
+    Recalcule les compteurs d'abonnements et d'abonnés à partir de UserFollows.
+
+    Nécessaire après une écriture par bulk_create, qui n'envoie pas de signaux.
+
+    Args:
+        user_ids (iterable): Utilisateurs à recompter ; tous si None
+
+    Returns:
+        int: Nombre d'utilisateurs recomptés
+    """
+    users = User.objects.order_by('pk')
+    if user_ids is None:
+        batches = [users]
+    else:
+        user_ids = sorted(set(user_ids))
+        batches = [
+            users.filter(pk__in=user_ids[start:start + RECOUNT_BATCH_SIZE])
+            for start in range(0, len(user_ids), RECOUNT_BATCH_SIZE)
+        ]
+
+    total = 0
+    for batch in batches:
+        rows = batch.annotate(
+            following_total=_count_of('user'), followers_total=_count_of('followed_user')
+        ).values_list('pk', 'following_total', 'followers_total')
+        pending = []
+        for user_id, following, followers in rows.iterator(chunk_size=RECOUNT_BATCH_SIZE):
+            pending.append(FollowCounts(user_id=user_id, following=following, followers=followers))
+            if len(pending) >= RECOUNT_BATCH_SIZE:
+                total += _save_counts(pending)
+                pending = []
+        total += _save_counts(pending)
+    return total
+
+
+def _save_counts(counts):
+    FollowCounts.objects.bulk_create(
+        counts, update_conflicts=True, unique_fields=['user'], update_fields=['following', 'followers']
+    )
+    return len(counts)
+
+
+def _adjust(user_id, field, delta):
+    """Ajoute delta à un compteur d'un utilisateur."""
+    counters = FollowCounts.objects.filter(user_id=user_id)
+    if delta < 0:
+        # Une ligne absente sera calculée à la prochaine lecture par counts_for
+        counters.filter(**{f'{field}__gt': 0}).update(**{field: F(field) + delta})
+    elif not counters.update(**{field: F(field) + delta}):
+        # Première mise à jour : part du nombre réel d'abonnements
+        recount([user_id])
+
+
+def followed(follow):
+    """
+    Met à jour les compteurs après la création d'un abonnement.
+
+    Args:
+        follow (UserFollows): L'abonnement créé
+    """
+    _adjust(follow.user_id, 'following', 1)
+    _adjust(follow.followed_user_id, 'followers', 1)
+
+
+def unfollowed(follow):
+    """
+    Met à jour les compteurs après la suppression d'un abonnement.
+
+    Args:
+        follow (UserFollows): L'abonnement supprimé
+    """
+    _adjust(follow.user_id, 'following', -1)
+    _adjust(follow.followed_user_id, 'followers', -1)
+
+
+def counts_for(user):
+    """
+    Retourne les compteurs d'abonnements et d'abonnés d'un utilisateur.
+
+    Args:
+        user (User): L'utilisateur concerné
+
+    Returns:
+        FollowCounts: Les compteurs, calculés une fois s'ils n'existent pas encore
+    """
+    counts = FollowCounts.objects.filter(user=user).first()
+    if counts is None:
+        recount([user.id])
+        counts = FollowCounts.objects.get(user=user)
+    return counts
+
+
+async def acounts_for(user):
+    """
+    Version asynchrone de counts_for.
+
+    Args:
+        user (User): L'utilisateur concerné
+
+    Returns:
+        FollowCounts: Les compteurs
+    """
+    counts = await FollowCounts.objects.filter(user=user).afirst()
+    if counts is None:
+        await sync_to_async(recount)([user.id])
+        counts = await FollowCounts.objects.aget(user=user)
+    return counts
+
+
+def decode_cursor(raw_cursor):
+    """
+    Décode un curseur de liste d'abonnements reçu dans la requête.
+
+    Args:
+        raw_cursor (str): Identifiant du dernier abonnement affiché
+
+    Returns:
+        int: L'identifiant, ou None si le curseur est absent ou invalide
+    """
+    try:
+        return int(raw_cursor)
+    except (TypeError, ValueError):
+        return None
+
+
+def _page_query(queryset, cursor, page_size):
+    if cursor is not None:
+        queryset = queryset.filter(id__lt=cursor)
+    return queryset.order_by('-id')[:page_size + 1]
+
+
+def _split_page(rows, page_size):
+    next_cursor = rows[page_size - 1].id if len(rows) > page_size else None
+    return rows[:page_size], next_cursor
+
+
+def _page(queryset, cursor, page_size):
+    """Retourne une page d'abonnements, du plus récent au plus ancien, et le curseur suivant."""
+    return _split_page(list(_page_query(queryset, cursor, page_size)), page_size)
+
+
+async def _apage(queryset, cursor, page_size):
+    """Version asynchrone de _page."""
+    return _split_page([row async for row in _page_query(queryset, cursor, page_size).aiterator()], page_size)
+
+
+def following_page(user, cursor=None, page_size=SUBSCRIPTIONS_PAGE_SIZE):
+    """
+    Retourne une page des abonnements d'un utilisateur, avec les utilisateurs suivis.
+
+    La page est lue en une requête par l'index sur user_id, trié par identifiant.
+
+    Args:
+        user (User): L'abonné
+        cursor (int): Identifiant du dernier abonnement de la page précédente
+        page_size (int): Nombre d'abonnements par page
+
+    Returns:
+        tuple: (follows, next_cursor) ; next_cursor vaut None sur la dernière page
+    """
+    return _page(UserFollows.objects.filter(user=user).select_related('followed_user'), cursor, page_size)
+
+
+def followers_page(user, cursor=None, page_size=SUBSCRIPTIONS_PAGE_SIZE):
+    """
+    Retourne une page des abonnés d'un utilisateur, avec les utilisateurs abonnés.
+
+    Args:
+        user (User): L'utilisateur suivi
+        cursor (int): Identifiant du dernier abonnement de la page précédente
+        page_size (int): Nombre d'abonnements par page
+
+    Returns:
+        tuple: (follows, next_cursor) ; next_cursor vaut None sur la dernière page
+    """
+    return _page(UserFollows.objects.filter(followed_user=user).select_related('user'), cursor, page_size)
+
+
+async def afollowing_page(user, cursor=None, page_size=SUBSCRIPTIONS_PAGE_SIZE):
+    """
+    Version asynchrone de following_page.
+
+    Returns:
+        tuple: (follows, next_cursor), voir following_page
+    """
+    return await _apage(UserFollows.objects.filter(user=user).select_related('followed_user'), cursor, page_size)
+
+
+async def afollowers_page(user, cursor=None, page_size=SUBSCRIPTIONS_PAGE_SIZE):
+    """
+    Version asynchrone de followers_page.
+
+    Returns:
+        tuple: (follows, next_cursor), voir followers_page
+    """
+    return await _apage(UserFollows.objects.filter(followed_user=user).select_related('user'), cursor, page_size)
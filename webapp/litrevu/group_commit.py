@@ -0,0 +1,213 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import FileField
+from .constants import GROUP_COMMIT_WINDOW, GROUP_COMMIT_MAX_BATCH, GROUP_COMMIT_TIMEOUT
+
+# Message demandant l'arrêt du thread d'écriture
+_STOP = object()
+
+
+class WriteTimeout(Exception):
+    """
+    L'écriture n'a pas été validée par le thread d'écriture dans le délai imparti.
+
+    Attributes:
+        cancelled (bool): True si l'écriture a été annulée avant d'être exécutée ;
+            False si elle était en cours et peut encore être validée
+    """
+
+    def __init__(self, cancelled=True):
+        super().__init__(cancelled)
+        self.cancelled = cancelled
+
+
+class GroupCommitWriter:
+    """
+    Thread d'écriture unique regroupant les insertions de plusieurs requêtes en une transaction.
+
+    Sous SQLite, une seule transaction écrit à la fois : plutôt que de se disputer
+    le verrou, les requêtes confient leurs écritures à ce thread, qui les exécute
+    par lots (au plus max_batch écritures arrivées dans une fenêtre de `window`
+    secondes) et valide chaque lot en une seule transaction. Chaque écriture
+    s'exécute dans son propre point de sauvegarde : une erreur (IntegrityError...)
+    n'annule qu'elle et n'est transmise qu'à la requête concernée.
+
+    Attributes:
+        window (float): Durée (en secondes) de constitution d'un lot
+        max_batch (int): Nombre maximum d'écritures par transaction
+    """
+
+    def __init__(self, window=GROUP_COMMIT_WINDOW, max_batch=GROUP_COMMIT_MAX_BATCH):
+        self.window = window
+        self.max_batch = max_batch
+        self._queue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name='litrevu-group-commit', daemon=True)
+        self._thread.start()
+
+    def submit(self, job):
+        """
+        Confie une écriture au thread d'écriture.
+
+        Args:
+            job (callable): Fonction sans argument exécutant l'écriture
+
+        Returns:
+            Future: Résolu avec la valeur retournée par job une fois le lot validé
+        """
+        future = Future()
+        self._queue.put((job, future))
+        return future
+
+    def stop(self):
+        """Termine le thread après le lot en cours ; les écritures en attente sont exécutées avant."""
+        self._queue.put((_STOP, None))
+        self._thread.join()
+
+    def _next_batch(self):
+        """Attend une écriture, puis celles qui arrivent dans la fenêtre du lot."""
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.window
+        while len(batch) < self.max_batch and batch[-1][0] is not _STOP:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        try:
+            while True:
+                batch = self._next_batch()
+                stopping = batch[-1][0] is _STOP
+                if stopping:
+                    batch.pop()
+                if batch:
+                    self._commit(batch)
+                if stopping:
+                    return
+        finally:
+            close_old_connections()
+
+    def _commit(self, batch):
+        """Exécute un lot d'écritures dans une transaction et résout leurs futures après validation."""
+        # Une écriture abandonnée par sa requête (voir run) n'est pas exécutée
+        batch = [(job, future) for job, future in batch if future.set_running_or_notify_cancel()]
+        outcomes = []
+        try:
+            with transaction.atomic():
+                for job, future in batch:
+                    try:
+                        with transaction.atomic():
+                            outcomes.append((future, job(), None))
+                    except Exception as error:
+                        outcomes.append((future, None, error))
+        except Exception as error:
+            # La validation elle-même a échoué : aucune écriture du lot n'est enregistrée
+            close_old_connections()
+            for _, future in batch:
+                future.set_exception(error)
+            return
+        for future, result, error in outcomes:
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def is_enabled():
+    """
+    Indique si les insertions passent par le thread d'écriture.
+
+    Returns:
+        bool: Valeur du paramètre GROUP_COMMIT (False par défaut)
+    """
+    return getattr(settings, 'GROUP_COMMIT', False)
+
+
+def get_writer():
+    """
+    Retourne le thread d'écriture du processus, démarré au premier appel.
+
+    Returns:
+        GroupCommitWriter: Le thread d'écriture
+    """
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = GroupCommitWriter()
+        return _writer
+
+
+def reset_writer():
+    """Arrête le thread d'écriture courant ; le prochain appel à get_writer() en démarre un nouveau."""
+    global _writer
+    with _writer_lock:
+        writer, _writer = _writer, None
+    if writer is not None:
+        writer.stop()
+
+
+def store_files(instance):
+    """
+    Enregistre les fichiers envoyés d'un objet avant son insertion.
+
+    Le stockage (lecture, empreinte, écriture sur disque) a lieu dans le thread
+    de la requête plutôt que dans le thread d'écriture, qui n'enregistre plus
+    que le chemin. Les champs concernés sont notés dans instance._stored_uploads.
+
+    Args:
+        instance (Model): Objet non encore enregistré
+    """
+    for field in instance._meta.concrete_fields:
+        if isinstance(field, FileField):
+            if not getattr(instance, field.name)._committed:
+                # Pour les signaux pre_save, qui ne voient plus l'envoi (voir signals.py)
+                instance._stored_uploads = getattr(instance, '_stored_uploads', set()) | {field.name}
+            field.pre_save(instance, add=True)
+
+
+def run(job, timeout=GROUP_COMMIT_TIMEOUT):
+    """
+    Exécute une écriture dans une transaction et retourne son résultat.
+
+    Si GROUP_COMMIT est activé, l'écriture est regroupée avec celles des autres
+    requêtes par le thread d'écriture ; sinon, ou si l'appelant est déjà dans une
+    transaction, elle s'exécute immédiatement dans sa propre transaction (ou point
+    de sauvegarde). Les exceptions levées par job sont propagées.
+
+    Args:
+        job (callable): Fonction sans argument exécutant l'écriture
+        timeout (float): Attente maximale (en secondes) de la prise en charge par le thread d'écriture
+
+    Returns:
+        La valeur retournée par job
+
+    Raises:
+        WriteTimeout: Si l'écriture n'a pas commencé dans le délai (elle n'est alors pas
+            exécutée), ou si son lot n'est pas validé dans un second délai de même durée
+    """
+    if not is_enabled() or transaction.get_connection().in_atomic_block:
+        with transaction.atomic():
+            return job()
+    future = get_writer().submit(job)
+    try:
+        return future.result(timeout=timeout)
+    except FutureTimeout:
+        if future.cancel():
+            raise WriteTimeout(cancelled=True)
+    # Le lot contenant l'écriture est en cours de validation : attente bornée, elle aussi
+    try:
+        return future.result(timeout=timeout)
+    except FutureTimeout:
+        raise WriteTimeout(cancelled=False)
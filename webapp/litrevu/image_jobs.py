@@ -0,0 +1,142 @@
+from datetime import timedelta
+from django.db.models import Avg, Count, F
+from django.utils import timezone
+from .models import Ticket, ImageJob
+from .constants import IMAGE_JOB_MAX_ATTEMPTS, IMAGE_JOB_TIMEOUT
+
+
+def enqueue(ticket):
+    """
+    Programme le traitement de l'image d'un ticket par process_image_jobs.
+
+    Le ticket affiche son image originale jusqu'à la fin du traitement.
+
+    Args:
+        ticket (Ticket): Ticket enregistré dont l'image vient d'être envoyée
+
+    Returns:
+        ImageJob: La tâche créée, ou None si le ticket n'a pas d'image
+    """
+    if not ticket.image:
+        return None
+    return ImageJob.objects.create(ticket=ticket, image_name=ticket.image.name)
+
+
+def enqueue_missing():
+    """
+    Programme le traitement des images dont les déclinaisons n'ont jamais été générées.
+
+    Returns:
+        int: Nombre de tâches créées
+    """
+    tickets = Ticket.objects.exclude(image='').exclude(image__isnull=True).filter(
+        image_variants_ready=False
+    ).exclude(image_jobs__status__in=[ImageJob.PENDING, ImageJob.RUNNING])
+    jobs = ImageJob.objects.bulk_create(
+        ImageJob(ticket_id=ticket_id, image_name=image_name)
+        for ticket_id, image_name in tickets.values_list('id', 'image')
+    )
+    return len(jobs)
+
+
+def claim(limit):
+    """
+    Réserve les prochaines tâches à traiter.
+
+    Chaque tâche n'est réservée que si elle est toujours en attente : plusieurs
+    instances de process_image_jobs peuvent donc tourner en parallèle.
+
+    Args:
+        limit (int): Nombre maximum de tâches à réserver
+
+    Returns:
+        list: Les tâches réservées, passées à l'état RUNNING
+    """
+    now = timezone.now()
+    candidate_ids = ImageJob.objects.filter(
+        status=ImageJob.PENDING, run_after__lte=now
+    ).order_by('run_after', 'id').values_list('id', flat=True)[:limit]
+
+    claimed_ids = [
+        job_id for job_id in candidate_ids
+        if ImageJob.objects.filter(id=job_id, status=ImageJob.PENDING).update(
+            status=ImageJob.RUNNING, attempts=F('attempts') + 1, started_at=now
+        )
+    ]
+    return list(ImageJob.objects.filter(id__in=claimed_ids).order_by('id'))
+
+
+def complete(job):
+    """
+    Marque une tâche comme terminée et active les déclinaisons du ticket.
+
+    Le ticket n'est marqué que si son image n'a pas été remplacée entre-temps.
+
+    Args:
+        job (ImageJob): La tâche traitée avec succès
+    """
+    job.status = ImageJob.DONE
+    job.finished_at = timezone.now()
+    job.last_error = ''
+    job.save(update_fields=['status', 'finished_at', 'last_error'])
+    Ticket.objects.filter(id=job.ticket_id, image=job.image_name).update(image_variants_ready=True)
+
+
+def fail(job, error):
+    """
+    Enregistre l'échec d'une tâche et la reprogramme si des tentatives restent.
+
+    Le délai avant la tentative suivante double à chaque échec.
+
+    Args:
+        job (ImageJob): La tâche en échec
+        error (Exception): L'erreur rencontrée
+    """
+    job.last_error = f"{type(error).__name__}: {error}"
+    if job.attempts >= IMAGE_JOB_MAX_ATTEMPTS:
+        job.status = ImageJob.FAILED
+        job.finished_at = timezone.now()
+    else:
+        job.status = ImageJob.PENDING
+        job.run_after = timezone.now() + timedelta(seconds=2 ** job.attempts)
+    job.save(update_fields=['status', 'last_error', 'run_after', 'finished_at'])
+
+
+def requeue_stale():
+    """
+    Remet en attente les tâches restées en cours au-delà de IMAGE_JOB_TIMEOUT,
+    par exemple après l'arrêt brutal d'un worker. Les tâches ayant épuisé
+    leurs tentatives sont marquées comme échouées.
+
+    Returns:
+        int: Nombre de tâches remises en attente
+    """
+    now = timezone.now()
+    stale = ImageJob.objects.filter(status=ImageJob.RUNNING, started_at__lt=now - timedelta(seconds=IMAGE_JOB_TIMEOUT))
+    stale.filter(attempts__gte=IMAGE_JOB_MAX_ATTEMPTS).update(
+        status=ImageJob.FAILED, finished_at=now, last_error='Délai de traitement dépassé'
+    )
+    return stale.update(status=ImageJob.PENDING, run_after=now)
+
+
+def stats(window=timedelta(hours=1)):
+    """
+    Retourne l'état de la file et le débit de traitement récent.
+
+    Args:
+        window (timedelta): Période sur laquelle calculer le débit
+
+    Returns:
+        dict: Nombre de tâches par état, tâches terminées sur la période,
+              débit (tâches par minute) et durée moyenne d'une tâche (secondes)
+    """
+    counts = dict(ImageJob.objects.values_list('status').annotate(total=Count('id')).order_by())
+    recent = ImageJob.objects.filter(status=ImageJob.DONE, finished_at__gte=timezone.now() - window)
+    aggregate = recent.aggregate(total=Count('id'), duration=Avg(F('finished_at') - F('started_at')))
+    average = aggregate['duration']
+    return {
+        'by_status': {status: counts.get(status, 0) for status, _ in ImageJob.STATUSES},
+        'done_in_window': aggregate['total'],
+        'jobs_per_minute': aggregate['total'] / (window.total_seconds() / 60),
+        'average_seconds': average.total_seconds() if average else None,
+    }
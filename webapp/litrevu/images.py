@@ -0,0 +1,128 @@
+import os
+from io import BytesIO
+from PIL import Image, ImageOps
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from .constants import THUMBNAIL_WIDTHS, THUMBNAIL_QUALITY
+
+
+def variant_name(name, width):
+    """
+    Retourne le chemin de la déclinaison d'une image pour une largeur donnée.
+
+    La déclinaison est stockée à côté de l'original : "couverture.jpg"
+    devient "couverture_w320.jpg". Les déclinaisons sont écrites telles quelles
+    dans le stockage par défaut (MEDIA_ROOT), y compris pour les originaux du
+    stockage adressé par contenu, qui partage ce répertoire.
+
+    Args:
+        name (str): Chemin de l'image originale dans le stockage
+        width (int): Largeur de la déclinaison
+
+    Returns:
+        str: Chemin de la déclinaison
+    """
+    root, ext = os.path.splitext(name)
+    return f'{root}_w{width}{ext}'
+
+
+def _encode_variant(image, image_format, width):
+    """Réduit une image décodée à la largeur demandée et la ré-encode sans métadonnées."""
+    variant = image.copy()
+    variant.thumbnail((width, variant.height))
+    if image_format == 'JPEG' and variant.mode not in ('RGB', 'L'):
+        variant = variant.convert('RGB')
+    buffer = BytesIO()
+    variant.save(buffer, format=image_format, quality=THUMBNAIL_QUALITY, optimize=True)
+    return ContentFile(buffer.getvalue())
+
+
+def _open_original(storage, name):
+    """Décode l'image originale en appliquant son orientation EXIF."""
+    with storage.open(name, 'rb') as original:
+        image = Image.open(original)
+        image_format = image.format or 'JPEG'
+        image = ImageOps.exif_transpose(image)
+        image.load()
+    return image, image_format
+
+
+def create_variant(image_file, width):
+    """
+    Génère avec Pillow la déclinaison d'une image et l'enregistre dans le stockage.
+
+    L'image est réduite à la largeur demandée en conservant ses proportions et
+    son format ; une image plus étroite n'est jamais agrandie.
+
+    Args:
+        image_file (ImageFieldFile): Image originale (par ex. ticket.image)
+        width (int): Largeur de la déclinaison
+
+    Returns:
+        str: Chemin de la déclinaison enregistrée
+    """
+    image, image_format = _open_original(image_file.storage, image_file.name)
+    return default_storage.save(
+        variant_name(image_file.name, width), _encode_variant(image, image_format, width)
+    )
+
+
+def generate_variants(name, widths=THUMBNAIL_WIDTHS):
+    """
+    Génère toutes les déclinaisons manquantes d'une image du stockage par défaut.
+
+    L'original n'est décodé qu'une fois. Cette fonction n'accède pas à la base
+    de données : elle est exécutée par les processus de process_image_jobs.
+
+    Args:
+        name (str): Chemin de l'image originale dans le stockage
+        widths (tuple): Largeurs des déclinaisons
+
+    Returns:
+        list: Chemins des déclinaisons créées
+    """
+    missing = [width for width in widths if not default_storage.exists(variant_name(name, width))]
+    if not missing:
+        return []
+    image, image_format = _open_original(default_storage, name)
+    return [
+        default_storage.save(variant_name(name, width), _encode_variant(image, image_format, width))
+        for width in missing
+    ]
+
+
+def variant_url(image_file, width):
+    """
+    Retourne l'URL de la déclinaison d'une image, en la créant si elle manque.
+
+    Si la déclinaison ne peut pas être générée (fichier absent ou illisible),
+    l'URL de l'original est retournée.
+
+    Args:
+        image_file (ImageFieldFile): Image originale
+        width (int): Largeur de la déclinaison
+
+    Returns:
+        str: URL de la déclinaison ou de l'original
+    """
+    name = variant_name(image_file.name, width)
+    if not default_storage.exists(name):
+        try:
+            name = create_variant(image_file, width)
+        except OSError:
+            return image_file.url
+    return default_storage.url(name)
+
+
+def variant_urls(image_file, widths=THUMBNAIL_WIDTHS):
+    """
+    Retourne les URL de toutes les déclinaisons d'une image.
+
+    Args:
+        image_file (ImageFieldFile): Image originale
+        widths (tuple): Largeurs des déclinaisons
+
+    Returns:
+        list: Couples (largeur, url) par largeur croissante
+    """
+    return [(width, variant_url(image_file, width)) for width in sorted(widths)]
@@ -0,0 +1,340 @@
+import csv
+import json
+from collections import Counter
+from contextlib import contextmanager
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from .follows import recount as recount_follows
+from .review_stats import recount as recount_review_stats
+from . import covers, feed_cache, timeline
+from .forms import TicketForm, ReviewForm
+from .models import Ticket, Review, UserFollows, ImportRun, ImportedTicket
+
+
+class RowError(Exception):
+    """Erreur de validation d'une ligne importée."""
+
+
+def read_ndjson(stream):
+    """
+    Lit un fichier NDJSON ligne à ligne.
+
+    Yields:
+        tuple: (numéro de ligne, enregistrement) ; l'enregistrement vaut None
+               si la ligne n'est pas un objet JSON valide
+    """
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            record = None
+        yield line_number, record if isinstance(record, dict) else None
+
+
+def read_csv(stream):
+    """
+    Lit un fichier CSV avec en-tête, ligne à ligne.
+
+    Yields:
+        tuple: (numéro de ligne, enregistrement)
+    """
+    for line_number, row in enumerate(csv.DictReader(stream), start=2):
+        # Les cellules vides du CSV équivalent à des champs absents
+        yield line_number, {key: value for key, value in row.items() if value not in ('', None)}
+
+
+READERS = {
+    'ndjson': read_ndjson,
+    'csv': read_csv,
+}
+
+
+@contextmanager
+def preserve_time_created():
+    """
+    Désactive temporairement auto_now_add sur Ticket et Review afin que
+    bulk_create conserve les dates de création du fichier importé.
+    """
+    fields = [Ticket._meta.get_field('time_created'), Review._meta.get_field('time_created')]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+def _time_created(record):
+    """Retourne la date de création d'un enregistrement, ou maintenant si absente."""
+    value = record.get('time_created')
+    if not value:
+        return timezone.now()
+    parsed = parse_datetime(value)
+    if parsed is None:
+        raise RowError(f"date invalide : {value}")
+    return parsed if timezone.is_aware(parsed) else timezone.make_aware(parsed)
+
+
+def _form_errors(form):
+    return '; '.join(f"{field} : {' '.join(errors)}" for field, errors in form.errors.items())
+
+
+class Importer:
+    """
+    Importe des tickets, critiques et abonnements par lots transactionnels.
+
+    Chaque ligne est validée avec les règles de TicketForm ou ReviewForm, puis
+    les lignes valides d'un lot sont écrites par bulk_create dans une seule
+    transaction, avec le point de reprise de l'import. bulk_create n'envoyant pas
+    de signaux, la même transaction compte les références des couvertures,
+    complète la timeline et invalide le cache des flux concernés : un import
+    interrompu laisse ces données cohérentes avec les lots déjà validés.
+
+    Attributes:
+        run (ImportRun): Point de reprise de l'import
+        create_users (bool): Créer les utilisateurs inconnus (sans mot de passe utilisable)
+        default_user (str): Auteur des lignes sans champ 'user', comme celles produites par export_user
+        errors (list): Couples (numéro de ligne, message) des lignes rejetées du dernier lot
+        author_ids (set): Utilisateurs dont des posts ou abonnements ont été importés dans le dernier lot
+    """
+
+    def __init__(self, run, create_users=False, default_user=None):
+        self.run = run
+        self.create_users = create_users
+        self.default_user = default_user
+        self.errors = []
+        self.author_ids = set()
+
+    def import_batch(self, rows):
+        """
+        Valide et écrit un lot de lignes, puis avance le point de reprise.
+
+        Args:
+            rows (list): Couples (numéro de ligne, enregistrement) lus dans le fichier
+
+        Returns:
+            int: Nombre de lignes importées
+        """
+        self.errors = []
+        self.author_ids = set()
+        with transaction.atomic():
+            users = self._resolve_users(rows)
+            imported = self._import_tickets(rows, users)
+            imported += self._import_reviews(rows, users)
+            imported += self._import_follows(rows, users)
+            self._reject_unknown_types(rows)
+            self._invalidate_feeds()
+
+            self.run.rows_done += len(rows)
+            self.run.rows_imported += imported
+            self.run.rows_rejected += len(self.errors)
+            self.run.save(update_fields=['rows_done', 'rows_imported', 'rows_rejected', 'time_updated'])
+        return imported
+
+    def _invalidate_feeds(self):
+        """Invalide le cache de flux des auteurs du lot et de leurs abonnés."""
+        if not self.author_ids:
+            return
+        followers = UserFollows.objects.filter(followed_user__in=self.author_ids).values_list('user', flat=True)
+        feed_cache.invalidate(set(followers) | self.author_ids)
+
+    def _reject(self, line_number, message):
+        self.errors.append((line_number, message))
+
+    def _resolve_users(self, rows):
+        """Résout en une requête les noms d'utilisateurs du lot."""
+        usernames = {self.default_user} if self.default_user else set()
+        for _, record in rows:
+            if record:
+                usernames.update(
+                    value for value in (record.get('user'), record.get('followed_user')) if value
+                )
+        users = dict(User.objects.filter(username__in=usernames).values_list('username', 'id'))
+        missing = usernames - set(users)
+        if missing and self.create_users:
+            User.objects.bulk_create(
+                [User(username=username, password=make_password(None)) for username in sorted(missing)],
+                ignore_conflicts=True
+            )
+            users.update(User.objects.filter(username__in=missing).values_list('username', 'id'))
+        return users
+
+    def _user_id(self, users, record, key='user'):
+        username = record.get(key) or (self.default_user if key == 'user' else None)
+        user_id = users.get(username)
+        if user_id is None:
+            raise RowError(f"utilisateur inconnu : {username}")
+        return user_id
+
+    def _skip_existing(self, candidates, existing, key, message):
+        """
+        Rejette les lignes déjà présentes en base ou en double dans le lot.
+
+        Les lignes restantes sont insérées sans ignore_conflicts : bulk_create
+        renvoie ainsi leurs identifiants et le nombre de lignes importées est
+        exact. Un doublon écrit entre-temps par un autre processus annule le lot,
+        qui est rejoué à la reprise de l'import.
+
+        Args:
+            candidates (list): Couples (numéro de ligne, objet) validés
+            existing (iterable): Clés déjà présentes en base
+            key (callable): Clé d'unicité d'un objet
+            message (str): Motif du rejet
+
+        Returns:
+            list: Objets à insérer
+        """
+        seen = set(existing)
+        kept = []
+        for line_number, instance in candidates:
+            if key(instance) in seen:
+                self._reject(line_number, message)
+                continue
+            seen.add(key(instance))
+            kept.append(instance)
+        return kept
+
+    def _rows_of_type(self, rows, record_type):
+        for line_number, record in rows:
+            if record is not None and record.get('type') == record_type:
+                yield line_number, record
+
+    def _import_tickets(self, rows, users):
+        tickets, source_ids = [], []
+        for line_number, record in self._rows_of_type(rows, 'TICKET'):
+            try:
+                form = TicketForm(data={
+                    'title': record.get('title', ''),
+                    'description': record.get('description', ''),
+                })
+                if not form.is_valid():
+                    raise RowError(_form_errors(form))
+                ticket = form.save(commit=False)
+                ticket.user_id = self._user_id(users, record)
+                ticket.time_created = _time_created(record)
+                # Chemin d'une image déjà présente dans le stockage
+                ticket.image = record.get('image') or None
+            except RowError as error:
+                self._reject(line_number, str(error))
+                continue
+            tickets.append(ticket)
+            source_ids.append(record.get('id'))
+
+        Ticket.objects.bulk_create(tickets)
+        timeline.add_posts(tickets=tickets)
+        ImportedTicket.objects.bulk_create([
+            ImportedTicket(run=self.run, source_id=str(source_id), ticket=ticket)
+            for ticket, source_id in zip(tickets, source_ids) if source_id is not None
+        ], ignore_conflicts=True)
+        # Une référence par ticket, comme le ferait le signal post_save de Ticket
+        for name, count in Counter(ticket.image.name for ticket in tickets if ticket.image).items():
+            covers.acquire(name, count)
+        self.author_ids.update(ticket.user_id for ticket in tickets)
+        return len(tickets)
+
+    def _import_reviews(self, rows, users):
+        records = list(self._rows_of_type(rows, 'REVIEW'))
+        references = {str(record.get('ticket_id')) for _, record in records}
+        # Les tickets du même lot ont déjà été écrits : une seule requête suffit
+        ticket_ids = dict(ImportedTicket.objects.filter(
+            run=self.run, source_id__in=references
+        ).values_list('source_id', 'ticket_id'))
+
+        candidates = []
+        for line_number, record in records:
+            try:
+                form = ReviewForm(data={
+                    'headline': record.get('headline', ''),
+                    'rating': str(record.get('rating', '')),
+                    'body': record.get('body', ''),
+                })
+                if not form.is_valid():
+                    raise RowError(_form_errors(form))
+                review = form.save(commit=False)
+                review.user_id = self._user_id(users, record)
+                review.ticket_id = ticket_ids.get(str(record.get('ticket_id')))
+                if review.ticket_id is None:
+                    raise RowError(f"ticket inconnu : {record.get('ticket_id')}")
+                review.time_created = _time_created(record)
+            except RowError as error:
+                self._reject(line_number, str(error))
+                continue
+            candidates.append((line_number, review))
+
+        existing = Review.objects.filter(
+            ticket_id__in={review.ticket_id for _, review in candidates},
+            user_id__in={review.user_id for _, review in candidates},
+        ).values_list('ticket_id', 'user_id')
+        reviews = self._skip_existing(
+            candidates, existing, lambda review: (review.ticket_id, review.user_id),
+            "critique déjà publiée par cet utilisateur pour ce ticket"
+        )
+
+        Review.objects.bulk_create(reviews)
+        # bulk_create n'envoie pas de signaux : recalcule les statistiques et publie les critiques dans le même lot
+        recount_review_stats({review.ticket_id for review in reviews})
+        timeline.add_posts(reviews=reviews)
+        self.author_ids.update(review.user_id for review in reviews)
+        return len(reviews)
+
+    def _import_follows(self, rows, users):
+        candidates = []
+        for line_number, record in self._rows_of_type(rows, 'FOLLOW'):
+            try:
+                user_id = self._user_id(users, record)
+                followed_id = self._user_id(users, record, key='followed_user')
+                if user_id == followed_id:
+                    raise RowError("un utilisateur ne peut pas se suivre lui-même")
+            except RowError as error:
+                self._reject(line_number, str(error))
+                continue
+            candidates.append((line_number, UserFollows(user_id=user_id, followed_user_id=followed_id)))
+
+        existing = UserFollows.objects.filter(
+            user_id__in={follow.user_id for _, follow in candidates},
+            followed_user_id__in={follow.followed_user_id for _, follow in candidates},
+        ).values_list('user_id', 'followed_user_id')
+        follows = self._skip_existing(
+            candidates, existing, lambda follow: (follow.user_id, follow.followed_user_id),
+            "abonnement déjà existant"
+        )
+
+        UserFollows.objects.bulk_create(follows)
+        # bulk_create n'envoie pas de signaux : recompte les abonnements et complète les flux dans le même lot
+        recount_follows({follow.user_id for follow in follows} | {follow.followed_user_id for follow in follows})
+        timeline.add_follows(follows)
+        self.author_ids.update(follow.user_id for follow in follows)
+        return len(follows)
+
+    def _reject_unknown_types(self, rows):
+        for line_number, record in rows:
+            if record is None:
+                self._reject(line_number, "ligne illisible")
+            elif record.get('type') not in ('TICKET', 'REVIEW', 'FOLLOW'):
+                self._reject(line_number, f"type inconnu : {record.get('type')}")
+
+
+def get_run(name, restart=False):
+    """
+    Retourne le point de reprise d'un import, en le réinitialisant si demandé.
+
+    Args:
+        name (str): Identifiant de l'import
+        restart (bool): Repartir du début du fichier
+
+    Returns:
+        ImportRun: Le point de reprise
+    """
+    run, _ = ImportRun.objects.get_or_create(name=name)
+    if restart:
+        run.tickets.all().delete()
+        run.rows_done = run.rows_imported = run.rows_rejected = 0
+        run.finished = False
+        run.save()
+    return run
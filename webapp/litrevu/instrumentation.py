@@ -0,0 +1,198 @@
+import bisect
+import threading
+import time
+from contextvars import ContextVar
+from django.template.backends.django import DjangoTemplates
+
+# Bornes des histogrammes, dans l'unité de chaque métrique
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200)
+ALLOCATION_BUCKETS = (1000, 5000, 10000, 50000, 100000, 500000)
+
+# Métriques agrégées : nom -> (bornes, description)
+METRICS = {
+    'request_duration_seconds': (DURATION_BUCKETS, "Durée totale de la requête"),
+    'view_duration_seconds': (DURATION_BUCKETS, "Durée de la vue, middlewares internes compris"),
+    'db_duration_seconds': (DURATION_BUCKETS, "Temps passé dans les requêtes SQL"),
+    'db_queries': (QUERY_BUCKETS, "Nombre de requêtes SQL"),
+    'template_duration_seconds': (DURATION_BUCKETS, "Temps de rendu des gabarits"),
+    'allocated_blocks': (ALLOCATION_BUCKETS, "Variation du nombre de blocs mémoire alloués par Python"),
+}
+
+# Préfixe des métriques exposées au format Prometheus
+PROMETHEUS_PREFIX = 'litrevu_'
+
+
+class RequestMetrics:
+    """
+    Mesures collectées pendant une requête.
+
+    Attributes:
+        db_queries (int): Nombre de requêtes SQL
+        db_time (float): Temps passé dans les requêtes SQL (secondes)
+        template_time (float): Temps de rendu des gabarits (secondes)
+        template_depth (int): Profondeur des rendus en cours, pour ne pas compter deux fois un rendu imbriqué
+        view_start (float): Instant d'appel de la vue, None avant la résolution de l'URL
+    """
+    __slots__ = ('db_queries', 'db_time', 'template_time', 'template_depth', 'view_start')
+
+    def __init__(self):
+        self.db_queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self.template_depth = 0
+        self.view_start = None
+
+
+# Mesures de la requête en cours d'exécution dans ce thread ou cette tâche
+current = ContextVar('litrevu_request_metrics', default=None)
+
+
+def record_query(execute, sql, params, many, context):
+    """
+    Enveloppe d'exécution SQL (connection.execute_wrapper) comptant et chronométrant les requêtes.
+    """
+    metrics = current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.db_time += time.perf_counter() - start
+        metrics.db_queries += 1
+
+
+def install_query_recorder(sender, connection, **kwargs):
+    """
+    Installe record_query sur une connexion à son ouverture (signal connection_created).
+
+    L'enveloppe reste en place : hors d'une requête mesurée, elle appelle
+    directement execute. Installée à l'ouverture plutôt qu'à chaque requête,
+    elle couvre aussi les connexions ouvertes dans les threads de sync_to_async,
+    où s'exécute l'ORM des vues asynchrones.
+    """
+    if record_query not in connection.execute_wrappers:
+        # En tête de liste : connection.execute_wrapper() retire le dernier élément
+        connection.execute_wrappers.insert(0, record_query)
+
+
+class InstrumentedTemplate:
+    """Gabarit dont la méthode render() est chronométrée."""
+
+    def __init__(self, template):
+        self.template = template
+
+    def __getattr__(self, name):
+        return getattr(self.template, name)
+
+    def render(self, context=None, request=None):
+        metrics = current.get()
+        if metrics is None:
+            return self.template.render(context, request)
+        metrics.template_depth += 1
+        start = time.perf_counter()
+        try:
+            return self.template.render(context, request)
+        finally:
+            metrics.template_depth -= 1
+            if not metrics.template_depth:
+                metrics.template_time += time.perf_counter() - start
+
+
+class InstrumentedDjangoTemplates(DjangoTemplates):
+    """
+    Moteur de gabarits Django mesurant le temps de rendu pour ServerTimingMiddleware.
+
+    À utiliser comme BACKEND dans TEMPLATES ; en dehors d'une requête mesurée,
+    il se comporte exactement comme DjangoTemplates.
+    """
+
+    def from_string(self, template_code):
+        return InstrumentedTemplate(super().from_string(template_code))
+
+    def get_template(self, template_name):
+        return InstrumentedTemplate(super().get_template(template_name))
+
+
+class Histogram:
+    """Histogramme cumulatif au sens de Prometheus."""
+    __slots__ = ('buckets', 'counts', 'total', 'count')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+
+class Registry:
+    """
+    Histogrammes des mesures par nom d'URL, propres au processus.
+
+    Chaque worker tient ses propres histogrammes ; Prometheus agrège les workers
+    s'ils sont interrogés séparément.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}
+
+    def observe(self, view_name, values):
+        """
+        Ajoute les mesures d'une requête.
+
+        Args:
+            view_name (str): Nom de l'URL résolue
+            values (dict): Valeur de chaque métrique de METRICS
+        """
+        with self._lock:
+            histograms = self._histograms.get(view_name)
+            if histograms is None:
+                histograms = self._histograms[view_name] = {
+                    name: Histogram(buckets) for name, (buckets, _) in METRICS.items()
+                }
+            for name, value in values.items():
+                histograms[name].observe(value)
+
+    def clear(self):
+        with self._lock:
+            self._histograms.clear()
+
+    def prometheus(self):
+        """
+        Sérialise les histogrammes au format texte de Prometheus.
+
+        Returns:
+            str: Une ligne # HELP et # TYPE par métrique, puis les séries de chaque vue
+        """
+        with self._lock:
+            snapshot = {
+                view_name: {name: (list(h.counts), h.total, h.count) for name, h in histograms.items()}
+                for view_name, histograms in sorted(self._histograms.items())
+            }
+
+        lines = []
+        for name, (buckets, description) in METRICS.items():
+            metric = PROMETHEUS_PREFIX + name
+            lines.append(f'# HELP {metric} {description}')
+            lines.append(f'# TYPE {metric} histogram')
+            for view_name, histograms in snapshot.items():
+                counts, total, count = histograms[name]
+                label = view_name.replace('\\', '\\\\').replace('"', '\\"')
+                cumulative = 0
+                for bound, bucket_count in zip(buckets, counts):
+                    cumulative += bucket_count
+                    lines.append(f'{metric}_bucket{{view="{label}",le="{bound}"}} {cumulative}')
+                lines.append(f'{metric}_bucket{{view="{label}",le="+Inf"}} {count}')
+                lines.append(f'{metric}_sum{{view="{label}"}} {total:g}')
+                lines.append(f'{metric}_count{{view="{label}"}} {count}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
@@ -0,0 +1,229 @@
+import asyncio
+import json
+import threading
+from contextlib import asynccontextmanager
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.utils.module_loading import import_string
+from .constants import LIVE_QUEUE_SIZE, LIVE_MAX_CONNECTIONS
+
+# Événement envoyé à un abonné dont la file a débordé : il doit recharger son flux
+RESYNC = {'type': 'RESYNC'}
+
+
+class TooManyConnections(Exception):
+    """Le nombre maximum de connexions en direct de ce processus est atteint."""
+
+
+class Subscription:
+    """
+    File d'événements d'une connexion en direct, consommée par sa boucle asyncio.
+
+    La file est bornée : si le client ne lit pas assez vite, les événements en
+    attente sont remplacés par un unique RESYNC (contre-pression), plutôt que
+    de laisser la mémoire croître.
+
+    Attributes:
+        user_id (int): Utilisateur connecté
+        queue (asyncio.Queue): Événements en attente d'envoi
+        loop (AbstractEventLoop): Boucle qui consomme la file
+    """
+
+    def __init__(self, user_id, queue_size=LIVE_QUEUE_SIZE):
+        self.user_id = user_id
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.loop = asyncio.get_running_loop()
+
+    def push(self, event):
+        """Ajoute un événement à la file ; à appeler depuis la boucle de l'abonnement."""
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC)
+
+    def push_threadsafe(self, event):
+        """Ajoute un événement à la file depuis n'importe quel thread."""
+        try:
+            self.loop.call_soon_threadsafe(self.push, event)
+        except RuntimeError:
+            # La boucle est fermée : la connexion est terminée
+            pass
+
+    async def get(self, timeout):
+        """
+        Attend le prochain événement.
+
+        Args:
+            timeout (float): Délai d'attente en secondes
+
+        Returns:
+            dict: L'événement, ou None si le délai a expiré
+        """
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class LocalBroker:
+    """
+    Diffusion des événements entre les connexions d'un même processus.
+
+    Convient à un seul processus serveur ; avec plusieurs processus, un
+    backend s'appuyant sur un broker (Redis, PostgreSQL LISTEN/NOTIFY...)
+    implémente les mêmes méthodes publish() et subscribe() et se déclare
+    dans le réglage LIVE_EVENTS_BACKEND.
+
+    Attributes:
+        max_connections (int): Nombre maximum de connexions simultanées
+        queue_size (int): Taille de la file de chaque connexion
+    """
+
+    def __init__(self, max_connections=LIVE_MAX_CONNECTIONS, queue_size=LIVE_QUEUE_SIZE):
+        self.max_connections = max_connections
+        self.queue_size = queue_size
+        self._subscriptions = {}
+        self._count = 0
+        # publish() est appelé depuis les threads des vues synchrones
+        self._lock = threading.Lock()
+
+    @property
+    def connections(self):
+        """Nombre de connexions ouvertes."""
+        return self._count
+
+    def publish(self, user_ids, event):
+        """
+        Envoie un événement aux connexions ouvertes des utilisateurs donnés.
+
+        Args:
+            user_ids (iterable): Destinataires
+            event (dict): Événement sérialisable en JSON
+        """
+        with self._lock:
+            targets = [
+                subscription
+                for user_id in user_ids
+                for subscription in self._subscriptions.get(user_id, ())
+            ]
+        for subscription in targets:
+            subscription.push_threadsafe(event)
+
+    @asynccontextmanager
+    async def subscribe(self, user_id):
+        """
+        Ouvre une connexion en direct pour un utilisateur.
+
+        Args:
+            user_id (int): Utilisateur connecté
+
+        Yields:
+            Subscription: La file des événements destinés à l'utilisateur
+
+        Raises:
+            TooManyConnections: Si max_connections connexions sont déjà ouvertes
+        """
+        subscription = Subscription(user_id, self.queue_size)
+        with self._lock:
+            if self._count >= self.max_connections:
+                raise TooManyConnections
+            self._count += 1
+            self._subscriptions.setdefault(user_id, set()).add(subscription)
+        try:
+            yield subscription
+        finally:
+            with self._lock:
+                self._count -= 1
+                subscriptions = self._subscriptions.get(user_id)
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[user_id]
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def is_enabled():
+    """
+    Indique si les événements en direct sont activés.
+
+    Returns:
+        bool: Valeur du paramètre LIVE_EVENTS (True par défaut)
+    """
+    return getattr(settings, 'LIVE_EVENTS', True)
+
+
+def is_available(request):
+    """
+    Indique si la page rendue pour cette requête doit ouvrir la connexion en direct.
+
+    Sous WSGI, /live/ répond 501 : la page n'inclut alors pas le script
+    EventSource, qui sinon tenterait de se reconnecter indéfiniment.
+
+    Args:
+        request (HttpRequest): L'objet requête HTTP
+
+    Returns:
+        bool: True si LIVE_EVENTS est activé et la requête servie par ASGI
+    """
+    return is_enabled() and isinstance(request, ASGIRequest)
+
+
+def get_broker():
+    """
+    Retourne le backend de diffusion du processus, créé au premier appel.
+
+    La classe est lue dans le réglage LIVE_EVENTS_BACKEND (par défaut LocalBroker).
+
+    Returns:
+        Le backend de diffusion
+    """
+    global _broker
+    with _broker_lock:
+        if _broker is None:
+            backend = getattr(settings, 'LIVE_EVENTS_BACKEND', 'litrevu.live.LocalBroker')
+            _broker = import_string(backend)()
+        return _broker
+
+
+def reset_broker():
+    """Oublie le backend courant ; le prochain appel à get_broker() en crée un nouveau."""
+    global _broker
+    with _broker_lock:
+        _broker = None
+
+
+def post_event(post, content_type):
+    """
+    Construit l'événement annonçant la publication d'un ticket ou d'une critique.
+
+    Args:
+        post (Ticket | Review): Le post publié
+        content_type (str): 'TICKET' ou 'REVIEW'
+
+    Returns:
+        dict: L'événement ; le client charge le post via l'API du flux
+    """
+    return {
+        'type': content_type,
+        'id': post.id,
+        'user_id': post.user_id,
+        'title': post.title if content_type == 'TICKET' else post.headline,
+        'time_created': post.time_created.isoformat(),
+    }
+
+
+def format_event(event):
+    """
+    Met un événement au format text/event-stream.
+
+    Args:
+        event (dict): Événement portant sa clé 'type'
+
+    Returns:
+        str: Le bloc SSE, terminé par une ligne vide
+    """
+    return f"event: {event['type'].lower()}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
@@ -0,0 +1,126 @@
+import hashlib
+import ipaddress
+import math
+import time
+from django.conf import settings
+from django.core.cache import cache
+from .constants import LOGIN_IP_BURST, LOGIN_IP_RATE, LOGIN_USERNAME_BURST, LOGIN_USERNAME_RATE, LOGIN_IPV6_PREFIX
+
+# Préfixe commun à toutes les clés de cache de la limitation des connexions
+KEY_PREFIX = 'litrevu:login'
+
+# Compteurs de tentatives refusées, par seau
+COUNTERS = ('rejected_ip', 'rejected_username')
+
+
+def _counter_key(name):
+    return f'{KEY_PREFIX}:stats:{name}'
+
+
+def _incr(name):
+    """Incrémente un compteur de tentatives refusées stocké dans le cache."""
+    key = _counter_key(name)
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Le compteur a été évincé entre add() et incr()
+        cache.set(key, 1, timeout=None)
+
+
+def is_enabled():
+    """
+    Indique si les tentatives de connexion sont limitées.
+
+    Returns:
+        bool: Valeur du paramètre LOGIN_THROTTLE (True par défaut)
+    """
+    return getattr(settings, 'LOGIN_THROTTLE', True)
+
+
+def client_ip(request):
+    """
+    Retourne l'adresse du client, regroupée par réseau /64 en IPv6.
+
+    L'adresse est lue dans request.META[LOGIN_THROTTLE_IP_HEADER] ; pour un
+    en-tête X-Forwarded-For, la dernière adresse est celle ajoutée par le proxy.
+
+    Args:
+        request (HttpRequest): L'objet requête HTTP
+
+    Returns:
+        str: Adresse IPv4, réseau IPv6, ou la valeur brute si elle n'est pas une adresse
+    """
+    header = getattr(settings, 'LOGIN_THROTTLE_IP_HEADER', 'REMOTE_ADDR')
+    value = request.META.get(header, '').split(',')[-1].strip()
+    try:
+        address = ipaddress.ip_address(value)
+    except ValueError:
+        return value
+    if address.version == 6:
+        # Un client IPv6 dispose en général de tout un /64
+        return str(ipaddress.ip_network(f'{address}/{LOGIN_IPV6_PREFIX}', strict=False))
+    return str(address)
+
+
+def _take(key, burst, rate, now):
+    """
+    Prend un jeton dans un seau stocké dans le cache.
+
+    Le seau contient au plus `burst` jetons et se remplit de `rate` jetons par
+    seconde. Une tentative refusée n'écrit rien dans le cache. La lecture puis
+    l'écriture ne sont pas atomiques : des requêtes simultanées peuvent dépasser
+    la limite de quelques tentatives.
+
+    Returns:
+        float: 0 si un jeton a été pris, sinon le délai (en secondes) avant le prochain jeton
+    """
+    tokens, updated = cache.get(key) or (burst, now)
+    tokens = min(burst, tokens + (now - updated) * rate)
+    if tokens < 1:
+        return (1 - tokens) / rate
+    # Le seau expire lorsqu'il serait de nouveau plein
+    cache.set(key, (tokens - 1, now), timeout=math.ceil(burst / rate))
+    return 0
+
+
+def check(request, username):
+    """
+    Décompte une tentative de connexion et indique si elle doit être refusée.
+
+    À appeler avant authenticate() : une tentative refusée ne calcule aucun
+    hachage de mot de passe. Le seau du nom d'utilisateur est indexé par le nom
+    saisi, sans consulter la base : la réponse est la même pour un nom existant
+    ou inconnu.
+
+    Args:
+        request (HttpRequest): L'objet requête HTTP
+        username (str): Nom d'utilisateur saisi
+
+    Returns:
+        int: 0 si la tentative est autorisée, sinon le délai (en secondes) à respecter
+    """
+    if not is_enabled():
+        return 0
+    now = time.time()
+    wait = _take(f'{KEY_PREFIX}:ip:{client_ip(request)}', LOGIN_IP_BURST, LOGIN_IP_RATE, now)
+    if wait:
+        _incr('rejected_ip')
+        return math.ceil(wait)
+    digest = hashlib.sha256((username or '').strip().casefold().encode()).hexdigest()[:32]
+    wait = _take(f'{KEY_PREFIX}:username:{digest}', LOGIN_USERNAME_BURST, LOGIN_USERNAME_RATE, now)
+    if wait:
+        _incr('rejected_username')
+        return math.ceil(wait)
+    return 0
+
+
+def stats():
+    """
+    Retourne les compteurs de tentatives de connexion refusées.
+
+    Returns:
+        dict: {'rejected_ip': int, 'rejected_username': int}
+    """
+    counters = cache.get_many([_counter_key(name) for name in COUNTERS])
+    return {name: counters.get(_counter_key(name), 0) for name in COUNTERS}
@@ -0,0 +1,69 @@
+import json
+from django.core.management.base import BaseCommand, CommandError
+from litrevu import benchmark, synthetic
+
+
+class Command(BaseCommand):
+    """
+    Commande comparant le débit des vues sous WSGI et sous ASGI à forte concurrence.
+
+    Trois modes sont mesurés : WSGI (un thread par client), ASGI avec les vues
+    synchrones, et ASGI avec les vues asynchrones (ASYNC_VIEWS). Pour chaque vue,
+    chaque mode et chaque nombre de clients simultanés, le rapport JSON donne le
+    débit en requêtes par seconde et les percentiles p50/p95/p99 des durées.
+
+    Usage:
+        python manage.py benchmark_concurrency --concurrency 100 --requests 2000
+        python manage.py benchmark_concurrency --view flux --mode wsgi --mode asgi-async --output debit.json
+        DATABASE_PROFILE=production python manage.py benchmark_concurrency --view create_ticket --mode wsgi
+    """
+    help = "Compare le débit des vues flux, posts et subscriptions sous WSGI et sous ASGI."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--view', action='append', dest='views', choices=[*benchmark.VIEWS, *benchmark.WRITE_VIEWS],
+            help="Vue à mesurer (répétable). Par défaut : flux, posts et subscriptions. "
+                 "create_ticket crée des tickets : à mesurer sur une copie de la base."
+        )
+        parser.add_argument(
+            '--mode', action='append', dest='modes', choices=list(benchmark.MODES),
+            help="Mode à mesurer (répétable). Par défaut : tous."
+        )
+        parser.add_argument('--users', type=int, default=10, help="Nombre d'utilisateurs de l'échantillon.")
+        parser.add_argument(
+            '--requests', type=int, default=500,
+            help="Nombre de requêtes par vue, par mode et par niveau de concurrence."
+        )
+        parser.add_argument(
+            '--concurrency', type=int, action='append', dest='levels',
+            help="Nombre de clients simultanés (répétable). Par défaut : 1, 8 et 32."
+        )
+        parser.add_argument(
+            '--all-users', action='store_true',
+            help="Choisir l'échantillon parmi tous les utilisateurs, pas seulement les utilisateurs synthétiques."
+        )
+        parser.add_argument('--output', help="Fichier où écrire le rapport (sortie standard par défaut).")
+
+    def handle(self, *args, **options):
+        levels = options['levels'] or benchmark.CONCURRENCY_LEVELS
+        if options['users'] < 1 or options['requests'] < 1 or min(levels) < 1:
+            raise CommandError("--users, --requests et --concurrency doivent être strictement positifs.")
+        try:
+            report = benchmark.run_concurrency(
+                views=options['views'],
+                modes=options['modes'],
+                users=options['users'],
+                requests=options['requests'],
+                levels=levels,
+                username_prefix='' if options['all_users'] else synthetic.USERNAME_PREFIX,
+            )
+        except ValueError as error:
+            raise CommandError(str(error))
+
+        content = json.dumps(report, indent=2, ensure_ascii=False)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as output:
+                output.write(content + '\n')
+            self.stdout.write(self.style.SUCCESS(f"Rapport écrit dans {options['output']}."))
+        else:
+            self.stdout.write(content)
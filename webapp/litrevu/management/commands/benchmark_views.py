@@ -0,0 +1,66 @@
+import json
+from django.core.management.base import BaseCommand, CommandError
+from litrevu import benchmark, synthetic
+
+
+class Command(BaseCommand):
+    """
+    Commande mesurant les vues principales via le client de test et produisant un rapport JSON.
+
+    Pour chaque vue, le rapport donne les percentiles p50/p95/p99 des durées, le
+    nombre de requêtes SQL par page et le pic mémoire, ainsi que la révision git
+    et le volume des données : deux rapports produits sur le même jeu de données
+    (même graine de generate_dataset) sont comparables d'un commit à l'autre.
+
+    Usage:
+        python manage.py benchmark_views --output avant.json
+        python manage.py benchmark_views --view flux --users 20 --iterations 50 --cold-cache
+    """
+    help = "Mesure les durées, requêtes SQL et mémoire des vues flux, posts et subscriptions."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--view',
+            action='append',
+            dest='views',
+            choices=benchmark.VIEWS,
+            help="Vue à mesurer (répétable). Par défaut : toutes."
+        )
+        parser.add_argument('--users', type=int, default=10, help="Nombre d'utilisateurs de l'échantillon.")
+        parser.add_argument(
+            '--iterations', type=int, default=20,
+            help="Nombre de requêtes mesurées par utilisateur et par vue."
+        )
+        parser.add_argument('--warmup', type=int, default=1, help="Requêtes non mesurées avant chaque série.")
+        parser.add_argument(
+            '--cold-cache', action='store_true',
+            help="Vider le cache avant chaque requête pour mesurer le calcul complet des pages."
+        )
+        parser.add_argument(
+            '--all-users', action='store_true',
+            help="Choisir l'échantillon parmi tous les utilisateurs, pas seulement les utilisateurs synthétiques."
+        )
+        parser.add_argument('--output', help="Fichier où écrire le rapport (sortie standard par défaut).")
+
+    def handle(self, *args, **options):
+        if options['users'] < 1 or options['iterations'] < 1 or options['warmup'] < 0:
+            raise CommandError("--users et --iterations doivent être strictement positifs.")
+        try:
+            report = benchmark.run(
+                views=options['views'],
+                users=options['users'],
+                iterations=options['iterations'],
+                warmup=options['warmup'],
+                cold_cache=options['cold_cache'],
+                username_prefix='' if options['all_users'] else synthetic.USERNAME_PREFIX,
+            )
+        except ValueError as error:
+            raise CommandError(str(error))
+
+        content = json.dumps(report, indent=2, ensure_ascii=False)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as output:
+                output.write(content + '\n')
+            self.stdout.write(self.style.SUCCESS(f"Rapport écrit dans {options['output']}."))
+        else:
+            self.stdout.write(content)
@@ -0,0 +1,83 @@
+import os
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from litrevu import covers, image_jobs
+from litrevu.constants import COVERS_DIRECTORY, THUMBNAIL_WIDTHS
+from litrevu.images import variant_name
+from litrevu.models import Ticket
+from litrevu.storage import content_digest, content_addressed_name
+
+
+class Command(BaseCommand):
+    """
+    Commande migrant les images de couverture existantes vers le stockage
+    adressé par contenu, en fusionnant les fichiers identiques.
+
+    Chaque fichier est renommé sur place sous son chemin "covers/ab/<sha256>.ext" ;
+    s'il y existe déjà, le doublon est supprimé. Les compteurs de références
+    sont ensuite recalculés.
+
+    Usage:
+        python manage.py dedupe_media
+        python manage.py dedupe_media --dry-run
+    """
+    help = "Déduplique les images de couverture existantes (stockage adressé par contenu)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help="Afficher ce qui serait fait sans rien modifier."
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        storage = Ticket._meta.get_field('image').storage
+        legacy_names = Ticket.objects.exclude(image='').exclude(image__isnull=True).exclude(
+            image__startswith=f'{COVERS_DIRECTORY}/'
+        ).values_list('image', flat=True).distinct().order_by('image')
+
+        moved = merged = missing = 0
+        bytes_saved = 0
+        for name in legacy_names.iterator():
+            if not storage.exists(name):
+                missing += 1
+                self.stderr.write(f"Fichier introuvable : {name}")
+                continue
+
+            with storage.open(name, 'rb') as original:
+                target = content_addressed_name(content_digest(original), name)
+            duplicate = storage.exists(target)
+            if duplicate:
+                merged += 1
+                bytes_saved += storage.size(name)
+            else:
+                moved += 1
+            self.stdout.write(f"{'Fusion' if duplicate else 'Renommage'} : {name} -> {target}")
+            if dry_run:
+                continue
+
+            if not duplicate:
+                os.makedirs(os.path.dirname(storage.path(target)), exist_ok=True)
+                os.replace(storage.path(name), storage.path(target))
+
+            with transaction.atomic():
+                tickets = Ticket.objects.filter(image=name)
+                ticket_ids = list(tickets.values_list('id', flat=True))
+                # update() n'envoie pas de signaux : les compteurs sont recalculés à la fin
+                tickets.update(image=target, image_variants_ready=False)
+                for ticket in Ticket.objects.filter(id__in=ticket_ids):
+                    image_jobs.enqueue(ticket)
+
+            if duplicate:
+                storage.delete(name)
+            for width in THUMBNAIL_WIDTHS:
+                storage.delete(variant_name(name, width))
+
+        if not dry_run:
+            covers.recount()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{moved} fichiers renommés, {merged} doublons fusionnés "
+            f"({bytes_saved / 1024:.0f} Ko libérés), {missing} fichiers introuvables."
+        ))
@@ -0,0 +1,52 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from litrevu import export
+from litrevu.constants import EXPORT_CHUNK_SIZE
+
+
+class Command(BaseCommand):
+    """
+    Commande exportant en flux les tickets, critiques et abonnements d'un utilisateur.
+
+    Usage:
+        python manage.py export_user alice --format csv --output alice.csv
+        python manage.py export_user alice > alice.ndjson
+    """
+    help = "Exporte les tickets, critiques et abonnements d'un utilisateur en NDJSON ou CSV."
+
+    def add_arguments(self, parser):
+        parser.add_argument('username', help="Nom de l'utilisateur à exporter.")
+        parser.add_argument(
+            '--format',
+            choices=sorted(export.FORMATS),
+            default='ndjson',
+            help="Format du fichier produit."
+        )
+        parser.add_argument(
+            '--output',
+            help="Fichier de destination (sortie standard par défaut)."
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=EXPORT_CHUNK_SIZE,
+            help="Nombre de lignes lues par requête."
+        )
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(f"L'utilisateur {options['username']} n'existe pas.")
+        if options['chunk_size'] < 1:
+            raise CommandError("--chunk-size doit être strictement positif.")
+
+        serializer = export.FORMATS[options['format']][0]
+        lines = serializer(export.export_records(user, chunk_size=options['chunk_size']))
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8', newline='') as output:
+                output.writelines(lines)
+        else:
+            for line in lines:
+                self.stdout.write(line, ending='')
@@ -0,0 +1,93 @@
+from django.core.management.base import BaseCommand, CommandError
+from litrevu import synthetic
+
+
+class Command(BaseCommand):
+    """
+    Commande générant un jeu de données synthétique reproductible pour les mesures de performance.
+
+    Les utilisateurs générés sont nommés synth_0000000, synth_0000001, ... et ont
+    tous le mot de passe "motdepasse". Leurs abonnements suivent une loi de puissance.
+
+    Usage:
+        python manage.py generate_dataset --users 10000 --tickets-per-user 10 --reviews-per-user 10
+        python manage.py generate_dataset --clear --users 1000 --seed 7
+        python manage.py generate_dataset --clear --users 0
+    """
+    help = "Génère des utilisateurs, abonnements, tickets, critiques et images synthétiques."
+
+    def add_arguments(self, parser):
+        defaults = synthetic.WorldSpec()
+        parser.add_argument('--users', type=int, default=defaults.users, help="Nombre d'utilisateurs.")
+        parser.add_argument(
+            '--mean-follows', type=float, default=defaults.mean_follows,
+            help="Nombre moyen d'abonnements par utilisateur."
+        )
+        parser.add_argument(
+            '--follow-exponent', type=float, default=defaults.follow_exponent,
+            help="Exposant de la loi de puissance de la popularité des comptes."
+        )
+        parser.add_argument(
+            '--tickets-per-user', type=int, default=defaults.tickets_per_user,
+            help="Nombre de tickets par utilisateur."
+        )
+        parser.add_argument(
+            '--reviews-per-user', type=int, default=defaults.reviews_per_user,
+            help="Nombre de critiques par utilisateur."
+        )
+        parser.add_argument(
+            '--image-ratio', type=float, default=defaults.image_ratio,
+            help="Proportion des tickets illustrés (entre 0 et 1)."
+        )
+        parser.add_argument(
+            '--distinct-images', type=int, default=defaults.distinct_images,
+            help="Nombre d'images différentes partagées par les tickets illustrés."
+        )
+        parser.add_argument(
+            '--days', type=int, default=defaults.days,
+            help="Période couverte par les dates de création, en jours."
+        )
+        parser.add_argument('--seed', type=int, default=defaults.seed, help="Graine du générateur aléatoire.")
+        parser.add_argument(
+            '--batch-size', type=int, default=synthetic.BATCH_SIZE,
+            help="Nombre de lignes insérées par requête."
+        )
+        parser.add_argument(
+            '--clear', action='store_true',
+            help="Supprimer d'abord le jeu de données synthétique existant."
+        )
+
+    def handle(self, *args, **options):
+        if options['users'] < 0 or options['tickets_per_user'] < 0 or options['reviews_per_user'] < 0:
+            raise CommandError("Les nombres d'utilisateurs, de tickets et de critiques doivent être positifs.")
+        if not 0 <= options['image_ratio'] <= 1:
+            raise CommandError("--image-ratio doit être compris entre 0 et 1.")
+        if options['batch_size'] < 1:
+            raise CommandError("--batch-size doit être strictement positif.")
+
+        if options['clear']:
+            deleted = synthetic.delete_world()
+            self.stdout.write(f"{deleted} utilisateurs synthétiques supprimés.")
+        elif synthetic.world_exists():
+            raise CommandError("Un jeu de données synthétique existe déjà : utilisez --clear pour le remplacer.")
+        if not options['users']:
+            return
+
+        spec = synthetic.WorldSpec(
+            users=options['users'],
+            mean_follows=options['mean_follows'],
+            follow_exponent=options['follow_exponent'],
+            tickets_per_user=options['tickets_per_user'],
+            reviews_per_user=options['reviews_per_user'],
+            image_ratio=options['image_ratio'],
+            distinct_images=options['distinct_images'],
+            days=options['days'],
+            seed=options['seed'],
+        )
+        stats = synthetic.generate_world(spec, batch_size=options['batch_size'], log=self.stdout.write)
+        self.stdout.write(self.style.SUCCESS(
+            f"Jeu de données généré : {stats['users']} utilisateurs, {stats['follows']} abonnements, "
+            f"{stats['tickets']} tickets ({stats['images']} illustrés), {stats['reviews']} critiques."
+        ))
+        if stats['images']:
+            self.stdout.write("Lancez process_image_jobs --enqueue-missing pour générer les déclinaisons des images.")
@@ -0,0 +1,109 @@
+import os
+import time
+from itertools import islice
+from django.core.management.base import BaseCommand, CommandError
+from litrevu.constants import IMPORT_BATCH_SIZE
+from litrevu.importer import READERS, Importer, get_run, preserve_time_created
+
+
+class Command(BaseCommand):
+    """
+    Commande important en masse des tickets, critiques et abonnements.
+
+    Le fichier (NDJSON ou CSV, au format produit par export_user) est lu au
+    fil de l'eau. Chaque lot est validé avec les règles de TicketForm et
+    ReviewForm puis écrit par bulk_create dans une transaction qui enregistre
+    aussi le point de reprise : relancer la commande reprend après le dernier
+    lot validé. Le même lot ajoute les posts et abonnements à la timeline,
+    compte les références des couvertures et invalide le cache des flux ; une
+    critique ou un abonnement déjà existant est rejeté.
+
+    Champs reconnus :
+        TICKET : type, id, user, title, description, image, time_created
+        REVIEW : type, user, ticket_id (id du ticket dans le fichier), rating, headline, body, time_created
+        FOLLOW : type, user, followed_user
+
+    Usage:
+        python manage.py import_data catalogue.ndjson --batch-size 5000
+        python manage.py import_data seed.csv --create-users --restart
+        python manage.py import_data alice.ndjson --user alice
+    """
+    help = "Importe en masse des tickets, critiques et abonnements depuis un fichier NDJSON ou CSV."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Fichier à importer.")
+        parser.add_argument(
+            '--format',
+            choices=sorted(READERS),
+            help="Format du fichier (déduit de l'extension par défaut)."
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=IMPORT_BATCH_SIZE,
+            help="Nombre de lignes écrites par transaction."
+        )
+        parser.add_argument(
+            '--name',
+            help="Identifiant du point de reprise (chemin absolu du fichier par défaut)."
+        )
+        parser.add_argument(
+            '--restart',
+            action='store_true',
+            help="Ignorer le point de reprise et repartir du début du fichier."
+        )
+        parser.add_argument(
+            '--user',
+            help="Auteur des lignes sans champ 'user' (par exemple un export de export_user)."
+        )
+        parser.add_argument(
+            '--create-users',
+            action='store_true',
+            help="Créer les utilisateurs inconnus, sans mot de passe utilisable."
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        if not os.path.exists(path):
+            raise CommandError(f"Fichier introuvable : {path}")
+        if options['batch_size'] < 1:
+            raise CommandError("--batch-size doit être strictement positif.")
+        input_format = options['format'] or os.path.splitext(path)[1].lstrip('.').lower()
+        if input_format not in READERS:
+            raise CommandError("Format inconnu : utilisez --format ndjson ou --format csv.")
+
+        run = get_run(options['name'] or os.path.abspath(path), restart=options['restart'])
+        if run.finished:
+            self.stdout.write("Ce fichier a déjà été importé (utilisez --restart pour recommencer).")
+            return
+        if run.rows_done:
+            self.stdout.write(f"Reprise après {run.rows_done} lignes déjà importées.")
+
+        importer = Importer(run, create_users=options['create_users'], default_user=options['user'])
+        processed = imported = 0
+        start = time.perf_counter()
+
+        with open(path, encoding='utf-8', newline='') as stream, preserve_time_created():
+            rows = islice(READERS[input_format](stream), run.rows_done, None)
+            while True:
+                batch = list(islice(rows, options['batch_size']))
+                if not batch:
+                    break
+                imported += importer.import_batch(batch)
+                processed += len(batch)
+                for line_number, message in importer.errors:
+                    self.stderr.write(f"Ligne {line_number} rejetée : {message}")
+
+                elapsed = time.perf_counter() - start
+                self.stdout.write(f"{run.rows_done} lignes traitées ({processed / elapsed:.0f} lignes/s)")
+
+        run.finished = True
+        run.save(update_fields=['finished', 'time_updated'])
+
+        elapsed = time.perf_counter() - start
+        rate = processed / elapsed if elapsed else 0.0
+        self.stdout.write(self.style.SUCCESS(
+            f"{imported} lignes importées, {run.rows_rejected} rejetées au total, "
+            f"{processed} lignes lues en {elapsed:.1f} s ({rate:.0f} lignes/s)."
+        ))
+        self.stdout.write("Pensez à lancer process_image_jobs --enqueue-missing si nécessaire.")
@@ -0,0 +1,141 @@
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from litrevu import image_jobs
+from litrevu.images import generate_variants
+
+
+def _init_worker():
+    """Initialise Django dans chaque processus du pool."""
+    django.setup()
+
+
+class Command(BaseCommand):
+    """
+    Commande traitant les tâches d'images (ImageJob) avec un pool de processus.
+
+    Le processus principal réserve les tâches en base et enregistre leur
+    résultat ; les processus du pool décodent et redimensionnent les images
+    sans accéder à la base.
+
+    Usage:
+        python manage.py process_image_jobs --workers 4
+        python manage.py process_image_jobs --once --workers 0
+        python manage.py process_image_jobs --stats
+    """
+    help = "Traite en arrière-plan les images envoyées (déclinaisons pour srcset)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=2,
+            help="Nombre de processus du pool (0 : traitement dans le processus courant)."
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=20,
+            help="Nombre de tâches réservées à chaque itération."
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=2.0,
+            help="Attente (en secondes) lorsque la file est vide."
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help="S'arrêter dès que la file est vide."
+        )
+        parser.add_argument(
+            '--enqueue-missing',
+            action='store_true',
+            help="Programmer d'abord les images dont les déclinaisons n'existent pas encore."
+        )
+        parser.add_argument(
+            '--stats',
+            action='store_true',
+            help="Afficher l'état de la file et le débit de la dernière heure, puis quitter."
+        )
+
+    def handle(self, *args, **options):
+        if options['stats']:
+            self.print_stats()
+            return
+        if options['workers'] < 0 or options['batch_size'] < 1:
+            raise CommandError("--workers doit être positif et --batch-size strictement positif.")
+
+        if options['enqueue_missing']:
+            self.stdout.write(f"{image_jobs.enqueue_missing()} tâches programmées.")
+
+        executor = None
+        if options['workers']:
+            # Les connexions ouvertes ne doivent pas être partagées avec les processus fils
+            connections.close_all()
+            executor = ProcessPoolExecutor(max_workers=options['workers'], initializer=_init_worker)
+
+        done = failed = 0
+        start = time.perf_counter()
+        try:
+            while True:
+                image_jobs.requeue_stale()
+                jobs = image_jobs.claim(options['batch_size'])
+                if not jobs:
+                    if options['once']:
+                        break
+                    time.sleep(options['poll_interval'])
+                    continue
+
+                for job, error in self.run_batch(executor, jobs):
+                    if error is None:
+                        image_jobs.complete(job)
+                        done += 1
+                    else:
+                        image_jobs.fail(job, error)
+                        failed += 1
+                        self.stderr.write(f"Échec de la tâche {job.id} ({job.image_name}) : {error}")
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        elapsed = time.perf_counter() - start
+        rate = done / elapsed if elapsed else 0.0
+        self.stdout.write(self.style.SUCCESS(
+            f"{done} tâches terminées, {failed} échecs en {elapsed:.1f} s ({rate:.1f} tâches/s)."
+        ))
+
+    def run_batch(self, executor, jobs):
+        """
+        Exécute un lot de tâches et produit, pour chacune, le couple (tâche, erreur).
+        """
+        if executor is None:
+            for job in jobs:
+                try:
+                    generate_variants(job.image_name)
+                except Exception as error:
+                    yield job, error
+                else:
+                    yield job, None
+            return
+
+        futures = {executor.submit(generate_variants, job.image_name): job for job in jobs}
+        for future in as_completed(futures):
+            yield futures[future], future.exception()
+
+    def print_stats(self):
+        """Affiche l'état de la file et le débit de la dernière heure."""
+        stats = image_jobs.stats()
+        for status, total in stats['by_status'].items():
+            self.stdout.write(f"{status:<8} {total}")
+        average = stats['average_seconds']
+        self.stdout.write(
+            f"Dernière heure : {stats['done_in_window']} tâches terminées "
+            f"({stats['jobs_per_minute']:.1f}/min, "
+            f"durée moyenne {'-' if average is None else f'{average:.2f} s'})."
+        )
@@ -0,0 +1,25 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+from litrevu import search
+
+
+class Command(BaseCommand):
+    """
+    Commande reconstruisant l'index plein texte (FTS5) des tickets et critiques.
+
+    L'index est tenu à jour par des triggers SQLite ; cette commande sert après
+    une restauration de la base ou une modification des paramètres de l'index.
+
+    Usage:
+        python manage.py rebuild_search_index
+    """
+    help = "Reconstruit l'index de recherche plein texte des tickets et critiques."
+
+    def handle(self, *args, **options):
+        if not search.is_available():
+            raise CommandError("La recherche plein texte nécessite SQLite (FTS5).")
+        start = time.perf_counter()
+        total = search.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f"{total} posts indexés en {time.perf_counter() - start:.1f} s."
+        ))
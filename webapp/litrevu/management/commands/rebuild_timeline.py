@@ -0,0 +1,50 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from litrevu import timeline
+from litrevu.models import FeedEntry
+
+
+class Command(BaseCommand):
+    """
+    Commande reconstruisant la timeline matérialisée (FeedEntry) à partir de zéro.
+
+    Usage:
+        python manage.py rebuild_timeline
+        python manage.py rebuild_timeline --user alice --user bob
+    """
+    help = "Reconstruit la timeline matérialisée des flux à partir des tickets, critiques et abonnements."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user',
+            action='append',
+            dest='usernames',
+            help="Nom d'utilisateur dont le flux doit être reconstruit (répétable). Par défaut : tous."
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=timeline.BATCH_SIZE,
+            help="Nombre de lignes insérées par requête."
+        )
+
+    def handle(self, *args, **options):
+        usernames = options['usernames']
+        if options['batch_size'] < 1:
+            raise CommandError("--batch-size doit être strictement positif.")
+
+        users = User.objects.order_by('id')
+        if usernames:
+            users = users.filter(username__in=usernames)
+            missing = set(usernames) - set(users.values_list('username', flat=True))
+            if missing:
+                raise CommandError(f"Utilisateurs introuvables : {', '.join(sorted(missing))}")
+
+        with transaction.atomic():
+            if not usernames:
+                # Supprime aussi les entrées orphelines éventuelles
+                FeedEntry.objects.all().delete()
+            total = timeline.rebuild(users.iterator(), batch_size=options['batch_size'])
+
+        self.stdout.write(self.style.SUCCESS(f"{total} entrées de flux écrites."))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from litrevu import follows
+
+
+class Command(BaseCommand):
+    """
+    Commande recalculant les compteurs d'abonnements et d'abonnés (FollowCounts).
+
+    Les compteurs sont tenus à jour par les signaux de UserFollows ; cette
+    commande les corrige après des écritures directes en base.
+
+    Usage:
+        python manage.py recount_follows
+    """
+    help = "Recalcule les compteurs d'abonnements et d'abonnés de tous les utilisateurs."
+
+    def handle(self, *args, **options):
+        total = follows.recount()
+        self.stdout.write(self.style.SUCCESS(f"Compteurs recalculés pour {total} utilisateurs."))
@@ -0,0 +1,36 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+from litrevu import review_stats
+from litrevu.constants import REVIEW_STATS_BATCH_SIZE
+
+
+class Command(BaseCommand):
+    """
+    Commande recalculant les statistiques des critiques de chaque ticket
+    (nombre de critiques, somme des notes et histogramme des notes).
+
+    Les statistiques sont tenues à jour par les signaux de Review ; cette
+    commande les corrige après des écritures directes en base.
+
+    Usage:
+        python manage.py recount_review_stats
+        python manage.py recount_review_stats --batch-size 5000
+    """
+    help = "Recalcule les statistiques des critiques de tous les tickets."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=REVIEW_STATS_BATCH_SIZE,
+            help=f"Nombre de tickets mis à jour par requête (défaut : {REVIEW_STATS_BATCH_SIZE})."
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError("--batch-size doit être strictement positif.")
+        start = time.perf_counter()
+        total = review_stats.recount(batch_size=options['batch_size'], log=self.stdout.write)
+        self.stdout.write(self.style.SUCCESS(
+            f"Statistiques recalculées pour {total} tickets en {time.perf_counter() - start:.1f} s."
+        ))
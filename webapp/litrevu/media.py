@@ -0,0 +1,206 @@
+import mimetypes
+import os
+import re
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe
+from .constants import COVERS_DIRECTORY, MEDIA_MAX_AGE, MEDIA_IMMUTABLE_MAX_AGE, MEDIA_CHUNK_SIZE
+
+# En-tête Range à un seul intervalle : "bytes=début-fin", "bytes=début-" ou "bytes=-longueur"
+_RANGE = re.compile(r'bytes=(\d*)-(\d*)')
+
+# Empreinte SHA-256 contenue dans le nom des images adressées par contenu (et de leurs déclinaisons)
+_DIGEST = re.compile(r'([0-9a-f]{64})(?:_w\d+)?$')
+
+
+class RangeNotSatisfiable(Exception):
+    """L'intervalle demandé commence après la fin du fichier."""
+
+
+def resolve(path):
+    """
+    Retourne le chemin absolu d'un fichier de MEDIA_ROOT.
+
+    Args:
+        path (str): Chemin relatif demandé dans l'URL
+
+    Returns:
+        str: Chemin absolu, ou None s'il sort de MEDIA_ROOT ou ne désigne pas un fichier
+    """
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+    except SuspiciousFileOperation:
+        return None
+    return full_path if os.path.isfile(full_path) else None
+
+
+def is_immutable(path):
+    """
+    Indique si un fichier ne change jamais sous ce chemin.
+
+    C'est le cas des images de couverture et de leurs déclinaisons, dont le
+    nom contient l'empreinte du contenu original (voir storage.py).
+
+    Args:
+        path (str): Chemin relatif dans MEDIA_ROOT
+
+    Returns:
+        bool: True si le fichier peut être mis en cache indéfiniment
+    """
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return path.startswith(f'{COVERS_DIRECTORY}/') and _DIGEST.match(stem) is not None
+
+
+def etag_for(path, stat):
+    """
+    Calcule l'ETag fort d'un fichier sans le lire.
+
+    Args:
+        path (str): Chemin relatif dans MEDIA_ROOT
+        stat (os.stat_result): Résultat de os.stat() sur le fichier
+
+    Returns:
+        str: L'empreinte du nom pour un fichier immuable, sinon la taille et la
+            date de modification en nanosecondes
+    """
+    if is_immutable(path):
+        return f'"{os.path.splitext(os.path.basename(path))[0]}"'
+    return f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+
+
+def parse_range(header, size):
+    """
+    Décode un en-tête Range portant sur un seul intervalle d'octets.
+
+    Args:
+        header (str): Valeur de l'en-tête Range
+        size (int): Taille du fichier
+
+    Returns:
+        tuple: (début, fin) inclus, ou None si l'en-tête est absent, invalide ou
+            demande plusieurs intervalles (le fichier entier est alors envoyé)
+
+    Raises:
+        RangeNotSatisfiable: Si l'intervalle ne recouvre aucun octet du fichier
+    """
+    match = _RANGE.fullmatch(header.strip()) if header else None
+    if match is None:
+        return None
+    raw_start, raw_end = match.groups()
+    if not raw_start:
+        if not raw_end:
+            return None
+        # Suffixe : les N derniers octets
+        length = int(raw_end)
+        if length == 0:
+            raise RangeNotSatisfiable
+        return max(size - length, 0), size - 1
+    start = int(raw_start)
+    end = min(int(raw_end), size - 1) if raw_end else size - 1
+    if raw_end and int(raw_end) < start:
+        return None
+    if start >= size:
+        raise RangeNotSatisfiable
+    return start, end
+
+
+def _if_range_matches(request, etag, last_modified):
+    """Vérifie la condition If-Range : l'intervalle n'est servi que si le fichier n'a pas changé."""
+    if_range = request.headers.get('If-Range')
+    if not if_range:
+        return True
+    if if_range.startswith('"'):
+        return if_range == etag
+    return parse_http_date_safe(if_range) == last_modified
+
+
+def _read_range(path, start, length):
+    """Lit un intervalle d'un fichier par blocs."""
+    with open(path, 'rb') as file:
+        file.seek(start)
+        while length > 0:
+            chunk = file.read(min(MEDIA_CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def _offload(path, full_path):
+    """Confie l'envoi du fichier au serveur frontal (MEDIA_SENDFILE), ou retourne None."""
+    mode = getattr(settings, 'MEDIA_SENDFILE', None)
+    if mode == 'x-sendfile':
+        response = HttpResponse()
+        response['X-Sendfile'] = full_path
+    elif mode == 'x-accel-redirect':
+        response = HttpResponse()
+        response['X-Accel-Redirect'] = settings.MEDIA_ACCEL_REDIRECT_PREFIX + path
+    else:
+        return None
+    # Le serveur frontal fixe la longueur et traite lui-même les requêtes Range
+    return response
+
+
+def _file_response(request, full_path, size, etag, last_modified):
+    """Réponse 200 avec le fichier entier, ou 206/416 pour une requête Range."""
+    try:
+        byte_range = parse_range(request.headers.get('Range'), size)
+    except RangeNotSatisfiable:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+
+    if byte_range is None or not _if_range_matches(request, etag, last_modified):
+        # FileResponse s'appuie sur wsgi.file_wrapper (sendfile) lorsque le serveur le propose
+        response = FileResponse(open(full_path, 'rb'))
+    else:
+        start, end = byte_range
+        response = StreamingHttpResponse(_read_range(full_path, start, end - start + 1), status=206)
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Content-Length'] = end - start + 1
+    response['Accept-Ranges'] = 'bytes'
+    return response
+
+
+def serve(request, path):
+    """
+    Sert un fichier de MEDIA_ROOT avec ses en-têtes de cache, ou None s'il n'existe pas.
+
+    Le fichier n'est ni lu ni haché : l'ETag et Last-Modified viennent de son
+    nom et de os.stat(). Les requêtes conditionnelles reçoivent 304, les
+    requêtes Range un seul intervalle (206). Si MEDIA_SENDFILE est défini,
+    l'envoi est délégué au serveur frontal par X-Sendfile ou X-Accel-Redirect.
+
+    Args:
+        request (HttpRequest): La requête GET ou HEAD
+        path (str): Chemin relatif demandé dans l'URL
+
+    Returns:
+        HttpResponse: La réponse 200, 206, 304, 412 ou 416, ou None
+    """
+    full_path = resolve(path)
+    if full_path is None:
+        return None
+    stat = os.stat(full_path)
+    etag = etag_for(path, stat)
+    last_modified = int(stat.st_mtime)
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = _offload(path, full_path) or _file_response(request, full_path, stat.st_size, etag, last_modified)
+
+    if response.status_code in (200, 206):
+        content_type, encoding = mimetypes.guess_type(full_path)
+        response['Content-Type'] = content_type or 'application/octet-stream'
+        if encoding:
+            response['Content-Encoding'] = encoding
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    if is_immutable(path):
+        response['Cache-Control'] = f'public, max-age={MEDIA_IMMUTABLE_MAX_AGE}, immutable'
+    else:
+        response['Cache-Control'] = f'public, max-age={MEDIA_MAX_AGE}'
+    return response
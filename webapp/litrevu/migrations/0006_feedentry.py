@@ -0,0 +1,30 @@
+# Generated by Django 5.2.1 on 2026-10-18 12:17
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('litrevu', '0005_alter_review_rating'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FeedEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('post_type', models.CharField(choices=[('TICKET', 'Ticket'), ('REVIEW', 'Critique')], max_length=6)),
+                ('post_id', models.PositiveBigIntegerField()),
+                ('time_created', models.DateTimeField()),
+                ('owner', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='feed_entries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['owner', '-time_created', '-post_id', '-post_type'], name='feed_entry_timeline_idx'), models.Index(fields=['post_type', 'post_id'], name='feed_entry_post_idx')],
+                'constraints': [models.UniqueConstraint(fields=('owner', 'post_type', 'post_id'), name='unique_feed_entry')],
+            },
+        ),
+    ]
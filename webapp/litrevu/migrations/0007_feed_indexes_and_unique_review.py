@@ -0,0 +1,45 @@
+# Generated by Django 5.2.1 on 2026-10-18 12:21
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Min
+
+
+def remove_duplicate_reviews(apps, schema_editor):
+    """Conserve uniquement la première critique de chaque paire (ticket, user)."""
+    Review = apps.get_model('litrevu', 'Review')
+    duplicates = Review.objects.values('ticket', 'user').annotate(first_id=Min('id')).filter(
+        first_id__lt=models.Max('id')
+    )
+    for duplicate in duplicates:
+        Review.objects.filter(
+            ticket=duplicate['ticket'], user=duplicate['user'], id__gt=duplicate['first_id']
+        ).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('litrevu', '0006_feedentry'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['user', '-time_created', '-id'], name='review_user_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(fields=['user', '-time_created', '-id'], name='ticket_user_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userfollows',
+            index=models.Index(fields=['followed_user', 'user'], name='userfollows_followed_idx'),
+        ),
+        migrations.RunPython(remove_duplicate_reviews, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='review',
+            constraint=models.UniqueConstraint(fields=('ticket', 'user'), name='unique_review_per_user'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.1 on 2026-10-18 12:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('litrevu', '0009_content_addressed_covers'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True)),
+                ('rows_done', models.PositiveBigIntegerField(default=0)),
+                ('rows_imported', models.PositiveBigIntegerField(default=0)),
+                ('rows_rejected', models.PositiveBigIntegerField(default=0)),
+                ('finished', models.BooleanField(default=False)),
+                ('time_created', models.DateTimeField(auto_now_add=True)),
+                ('time_updated', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ImportedTicket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source_id', models.CharField(max_length=64)),
+                ('ticket', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='litrevu.ticket')),
+                ('run', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tickets', to='litrevu.importrun')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('run', 'source_id'), name='unique_imported_ticket')],
+            },
+        ),
+    ]
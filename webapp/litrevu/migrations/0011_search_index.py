@@ -0,0 +1,87 @@
+from django.db import migrations
+
+# Index plein texte FTS5 des tickets et critiques. Le rowid encode le type du post :
+# 2 * id pour un ticket, 2 * id + 1 pour une critique, ce qui permet aux triggers de
+# retrouver une ligne par sa clé primaire sans parcourir la table.
+CREATE_SQL = [
+    """
+    CREATE VIRTUAL TABLE litrevu_search USING fts5(
+        title, body, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3'
+    )
+    """,
+    # Classement par défaut (ORDER BY rank) : un terme du titre pèse dix fois plus
+    "INSERT INTO litrevu_search(litrevu_search, rank) VALUES ('rank', 'bm25(10.0, 1.0)')",
+]
+
+# Triggers de mise à jour de l'index. SQLite les supprime lorsqu'une migration
+# reconstruit la table litrevu_ticket ou litrevu_review : une telle migration
+# doit les recréer (voir 0014_ticket_review_stats).
+TRIGGERS_SQL = [
+    """
+    CREATE TRIGGER IF NOT EXISTS litrevu_search_ticket_insert AFTER INSERT ON litrevu_ticket BEGIN
+        INSERT INTO litrevu_search(rowid, title, body) VALUES (new.id * 2, new.title, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS litrevu_search_ticket_update AFTER UPDATE OF title, description ON litrevu_ticket BEGIN
+        UPDATE litrevu_search SET title = new.title, body = new.description WHERE rowid = new.id * 2;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS litrevu_search_ticket_delete AFTER DELETE ON litrevu_ticket BEGIN
+        DELETE FROM litrevu_search WHERE rowid = old.id * 2;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS litrevu_search_review_insert AFTER INSERT ON litrevu_review BEGIN
+        INSERT INTO litrevu_search(rowid, title, body) VALUES (new.id * 2 + 1, new.headline, new.body);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS litrevu_search_review_update AFTER UPDATE OF headline, body ON litrevu_review BEGIN
+        UPDATE litrevu_search SET title = new.headline, body = new.body WHERE rowid = new.id * 2 + 1;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS litrevu_search_review_delete AFTER DELETE ON litrevu_review BEGIN
+        DELETE FROM litrevu_search WHERE rowid = old.id * 2 + 1;
+    END
+    """,
+]
+
+INDEX_SQL = [
+    # Indexe les posts existants
+    "INSERT INTO litrevu_search(rowid, title, body) SELECT id * 2, title, description FROM litrevu_ticket",
+    "INSERT INTO litrevu_search(rowid, title, body) SELECT id * 2 + 1, headline, body FROM litrevu_review",
+]
+
+DROP_SQL = [
+    "DROP TRIGGER IF EXISTS litrevu_search_ticket_insert",
+    "DROP TRIGGER IF EXISTS litrevu_search_ticket_update",
+    "DROP TRIGGER IF EXISTS litrevu_search_ticket_delete",
+    "DROP TRIGGER IF EXISTS litrevu_search_review_insert",
+    "DROP TRIGGER IF EXISTS litrevu_search_review_update",
+    "DROP TRIGGER IF EXISTS litrevu_search_review_delete",
+    "DROP TABLE IF EXISTS litrevu_search",
+]
+
+
+def _run(statements):
+    def run(apps, schema_editor):
+        # FTS5 est propre à SQLite : les autres bases n'ont pas d'index de recherche
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('litrevu', '0010_import_runs'),
+    ]
+
+    operations = [
+        migrations.RunPython(_run(CREATE_SQL + TRIGGERS_SQL + INDEX_SQL), _run(DROP_SQL)),
+    ]
@@ -0,0 +1,29 @@
+from django.conf import settings
+from django.db import migrations
+
+# Index sur lower(username) : l'autocomplétion des abonnements (litrevu/autocomplete.py)
+# y cherche un préfixe par intervalle, sans tenir compte de la casse.
+CREATE_SQL = "CREATE INDEX IF NOT EXISTS litrevu_username_lower_idx ON auth_user (lower(username))"
+
+DROP_SQL = "DROP INDEX IF EXISTS litrevu_username_lower_idx"
+
+
+def _run(statement):
+    def run(apps, schema_editor):
+        # Index sur expression dans la syntaxe SQLite, base par défaut du projet
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('litrevu', '0011_search_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(_run(CREATE_SQL), _run(DROP_SQL)),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.1 on 2026-10-18 13:13
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def count_existing_follows(apps, schema_editor):
+    """Initialise les compteurs des utilisateurs ayant déjà des abonnements ou des abonnés."""
+    UserFollows = apps.get_model('litrevu', 'UserFollows')
+    FollowCounts = apps.get_model('litrevu', 'FollowCounts')
+    counts = {}
+    for field, counter in (('user', 'following'), ('followed_user', 'followers')):
+        totals = UserFollows.objects.order_by().values_list(field).annotate(total=Count('id'))
+        for user_id, total in totals:
+            counts.setdefault(user_id, FollowCounts(user_id=user_id))
+            setattr(counts[user_id], counter, total)
+    FollowCounts.objects.bulk_create(counts.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('litrevu', '0012_username_prefix_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FollowCounts',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='follow_counts', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('following', models.PositiveIntegerField(default=0)),
+                ('followers', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(count_existing_follows, migrations.RunPython.noop),
+    ]
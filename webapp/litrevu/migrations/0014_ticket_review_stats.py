@@ -0,0 +1,86 @@
+# Generated by Django 5.2.1 on 2026-10-18 13:16
+
+from importlib import import_module
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+# Notes possibles au moment de la migration (MAX_RATING = 5)
+RATINGS = range(6)
+
+
+def restore_search_triggers(apps, schema_editor):
+    """Recrée les triggers de l'index de recherche, supprimés avec l'ancienne table litrevu_ticket."""
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in import_module('litrevu.migrations.0011_search_index').TRIGGERS_SQL:
+        schema_editor.execute(statement)
+
+
+def count_existing_reviews(apps, schema_editor):
+    """Initialise les statistiques des critiques des tickets existants."""
+    Ticket = apps.get_model('litrevu', 'Ticket')
+    Review = apps.get_model('litrevu', 'Review')
+    reviews = Review.objects.filter(ticket=OuterRef('pk')).order_by().values('ticket')
+
+    def aggregate(expression):
+        return Coalesce(Subquery(reviews.annotate(value=expression).values('value'), output_field=IntegerField()), 0)
+
+    stats = {'review_count': aggregate(Count('id')), 'rating_sum': aggregate(Sum('rating'))}
+    for rating in RATINGS:
+        stats[f'rating_{rating}_count'] = aggregate(Count('id', filter=Q(rating=rating)))
+    Ticket.objects.filter(pk__in=Review.objects.values('ticket')).update(**stats)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('litrevu', '0013_follow_counts'),
+    ]
+
+    operations = [
+        # En sens inverse, la suppression des champs reconstruit aussi la table
+        migrations.RunPython(migrations.RunPython.noop, restore_search_triggers),
+        migrations.AddField(
+            model_name='ticket',
+            name='rating_0_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='ticket',
+            name='rating_1_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='ticket',
+            name='rating_2_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='ticket',
+            name='rating_3_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='ticket',
+            name='rating_4_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='ticket',
+            name='rating_5_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='ticket',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='ticket',
+            name='review_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(restore_search_triggers, migrations.RunPython.noop),
+        migrations.RunPython(count_existing_reviews, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,7 @@
 from django.db import models
 from django.conf import settings
 from .constants import MAX_RATING
+from .storage import cover_storage
 from django.core.validators import MinValueValidator, MaxValueValidator
 
 
@@ -16,8 +17,19 @@ class Ticket(models.Model):
         title (CharField): Titre du livre ou de l'article (128 caractères max)
         description (TextField): Description détaillée du contenu (2048 caractères max, optionnel)
         user (ForeignKey): Référence à l'utilisateur qui a créé le ticket
-        image (ImageField): Image de couverture du livre (optionnelle)
+        image (ImageField): Image de couverture du livre (optionnelle), stockée sous un
+            chemin dérivé de son contenu et partagée entre tickets identiques
+        image_variants_ready (BooleanField): Indique si les déclinaisons de l'image ont été
+            générées par process_image_jobs ; sinon l'original est affiché
         time_created (DateTimeField): Date et heure de création du ticket, générées automatiquement
+        review_count (PositiveIntegerField): Nombre de critiques du ticket
+        rating_sum (PositiveIntegerField): Somme des notes de ces critiques
+        rating_<n>_count (PositiveIntegerField): Nombre de critiques ayant la note n, pour n
+            de 0 à MAX_RATING (champs ajoutés après la classe)
+
+    Note:
+        Les statistiques des critiques sont tenues à jour par des expressions F()
+        (voir litrevu/review_stats.py) : save() ne les réécrit jamais sur un ticket existant.
     """
     title = models.CharField(max_length=128)
     description = models.TextField(max_length=2048, blank=True)
@@ -25,8 +37,61 @@ class Ticket(models.Model):
         to=settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE
     )
-    image = models.ImageField(null=True, blank=True)
+    image = models.ImageField(null=True, blank=True, storage=cover_storage)
+    image_variants_ready = models.BooleanField(default=False)
     time_created = models.DateTimeField(auto_now_add=True)
+    review_count = models.PositiveIntegerField(default=0)
+    rating_sum = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            # Flux et page des posts : filtre sur l'auteur, tri décroissant par date
+            models.Index(fields=['user', '-time_created', '-id'], name='ticket_user_time_idx'),
+        ]
+
+    @staticmethod
+    def rating_field(rating):
+        """
+        Retourne le nom du champ comptant les critiques d'une note donnée.
+
+        Args:
+            rating (int): Note entre 0 et MAX_RATING
+
+        Returns:
+            str: Nom du champ, par exemple 'rating_4_count'
+        """
+        return f'rating_{rating}_count'
+
+    @classmethod
+    def review_stats_fields(cls):
+        """Retourne les noms des champs de statistiques des critiques."""
+        return ['review_count', 'rating_sum'] + [cls.rating_field(rating) for rating in range(MAX_RATING + 1)]
+
+    @property
+    def average_rating(self):
+        """Note moyenne des critiques, ou None si le ticket n'en a aucune."""
+        return self.rating_sum / self.review_count if self.review_count else None
+
+    @property
+    def rating_histogram(self):
+        """Liste des couples (note, nombre de critiques) de 0 à MAX_RATING."""
+        return [(rating, getattr(self, self.rating_field(rating))) for rating in range(MAX_RATING + 1)]
+
+    def save(self, *args, **kwargs):
+        """
+        Enregistre le ticket sans écraser les statistiques des critiques.
+
+        Sur un ticket existant, les champs de statistiques sont exclus de la mise
+        à jour : une valeur lue avant une critique concurrente ne peut pas
+        remplacer celle calculée en base.
+        """
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            stats_fields = set(self.review_stats_fields())
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in stats_fields
+            ]
+        super().save(*args, **kwargs)
 
     def __str__(self):
         """
@@ -38,6 +103,12 @@ class Ticket(models.Model):
         return f"{self.title} (par {self.user.username})"
 
 
+# Histogramme des notes : un compteur par note possible, de 0 à MAX_RATING
+for _rating in range(MAX_RATING + 1):
+    Ticket.add_to_class(Ticket.rating_field(_rating), models.PositiveIntegerField(default=0))
+del _rating
+
+
 class Review(models.Model):
     """
     Modèle représentant une critique en réponse à un ticket.
@@ -52,6 +123,10 @@ class Review(models.Model):
         headline (CharField): Titre/en-tête de la critique (128 caractères max)
         body (TextField): Corps de la critique (8192 caractères max, optionnel)
         time_created (DateTimeField): Date et heure de création de la critique, générées automatiquement
+
+    Note:
+        Une contrainte d'unicité est définie sur la paire (ticket, user)
+        pour empêcher qu'un utilisateur critique deux fois le même ticket.
     """
     ticket = models.ForeignKey(
         to=Ticket,
@@ -68,6 +143,16 @@ class Review(models.Model):
     body = models.TextField(max_length=8192, blank=True)
     time_created = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        constraints = [
+            # Un utilisateur ne peut publier qu'une seule critique par ticket
+            models.UniqueConstraint(fields=['ticket', 'user'], name='unique_review_per_user'),
+        ]
+        indexes = [
+            # Flux et page des posts : filtre sur l'auteur, tri décroissant par date
+            models.Index(fields=['user', '-time_created', '-id'], name='review_user_time_idx'),
+        ]
+
     def __str__(self):
         """
         Représentation textuelle de la critique.
@@ -107,6 +192,10 @@ class UserFollows(models.Model):
     class Meta:
         # Garantit qu'un utilisateur ne peut suivre un autre utilisateur qu'une seule fois
         unique_together = ('user', 'followed_user')
+        indexes = [
+            # Recherche des abonnés d'un utilisateur (fan-out, invalidation du cache)
+            models.Index(fields=['followed_user', 'user'], name='userfollows_followed_idx'),
+        ]
 
     def __str__(self):
         """
@@ -116,3 +205,243 @@ class UserFollows(models.Model):
             str: Description de la relation d'abonnement entre deux utilisateurs
         """
         return f"{self.user.username} is following {self.followed_user.username}"
+
+
+class FollowCounts(models.Model):
+    """
+    Compteurs d'abonnements et d'abonnés d'un utilisateur.
+
+    Tenus à jour par les signaux de UserFollows (voir litrevu/follows.py) pour
+    afficher les totaux de la page des abonnements sans COUNT(*).
+
+    Attributes:
+        user (OneToOneField): L'utilisateur concerné
+        following (PositiveIntegerField): Nombre d'utilisateurs qu'il suit
+        followers (PositiveIntegerField): Nombre d'utilisateurs qui le suivent
+    """
+    user = models.OneToOneField(
+        to=settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='follow_counts'
+    )
+    following = models.PositiveIntegerField(default=0)
+    followers = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        """
+        Représentation textuelle des compteurs.
+
+        Returns:
+            str: Le nombre d'abonnements et d'abonnés de l'utilisateur
+        """
+        return f"{self.following} abonnements, {self.followers} abonnés"
+
+
+class FeedEntry(models.Model):
+    """
+    Entrée de la timeline matérialisée d'un utilisateur (fan-out à l'écriture).
+
+    Chaque ticket ou critique visible dans le flux d'un utilisateur y est
+    représenté par une ligne, écrite par les signaux de Ticket, Review et
+    UserFollows au moment de la publication ou de l'abonnement. Le flux se lit
+    alors par un simple parcours d'index.
+
+    Attributes:
+        owner (ForeignKey): L'utilisateur propriétaire du flux
+        post_type (CharField): Type du post ('TICKET' ou 'REVIEW')
+        post_id (PositiveBigIntegerField): Identifiant du ticket ou de la critique
+        time_created (DateTimeField): Date de création du post, recopiée pour le tri
+
+    Note:
+        Le contenu de cette table peut être reconstruit entièrement avec la
+        commande `python manage.py rebuild_timeline`.
+    """
+    POST_TYPES = [
+        ('TICKET', 'Ticket'),
+        ('REVIEW', 'Critique'),
+    ]
+
+    owner = models.ForeignKey(
+        to=settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='feed_entries',
+        # Déjà couvert par la contrainte d'unicité qui commence par owner
+        db_index=False
+    )
+    post_type = models.CharField(max_length=6, choices=POST_TYPES)
+    post_id = models.PositiveBigIntegerField()
+    time_created = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            # Un post n'apparaît qu'une seule fois dans le flux d'un utilisateur
+            models.UniqueConstraint(fields=['owner', 'post_type', 'post_id'], name='unique_feed_entry'),
+        ]
+        indexes = [
+            # Index de lecture du flux : filtre sur owner, tri décroissant par date
+            models.Index(fields=['owner', '-time_created', '-post_id', '-post_type'], name='feed_entry_timeline_idx'),
+            # Index de suppression d'un post dans tous les flux
+            models.Index(fields=['post_type', 'post_id'], name='feed_entry_post_idx'),
+        ]
+
+    def __str__(self):
+        """
+        Représentation textuelle de l'entrée de flux.
+
+        Returns:
+            str: Le type et l'identifiant du post suivis du propriétaire du flux
+        """
+        return f"{self.post_type} {self.post_id} dans le flux de {self.owner.username}"
+
+
+class ImageJob(models.Model):
+    """
+    Tâche de traitement d'une image de couverture, exécutée hors requête.
+
+    Les tâches sont créées à l'envoi d'une image et traitées par le pool de
+    processus de la commande `python manage.py process_image_jobs`.
+
+    Attributes:
+        ticket (ForeignKey): Ticket dont l'image doit être traitée
+        image_name (CharField): Chemin de l'image à traiter dans le stockage
+        status (CharField): État de la tâche (en attente, en cours, terminée, échouée)
+        attempts (PositiveSmallIntegerField): Nombre de tentatives déjà effectuées
+        last_error (TextField): Message de la dernière erreur rencontrée
+        run_after (DateTimeField): Date à partir de laquelle la tâche peut être (re)tentée
+        time_created (DateTimeField): Date de création de la tâche
+        started_at (DateTimeField): Début de la dernière tentative
+        finished_at (DateTimeField): Fin du traitement
+    """
+    PENDING = 'PENDING'
+    RUNNING = 'RUNNING'
+    DONE = 'DONE'
+    FAILED = 'FAILED'
+    STATUSES = [
+        (PENDING, 'En attente'),
+        (RUNNING, 'En cours'),
+        (DONE, 'Terminée'),
+        (FAILED, 'Échouée'),
+    ]
+
+    ticket = models.ForeignKey(
+        to=Ticket,
+        on_delete=models.CASCADE,
+        related_name='image_jobs'
+    )
+    image_name = models.CharField(max_length=255)
+    status = models.CharField(max_length=7, choices=STATUSES, default=PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    run_after = models.DateTimeField(auto_now_add=True)
+    time_created = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Sélection des prochaines tâches à traiter
+            models.Index(fields=['status', 'run_after'], name='image_job_queue_idx'),
+        ]
+
+    def __str__(self):
+        """
+        Représentation textuelle de la tâche.
+
+        Returns:
+            str: L'image traitée suivie de l'état de la tâche
+        """
+        return f"{self.image_name} ({self.get_status_display()})"
+
+
+class CoverImage(models.Model):
+    """
+    Compteur de références d'une image de couverture adressée par contenu.
+
+    Plusieurs tickets peuvent partager le même fichier : celui-ci n'est supprimé
+    (avec ses déclinaisons) que lorsque plus aucun ticket ne l'utilise.
+
+    Attributes:
+        name (CharField): Chemin du fichier dans le stockage
+        ref_count (PositiveIntegerField): Nombre de tickets utilisant ce fichier
+    """
+    name = models.CharField(max_length=255, unique=True)
+    ref_count = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        """
+        Représentation textuelle de l'image.
+
+        Returns:
+            str: Le chemin du fichier suivi de son nombre de références
+        """
+        return f"{self.name} ({self.ref_count} références)"
+
+
+class ImportRun(models.Model):
+    """
+    Point de reprise d'un import en masse (commande import_data).
+
+    Attributes:
+        name (CharField): Identifiant de l'import (par défaut, le chemin du fichier importé)
+        rows_done (PositiveBigIntegerField): Nombre de lignes du fichier déjà traitées et validées
+        rows_imported (PositiveBigIntegerField): Nombre de lignes importées
+        rows_rejected (PositiveBigIntegerField): Nombre de lignes rejetées par la validation
+        finished (BooleanField): Indique si le fichier a été importé jusqu'au bout
+        time_created (DateTimeField): Date du premier lancement
+        time_updated (DateTimeField): Date du dernier lot validé
+    """
+    name = models.CharField(max_length=255, unique=True)
+    rows_done = models.PositiveBigIntegerField(default=0)
+    rows_imported = models.PositiveBigIntegerField(default=0)
+    rows_rejected = models.PositiveBigIntegerField(default=0)
+    finished = models.BooleanField(default=False)
+    time_created = models.DateTimeField(auto_now_add=True)
+    time_updated = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        """
+        Représentation textuelle de l'import.
+
+        Returns:
+            str: L'identifiant de l'import suivi du nombre de lignes traitées
+        """
+        return f"{self.name} ({self.rows_done} lignes)"
+
+
+class ImportedTicket(models.Model):
+    """
+    Correspondance entre l'identifiant d'un ticket dans un fichier importé et le ticket créé.
+
+    Permet de rattacher les critiques importées à leur ticket, y compris
+    lorsque l'import reprend après une interruption.
+
+    Attributes:
+        run (ForeignKey): L'import ayant créé le ticket
+        source_id (CharField): Identifiant du ticket dans le fichier importé
+        ticket (ForeignKey): Le ticket créé
+    """
+    run = models.ForeignKey(
+        to=ImportRun,
+        on_delete=models.CASCADE,
+        related_name='tickets'
+    )
+    source_id = models.CharField(max_length=64)
+    ticket = models.ForeignKey(
+        to=Ticket,
+        on_delete=models.CASCADE
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['run', 'source_id'], name='unique_imported_ticket'),
+        ]
+
+    def __str__(self):
+        """
+        Représentation textuelle de la correspondance.
+
+        Returns:
+            str: L'identifiant source suivi de l'identifiant du ticket créé
+        """
+        return f"{self.source_id} -> {self.ticket_id}"
@@ -0,0 +1,120 @@
+from django.db import transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
+from .models import Ticket, Review
+from .constants import MAX_RATING, REVIEW_STATS_BATCH_SIZE
+
+
+def _changes(rating, sign):
+    """Expressions F() ajoutant (sign=1) ou retirant (sign=-1) une critique des statistiques."""
+    field = Ticket.rating_field(rating)
+    return {
+        'review_count': F('review_count') + sign,
+        'rating_sum': F('rating_sum') + sign * rating,
+        field: F(field) + sign,
+    }
+
+
+def add(ticket_id, rating):
+    """
+    Compte une nouvelle critique dans les statistiques de son ticket.
+
+    Args:
+        ticket_id (int): Identifiant du ticket critiqué
+        rating (int): Note de la critique
+    """
+    Ticket.objects.filter(pk=ticket_id).update(**_changes(rating, 1))
+
+
+def remove(ticket_id, rating):
+    """
+    Retire une critique supprimée des statistiques de son ticket.
+
+    Args:
+        ticket_id (int): Identifiant du ticket critiqué
+        rating (int): Note de la critique
+    """
+    # Les conditions évitent un compteur négatif si les statistiques sont désynchronisées
+    Ticket.objects.filter(
+        pk=ticket_id, review_count__gt=0, rating_sum__gte=rating, **{f'{Ticket.rating_field(rating)}__gt': 0}
+    ).update(**_changes(rating, -1))
+
+
+def move(previous_ticket_id, previous_rating, ticket_id, rating):
+    """
+    Met à jour les statistiques après la modification d'une critique.
+
+    Args:
+        previous_ticket_id (int): Ticket critiqué avant la modification
+        previous_rating (int): Note avant la modification
+        ticket_id (int): Ticket critiqué après la modification
+        rating (int): Note après la modification
+    """
+    if (previous_ticket_id, previous_rating) == (ticket_id, rating):
+        return
+    if previous_ticket_id != ticket_id:
+        remove(previous_ticket_id, previous_rating)
+        add(ticket_id, rating)
+        return
+    # Changement de note : une seule mise à jour du ticket
+    previous_field, field = Ticket.rating_field(previous_rating), Ticket.rating_field(rating)
+    Ticket.objects.filter(pk=ticket_id, **{f'{previous_field}__gt': 0}).update(**{
+        'rating_sum': F('rating_sum') + rating - previous_rating,
+        previous_field: F(previous_field) - 1,
+        field: F(field) + 1,
+    })
+
+
+def _recomputed_stats():
+    """Sous-requêtes recalculant chaque champ de statistiques à partir de Review."""
+    reviews = Review.objects.filter(ticket=OuterRef('pk')).order_by().values('ticket')
+
+    def aggregate(expression):
+        return Coalesce(Subquery(reviews.annotate(value=expression).values('value'), output_field=IntegerField()), 0)
+
+    stats = {
+        'review_count': aggregate(Count('id')),
+        'rating_sum': aggregate(Sum('rating')),
+    }
+    for rating in range(MAX_RATING + 1):
+        stats[Ticket.rating_field(rating)] = aggregate(Count('id', filter=Q(rating=rating)))
+    return stats
+
+
+def recount(ticket_ids=None, batch_size=REVIEW_STATS_BATCH_SIZE, log=None):
+    """
+    Recalcule en base les statistiques des critiques des tickets.
+
+    Chaque lot de tickets est mis à jour par une seule requête UPDATE, dans sa
+    propre transaction. Nécessaire après une écriture par bulk_create, qui
+    n'envoie pas de signaux.
+
+    Args:
+        ticket_ids (iterable): Tickets à recalculer ; tous si None
+        batch_size (int): Nombre de tickets mis à jour par requête
+        log (callable): Fonction recevant les messages de progression
+
+    Returns:
+        int: Nombre de tickets mis à jour
+    """
+    log = log or (lambda message: None)
+    stats = _recomputed_stats()
+    if ticket_ids is None:
+        # Lots par intervalle d'identifiants, sans charger la liste des tickets
+        bounds = Ticket.objects.order_by('pk').values_list('pk', flat=True)
+        first, last = bounds.first(), bounds.last()
+        batches = [] if first is None else [
+            Q(pk__gte=start, pk__lt=start + batch_size) for start in range(first, last + 1, batch_size)
+        ]
+    else:
+        ticket_ids = sorted(set(ticket_ids))
+        batches = [
+            Q(pk__in=ticket_ids[start:start + batch_size]) for start in range(0, len(ticket_ids), batch_size)
+        ]
+
+    total = 0
+    for batch in batches:
+        with transaction.atomic():
+            total += Ticket.objects.filter(batch).update(**stats)
+        log(f"{total} tickets recalculés.")
+    return total
@@ -0,0 +1,72 @@
+from contextvars import ContextVar
+from functools import wraps
+from asgiref.sync import iscoroutinefunction
+from webapp.database import REPLICA_ALIAS
+
+# Alias vers lequel sont envoyées les lectures de la requête en cours, None hors d'une vue en lecture seule
+_read_alias = ContextVar('litrevu_read_alias', default=None)
+
+# Méthodes HTTP dont les lectures peuvent aller sur la connexion en lecture seule
+SAFE_METHODS = ('GET', 'HEAD')
+
+
+def read_only(view):
+    """
+    Décorateur envoyant les lectures d'une vue vers la connexion en lecture seule.
+
+    Seules les requêtes GET et HEAD sont concernées ; les écritures éventuelles
+    vont toujours sur la connexion principale. Sans ReadReplicaRouter dans
+    DATABASE_ROUTERS, le décorateur n'a aucun effet.
+
+    Args:
+        view (callable): Vue synchrone ou asynchrone
+
+    Returns:
+        callable: La vue décorée
+    """
+    if iscoroutinefunction(view):
+        @wraps(view)
+        async def async_wrapper(request, *args, **kwargs):
+            if request.method not in SAFE_METHODS:
+                return await view(request, *args, **kwargs)
+            token = _read_alias.set(REPLICA_ALIAS)
+            try:
+                return await view(request, *args, **kwargs)
+            finally:
+                _read_alias.reset(token)
+        return async_wrapper
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if request.method not in SAFE_METHODS:
+            return view(request, *args, **kwargs)
+        token = _read_alias.set(REPLICA_ALIAS)
+        try:
+            return view(request, *args, **kwargs)
+        finally:
+            _read_alias.reset(token)
+    return wrapper
+
+
+class ReadReplicaRouter:
+    """
+    Routeur du profil de production (voir webapp/database.py).
+
+    Les lectures des vues décorées par read_only vont sur l'alias en lecture
+    seule ; toutes les autres requêtes, et toutes les écritures, sur 'default'.
+    Les deux alias désignent le même fichier : une écriture validée est
+    immédiatement visible des lectures.
+    """
+
+    def db_for_read(self, model, **hints):
+        return _read_alias.get() or 'default'
+
+    def db_for_write(self, model, **hints):
+        # Un objet lu sur l'alias en lecture seule est enregistré sur la connexion principale
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
@@ -0,0 +1,119 @@
+import re
+from django.db import connection, transaction
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+from .models import Ticket, Review
+from .constants import SEARCH_PAGE_SIZE, SEARCH_MAX_PAGE, SEARCH_MAX_TERMS
+
+# Table virtuelle FTS5 créée par la migration 0011_search_index
+TABLE = 'litrevu_search'
+
+# Marqueurs des termes trouvés dans les extraits, remplacés par <mark> après échappement
+_MARK_START, _MARK_END = '\x02', '\x03'
+
+_TERM = re.compile(r'\w+')
+
+
+def is_available():
+    """Indique si la base de données dispose de l'index plein texte (SQLite uniquement)."""
+    return connection.vendor == 'sqlite'
+
+
+def match_expression(query):
+    """
+    Transforme la saisie de l'utilisateur en expression MATCH FTS5.
+
+    Chaque mot devient un préfixe entre guillemets : la syntaxe de requête FTS5
+    (opérateurs, colonnes) ne peut donc pas être injectée, et "dun" trouve "Dune".
+    Tous les mots doivent être présents.
+
+    Args:
+        query (str): Texte saisi
+
+    Returns:
+        str: Expression MATCH, vide si la saisie ne contient aucun mot
+    """
+    terms = _TERM.findall(query)[:SEARCH_MAX_TERMS]
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def _highlight(text):
+    """Échappe un extrait et entoure les termes trouvés de balises <mark>."""
+    return mark_safe(escape(text or '').replace(_MARK_START, '<mark>').replace(_MARK_END, '</mark>'))
+
+
+def search(query, page=1, page_size=SEARCH_PAGE_SIZE):
+    """
+    Recherche les tickets et critiques correspondant à une saisie, par pertinence.
+
+    La recherche et le classement (bm25, titre pondéré) sont réalisés par l'index
+    FTS5 ; les posts de la page sont ensuite chargés en deux requêtes.
+
+    Args:
+        query (str): Texte saisi
+        page (int): Numéro de page, de 1 à SEARCH_MAX_PAGE
+        page_size (int): Nombre de résultats par page
+
+    Returns:
+        tuple: (results, has_next) où results est la liste ordonnée de dictionnaires
+               {'content_type', 'post', 'title', 'snippet'} (titre et extrait surlignés)
+    """
+    expression = match_expression(query)
+    if not expression or not is_available() or not 1 <= page <= SEARCH_MAX_PAGE:
+        return [], False
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT rowid, highlight({TABLE}, 0, %s, %s), snippet({TABLE}, 1, %s, %s, '…', 24) "
+            f"FROM {TABLE} WHERE {TABLE} MATCH %s ORDER BY rank LIMIT %s OFFSET %s",
+            [_MARK_START, _MARK_END, _MARK_START, _MARK_END, expression, page_size + 1, (page - 1) * page_size]
+        )
+        rows = cursor.fetchall()
+    has_next = len(rows) > page_size and page < SEARCH_MAX_PAGE
+    rows = rows[:page_size]
+
+    loaded = {
+        'TICKET': Ticket.objects.select_related('user').in_bulk(
+            [rowid // 2 for rowid, _, _ in rows if rowid % 2 == 0]
+        ),
+        'REVIEW': Review.objects.select_related('user', 'ticket').in_bulk(
+            [rowid // 2 for rowid, _, _ in rows if rowid % 2 == 1]
+        ),
+    }
+    results = []
+    for rowid, title, snippet in rows:
+        content_type = 'REVIEW' if rowid % 2 else 'TICKET'
+        post = loaded[content_type].get(rowid // 2)
+        if post is None:
+            continue
+        results.append({
+            'content_type': content_type,
+            'post': post,
+            'title': _highlight(title),
+            'snippet': _highlight(snippet),
+        })
+    return results, has_next
+
+
+def rebuild():
+    """
+    Reconstruit entièrement l'index plein texte à partir des tickets et critiques.
+
+    Returns:
+        int: Nombre de posts indexés
+    """
+    if not is_available():
+        return 0
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {TABLE}")
+        cursor.execute(
+            f"INSERT INTO {TABLE}(rowid, title, body) SELECT id * 2, title, description FROM litrevu_ticket"
+        )
+        total = cursor.rowcount
+        cursor.execute(
+            f"INSERT INTO {TABLE}(rowid, title, body) SELECT id * 2 + 1, headline, body FROM litrevu_review"
+        )
+        total += cursor.rowcount
+        # Fusionne les segments de l'index pour accélérer les recherches suivantes
+        cursor.execute(f"INSERT INTO {TABLE}({TABLE}) VALUES ('optimize')")
+    return total
@@ -0,0 +1,145 @@
+import threading
+import time
+from collections import OrderedDict
+from django.conf import settings
+from django.contrib.sessions.backends import db
+from .constants import SESSION_CACHE_MAX_ENTRIES, SESSION_CACHE_TTL
+
+# Moteur de sessions activé par le réglage SESSION_LOCAL_CACHE (SESSION_ENGINE = 'litrevu.sessions').
+# Les sessions restent en base ; chaque processus garde les dernières sessions lues ou écrites
+# dans un cache LRU, et n'écrit plus la session lorsque son contenu n'a pas changé.
+
+
+class LocalSessionCache:
+    """
+    Cache LRU des sessions d'un processus, borné en taille et en durée.
+
+    Une entrée expire après `ttl` secondes, ou plus tôt à l'expiration de la
+    session. La durée bornée limite l'écart avec la base lorsqu'une session est
+    modifiée ou supprimée (déconnexion) par un autre processus.
+
+    Attributes:
+        max_entries (int): Nombre maximum de sessions gardées
+        ttl (float): Durée de vie (en secondes) d'une entrée
+    """
+
+    def __init__(self, max_entries=SESSION_CACHE_MAX_ENTRIES, ttl=SESSION_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, session_key):
+        """
+        Retourne le contenu sérialisé d'une session, ou None si elle est absente ou expirée.
+
+        Args:
+            session_key (str): Clé de la session
+
+        Returns:
+            bytes: Contenu de la session tel que produit par le sérialiseur des sessions
+        """
+        with self._lock:
+            entry = self._entries.get(session_key)
+            if entry is None:
+                return None
+            serialized, deadline = entry
+            if deadline <= time.time():
+                del self._entries[session_key]
+                return None
+            self._entries.move_to_end(session_key)
+            return serialized
+
+    def set(self, session_key, serialized, expire_date):
+        """
+        Garde le contenu d'une session, en évinçant la moins récemment utilisée si le cache est plein.
+
+        Args:
+            session_key (str): Clé de la session
+            serialized (bytes): Contenu sérialisé de la session
+            expire_date (datetime): Date d'expiration de la session
+        """
+        deadline = min(time.time() + self.ttl, expire_date.timestamp())
+        with self._lock:
+            self._entries[session_key] = (serialized, deadline)
+            self._entries.move_to_end(session_key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, session_key):
+        with self._lock:
+            self._entries.pop(session_key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+# Cache partagé par toutes les requêtes du processus
+local_cache = LocalSessionCache()
+
+
+class SessionStore(db.SessionStore):
+    """
+    Sessions en base de données, lues depuis local_cache lorsque c'est possible.
+
+    Une session trouvée dans le cache est chargée sans requête SQL. À
+    l'enregistrement, la ligne n'est pas réécrite si le contenu est identique à
+    celui du cache, sauf avec SESSION_SAVE_EVERY_REQUEST, qui repousse
+    l'expiration à chaque requête.
+    """
+
+    def load(self):
+        serialized = local_cache.get(self.session_key)
+        if serialized is not None:
+            return self.serializer().loads(serialized)
+        return self._remember(self._get_session_from_db())
+
+    async def aload(self):
+        serialized = local_cache.get(self.session_key)
+        if serialized is not None:
+            return self.serializer().loads(serialized)
+        return self._remember(await self._aget_session_from_db())
+
+    def _remember(self, session):
+        """Décode une session lue en base et la garde dans le cache local."""
+        if session is None:
+            return {}
+        data = self.decode(session.session_data)
+        local_cache.set(self.session_key, self.serializer().dumps(data), session.expire_date)
+        return data
+
+    def _unchanged(self, serialized, must_create):
+        """Indique si la ligne en base contient déjà ce contenu."""
+        if must_create or settings.SESSION_SAVE_EVERY_REQUEST:
+            return False
+        return local_cache.get(self.session_key) == serialized
+
+    def save(self, must_create=False):
+        if self.session_key is None:
+            return self.create()
+        serialized = self.serializer().dumps(self._get_session(no_load=must_create))
+        if self._unchanged(serialized, must_create):
+            return
+        super().save(must_create)
+        local_cache.set(self.session_key, serialized, self.get_expiry_date())
+
+    async def asave(self, must_create=False):
+        if self.session_key is None:
+            return await self.acreate()
+        serialized = self.serializer().dumps(await self._aget_session(no_load=must_create))
+        if self._unchanged(serialized, must_create):
+            return
+        await super().asave(must_create)
+        local_cache.set(self.session_key, serialized, await self.aget_expiry_date())
+
+    def delete(self, session_key=None):
+        local_cache.delete(session_key or self.session_key)
+        super().delete(session_key)
+
+    async def adelete(self, session_key=None):
+        local_cache.delete(session_key or self.session_key)
+        await super().adelete(session_key)
@@ -0,0 +1,202 @@
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from .models import Ticket, Review, UserFollows
+from . import autocomplete, feed_cache, covers, follows, live, review_stats, timeline
+
+
+def _announce(user_ids, event):
+    """Diffuse un événement en direct une fois la transaction validée."""
+    if user_ids:
+        transaction.on_commit(lambda: live.get_broker().publish(user_ids, event))
+
+
+@receiver([post_save, post_delete], sender=Ticket)
+def invalidate_ticket_audience(sender, instance, **kwargs):
+    """
+    Invalide le cache de l'auteur d'un ticket et de ses abonnés
+    à chaque création, modification ou suppression du ticket,
+    et annonce un nouveau ticket aux abonnés connectés en direct.
+    """
+    audience = feed_cache.audience_of(instance.user_id)
+    feed_cache.invalidate(audience)
+    if kwargs.get('created'):
+        _announce(audience - {instance.user_id}, live.post_event(instance, 'TICKET'))
+
+
+@receiver([post_save, post_delete], sender=Review)
+def invalidate_review_audience(sender, instance, **kwargs):
+    """
+    Invalide le cache de l'auteur d'une critique, de ses abonnés,
+    de l'auteur du ticket critiqué et des abonnés de ce dernier,
+    dont le flux affiche les statistiques des critiques du ticket,
+    et annonce une nouvelle critique aux lecteurs connectés en direct.
+    """
+    readers = feed_cache.audience_of(instance.user_id)
+    audience = set(readers)
+    ticket_owner = Ticket.objects.filter(pk=instance.ticket_id).values_list('user_id', flat=True).first()
+    if ticket_owner is not None:
+        audience |= feed_cache.audience_of(ticket_owner)
+        readers.add(ticket_owner)
+    feed_cache.invalidate(audience)
+    if kwargs.get('created'):
+        # La critique apparaît dans le flux des abonnés de son auteur et de l'auteur du ticket
+        _announce(readers - {instance.user_id}, live.post_event(instance, 'REVIEW'))
+
+
+@receiver([post_save, post_delete], sender=UserFollows)
+def invalidate_follower(sender, instance, **kwargs):
+    """
+    Invalide le cache du flux et les propositions d'abonnement de
+    l'utilisateur dont les abonnements ont changé.
+    """
+    feed_cache.invalidate([instance.user_id])
+    autocomplete.invalidate([instance.user_id])
+
+
+@receiver(post_save, sender=Ticket)
+def publish_ticket(sender, instance, created, **kwargs):
+    """
+    Ajoute un nouveau ticket à la timeline de son auteur et de ses abonnés.
+    """
+    if created:
+        timeline.add_ticket(instance)
+
+
+@receiver(post_save, sender=Review)
+def publish_review(sender, instance, created, **kwargs):
+    """
+    Ajoute une nouvelle critique à la timeline de ses lecteurs.
+    """
+    if created:
+        timeline.add_review(instance)
+
+
+@receiver(post_delete, sender=Ticket)
+def unpublish_ticket(sender, instance, **kwargs):
+    """
+    Retire un ticket supprimé de toutes les timelines.
+    """
+    timeline.remove_ticket(instance)
+
+
+@receiver(post_delete, sender=Review)
+def unpublish_review(sender, instance, **kwargs):
+    """
+    Retire une critique supprimée, directement ou avec son ticket, de toutes les timelines.
+    """
+    timeline.remove_review(instance)
+
+
+@receiver(post_save, sender=UserFollows)
+def fill_follower_timeline(sender, instance, created, **kwargs):
+    """
+    Ajoute à la timeline du nouvel abonné les posts existants de l'utilisateur suivi.
+    """
+    if created:
+        timeline.add_follows([instance])
+
+
+@receiver(post_delete, sender=UserFollows)
+def trim_follower_timeline(sender, instance, **kwargs):
+    """
+    Retire de la timeline de l'ancien abonné les posts qu'il ne voit plus.
+    """
+    timeline.unfollow(instance)
+
+
+@receiver(post_save, sender=UserFollows)
+def count_follow(sender, instance, created, **kwargs):
+    """
+    Incrémente les compteurs d'abonnements et d'abonnés à la création d'un abonnement.
+    """
+    if created:
+        follows.followed(instance)
+
+
+@receiver(post_delete, sender=UserFollows)
+def uncount_follow(sender, instance, **kwargs):
+    """
+    Décrémente les compteurs d'abonnements et d'abonnés à la suppression d'un abonnement.
+    """
+    follows.unfollowed(instance)
+
+
+@receiver(pre_save, sender=Ticket)
+def remember_previous_image(sender, instance, **kwargs):
+    """
+    Mémorise l'image enregistrée en base avant la sauvegarde d'un ticket,
+    pour mettre à jour les compteurs de références si elle change.
+    """
+    instance._previous_image = ''
+    # Une image envoyée est comptée par ContentAddressedStorage.save lors de son enregistrement
+    instance._image_counted = (
+        not instance.image._committed or 'image' in getattr(instance, '_stored_uploads', ())
+    )
+    if instance.pk:
+        previous = Ticket.objects.filter(pk=instance.pk).values_list('image', flat=True).first()
+        instance._previous_image = previous or ''
+
+
+@receiver(post_save, sender=Ticket)
+def count_image_references(sender, instance, **kwargs):
+    """
+    Met à jour les compteurs de références des images de couverture
+    lorsqu'un ticket reçoit, remplace ou retire son image.
+    """
+    previous = getattr(instance, '_previous_image', '')
+    current = instance.image.name or ''
+    counted = getattr(instance, '_image_counted', False)
+    instance._image_counted = False
+    getattr(instance, '_stored_uploads', set()).discard('image')
+    if current == previous:
+        if current and counted:
+            # Même contenu envoyé de nouveau : la référence prise par le stockage est en trop
+            covers.release(current, instance.image.storage)
+        return
+    if current and not counted:
+        covers.acquire(current)
+    if previous:
+        covers.release(previous, instance.image.storage)
+
+
+@receiver(post_delete, sender=Ticket)
+def release_image_reference(sender, instance, **kwargs):
+    """
+    Libère l'image d'un ticket supprimé ; le fichier est effacé
+    s'il n'est plus utilisé par aucun ticket.
+    """
+    if instance.image:
+        covers.release(instance.image.name, instance.image.storage)
+
+
+@receiver(pre_save, sender=Review)
+def remember_previous_rating(sender, instance, **kwargs):
+    """
+    Mémorise le ticket et la note enregistrés en base avant la sauvegarde
+    d'une critique, pour mettre à jour les statistiques s'ils changent.
+    """
+    instance._previous_rating = None
+    if instance.pk:
+        instance._previous_rating = Review.objects.filter(pk=instance.pk).values_list('ticket_id', 'rating').first()
+
+
+@receiver(post_save, sender=Review)
+def count_review(sender, instance, created, **kwargs):
+    """
+    Met à jour les statistiques du ticket à la création d'une critique
+    ou au changement de sa note.
+    """
+    previous = getattr(instance, '_previous_rating', None)
+    if created or previous is None:
+        review_stats.add(instance.ticket_id, instance.rating)
+    else:
+        review_stats.move(*previous, instance.ticket_id, instance.rating)
+
+
+@receiver(post_delete, sender=Review)
+def uncount_review(sender, instance, **kwargs):
+    """
+    Retire une critique supprimée des statistiques de son ticket.
+    """
+    review_stats.remove(instance.ticket_id, instance.rating)
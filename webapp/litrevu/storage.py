@@ -0,0 +1,89 @@
+import hashlib
+import os
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+from django.utils.deconstruct import deconstructible
+from .constants import COVERS_DIRECTORY
+
+# Taille des blocs lus pour calculer l'empreinte d'un fichier
+HASH_CHUNK_SIZE = 64 * 1024
+
+
+def content_digest(content):
+    """
+    Calcule l'empreinte SHA-256 d'un fichier en le lisant par blocs.
+
+    Args:
+        content (File): Fichier envoyé ou ouvert depuis le stockage
+
+    Returns:
+        str: Empreinte hexadécimale
+    """
+    digest = hashlib.sha256()
+    for chunk in content.chunks(HASH_CHUNK_SIZE):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def content_addressed_name(digest, original_name):
+    """
+    Retourne le chemin adressé par contenu d'une image.
+
+    Args:
+        digest (str): Empreinte SHA-256 du contenu
+        original_name (str): Nom d'origine, dont seule l'extension est conservée
+
+    Returns:
+        str: Chemin de la forme "covers/ab/abcdef....jpg"
+    """
+    ext = os.path.splitext(original_name)[1].lower()
+    return f'{COVERS_DIRECTORY}/{digest[:2]}/{digest}{ext}'
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Stockage des images de couverture sous un chemin dérivé de leur contenu.
+
+    Deux envois identiques produisent le même chemin : le second n'écrit rien
+    et partage le fichier du premier. Le nombre de tickets utilisant chaque
+    fichier est suivi par le modèle CoverImage ; la référence d'un fichier
+    envoyé est prise ici, dès son enregistrement.
+    """
+
+    def __init__(self, **kwargs):
+        # Deux écritures concurrentes d'un même contenu produisent le même fichier
+        kwargs.setdefault('allow_overwrite', True)
+        super().__init__(**kwargs)
+
+    def save(self, name, content, max_length=None):
+        """
+        Enregistre un fichier sous son chemin adressé par contenu.
+
+        Une référence au fichier est prise avant de vérifier son existence : un
+        fichier réutilisé ne peut plus être supprimé par covers.collect() entre
+        l'envoi et l'enregistrement du ticket (voir signals.count_image_references).
+
+        Returns:
+            str: Le chemin du fichier, existant ou nouvellement écrit
+        """
+        # Import local : covers importe les modèles, qui importent ce module
+        from . import covers
+
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        target = content_addressed_name(content_digest(content), name)
+        with transaction.atomic():
+            # Attend la fin d'un collect() en cours sur ce fichier (voir covers.collect)
+            covers.acquire(target)
+            if not self.exists(target):
+                target = super().save(target, content, max_length=max_length)
+        return target
+
+
+def cover_storage():
+    """Stockage utilisé par Ticket.image (référencé par les migrations)."""
+    return ContentAddressedStorage()
@@ -0,0 +1,256 @@
+import bisect
+import random
+from dataclasses import dataclass
+from datetime import timedelta
+from io import BytesIO
+from PIL import Image
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.utils import timezone
+from . import covers, timeline
+from .follows import recount as recount_follows
+from .review_stats import recount as recount_review_stats
+from .constants import MAX_RATING
+from .importer import preserve_time_created
+from .models import Ticket, Review, UserFollows
+from .storage import cover_storage
+
+# Préfixe des noms des utilisateurs générés, qui permet de les supprimer sans toucher aux autres
+USERNAME_PREFIX = 'synth_'
+
+# Mot de passe commun aux utilisateurs générés
+PASSWORD = 'motdepasse'
+
+# Nombre de lignes insérées par requête
+BATCH_SIZE = 2000
+
+
+@dataclass
+class WorldSpec:
+    """
+    Paramètres d'un jeu de données synthétique.
+
+    Attributes:
+        users (int): Nombre d'utilisateurs
+        mean_follows (float): Nombre moyen d'abonnements par utilisateur
+        follow_exponent (float): Exposant de la loi de puissance des abonnements ;
+                                 plus il est petit, plus quelques comptes concentrent les abonnés
+        tickets_per_user (int): Nombre de tickets par utilisateur
+        reviews_per_user (int): Nombre de critiques par utilisateur
+        image_ratio (float): Proportion des tickets illustrés
+        distinct_images (int): Nombre d'images différentes partagées par les tickets illustrés
+        days (int): Période couverte par les dates de création, en jours
+        seed (int): Graine du générateur aléatoire ; une même graine produit le même jeu de données
+    """
+    users: int = 1000
+    mean_follows: float = 20.0
+    follow_exponent: float = 1.2
+    tickets_per_user: int = 5
+    reviews_per_user: int = 5
+    image_ratio: float = 0.2
+    distinct_images: int = 20
+    days: int = 365
+    seed: int = 42
+
+
+def _zipf_cumulative_weights(count, exponent):
+    """Poids cumulés d'une loi de Zipf sur count rangs."""
+    total, weights = 0.0, []
+    for rank in range(1, count + 1):
+        total += rank ** -exponent
+        weights.append(total)
+    return weights
+
+
+def follow_graph(user_ids, spec, rng):
+    """
+    Génère un graphe d'abonnements dont le nombre d'abonnés suit une loi de puissance.
+
+    Chaque utilisateur reçoit une popularité selon une loi de Zipf, et choisit ses
+    abonnements proportionnellement à cette popularité : quelques comptes sont suivis
+    par une grande partie des utilisateurs, la plupart par quelques-uns. Le nombre
+    d'abonnements de chaque utilisateur suit une loi de Pareto de moyenne spec.mean_follows.
+
+    Args:
+        user_ids (list): Identifiants des utilisateurs
+        spec (WorldSpec): Paramètres du jeu de données
+        rng (random.Random): Générateur aléatoire
+
+    Yields:
+        tuple: (user_id, followed_user_id), sans doublon ni auto-abonnement
+    """
+    if len(user_ids) < 2:
+        return
+    ranked = list(user_ids)
+    rng.shuffle(ranked)
+    cumulative = _zipf_cumulative_weights(len(ranked), spec.follow_exponent)
+    # Loi de Pareto d'exposant 2 : sa moyenne vaut 2, d'où le facteur 1/2
+    for user_id in user_ids:
+        wanted = min(len(ranked) - 1, int(spec.mean_follows / 2 * rng.paretovariate(2)))
+        followed = set()
+        attempts = 0
+        while len(followed) < wanted and attempts < wanted * 10:
+            attempts += 1
+            target = ranked[bisect.bisect_left(cumulative, rng.random() * cumulative[-1])]
+            if target != user_id:
+                followed.add(target)
+        for followed_id in sorted(followed):
+            yield user_id, followed_id
+
+
+def _cover_images(count, rng):
+    """
+    Enregistre des images de couverture unies dans le stockage des couvertures.
+
+    Returns:
+        list: Chemins des images dans le stockage
+    """
+    storage = cover_storage()
+    names = []
+    for index in range(count):
+        color = tuple(rng.randrange(256) for _ in range(3))
+        buffer = BytesIO()
+        Image.new('RGB', (600, 900), color).save(buffer, format='JPEG', quality=80)
+        names.append(storage.save(f'synthetic_{index}.jpg', ContentFile(buffer.getvalue())))
+    return names
+
+
+def _random_time(rng, start, end):
+    return start + (end - start) * rng.random()
+
+
+def world_exists():
+    """Indique si un jeu de données synthétique est présent en base."""
+    return User.objects.filter(username__startswith=USERNAME_PREFIX).exists()
+
+
+def delete_world():
+    """
+    Supprime les utilisateurs générés et, en cascade, leurs posts et abonnements.
+
+    La suppression en cascade envoie le signal post_delete de chaque ticket :
+    ses couvertures sont libérées une à une, et les fichiers qui ne sont plus
+    référencés sont effacés après la validation de la transaction.
+
+    Returns:
+        int: Nombre d'utilisateurs supprimés
+    """
+    users = User.objects.filter(username__startswith=USERNAME_PREFIX)
+    count = users.count()
+    with transaction.atomic():
+        users.delete()
+    return count
+
+
+def generate_world(spec, batch_size=BATCH_SIZE, log=None):
+    """
+    Génère un jeu de données synthétique reproductible.
+
+    Les lignes sont écrites par bulk_create, sans passer par les signaux : les
+    compteurs de références des couvertures, les compteurs d'abonnements et les
+    statistiques des critiques sont recalculés à la fin, et la timeline
+    matérialisée est reconstruite si elle est activée.
+
+    Args:
+        spec (WorldSpec): Paramètres du jeu de données
+        batch_size (int): Nombre de lignes insérées par requête
+        log (callable): Fonction recevant les messages de progression
+
+    Returns:
+        dict: Nombre d'utilisateurs, abonnements, tickets, critiques et tickets illustrés créés
+    """
+    log = log or (lambda message: None)
+    rng = random.Random(spec.seed)
+    now = timezone.now()
+    start = now - timedelta(days=spec.days)
+    stats = {'users': 0, 'follows': 0, 'tickets': 0, 'reviews': 0, 'images': 0}
+
+    with transaction.atomic(), preserve_time_created():
+        password = make_password(PASSWORD)
+        users = User.objects.bulk_create(
+            [User(username=f'{USERNAME_PREFIX}{index:07d}', password=password) for index in range(spec.users)],
+            batch_size=batch_size
+        )
+        user_ids = [user.id for user in users]
+        stats['users'] = len(user_ids)
+        log(f"{len(user_ids)} utilisateurs créés.")
+
+        following = {user_id: [] for user_id in user_ids}
+        follows = []
+        for user_id, followed_id in follow_graph(user_ids, spec, rng):
+            following[user_id].append(followed_id)
+            follows.append(UserFollows(user_id=user_id, followed_user_id=followed_id))
+        UserFollows.objects.bulk_create(follows, batch_size=batch_size)
+        stats['follows'] = len(follows)
+        del follows
+        log(f"{stats['follows']} abonnements créés.")
+
+        images = _cover_images(spec.distinct_images, rng) if spec.image_ratio > 0 else []
+        tickets_by_user = {}
+        pending = []
+        for user_id in user_ids:
+            for index in range(spec.tickets_per_user):
+                image = rng.choice(images) if images and rng.random() < spec.image_ratio else None
+                pending.append(Ticket(
+                    user_id=user_id,
+                    title=f'Livre {user_id}-{index}',
+                    description='Description générée pour les mesures de performance.',
+                    image=image,
+                    time_created=_random_time(rng, start, now),
+                ))
+                stats['images'] += image is not None
+            if len(pending) >= batch_size:
+                _save_tickets(pending, tickets_by_user)
+                pending = []
+        _save_tickets(pending, tickets_by_user)
+        stats['tickets'] = sum(len(tickets) for tickets in tickets_by_user.values())
+        log(f"{stats['tickets']} tickets créés.")
+
+        pending = []
+        for user_id in user_ids:
+            # Critique en priorité les tickets des comptes suivis, comme dans l'application
+            authors = following[user_id] or user_ids
+            reviewed = set()
+            for _ in range(spec.reviews_per_user * 3):
+                if len(reviewed) >= spec.reviews_per_user:
+                    break
+                candidates = tickets_by_user.get(rng.choice(authors))
+                if not candidates:
+                    continue
+                ticket_id, ticket_time = rng.choice(candidates)
+                if ticket_id in reviewed:
+                    continue
+                reviewed.add(ticket_id)
+                pending.append(Review(
+                    ticket_id=ticket_id,
+                    user_id=user_id,
+                    rating=rng.randint(0, MAX_RATING),
+                    headline=f'Critique de {user_id}',
+                    body='Critique générée pour les mesures de performance.',
+                    time_created=_random_time(rng, ticket_time, now),
+                ))
+            if len(pending) >= batch_size:
+                Review.objects.bulk_create(pending)
+                stats['reviews'] += len(pending)
+                pending = []
+        Review.objects.bulk_create(pending)
+        stats['reviews'] += len(pending)
+        log(f"{stats['reviews']} critiques créées.")
+
+        covers.recount()
+        recount_follows(user_ids)
+        recount_review_stats(
+            ticket_id for tickets in tickets_by_user.values() for ticket_id, _ in tickets
+        )
+        if timeline.is_enabled():
+            timeline.rebuild(users, batch_size=batch_size)
+            log("Timeline matérialisée reconstruite.")
+    return stats
+
+
+def _save_tickets(tickets, tickets_by_user):
+    """Insère un lot de tickets et mémorise leur identifiant et leur date par auteur."""
+    for ticket in Ticket.objects.bulk_create(tickets):
+        tickets_by_user.setdefault(ticket.user_id, []).append((ticket.id, ticket.time_created))
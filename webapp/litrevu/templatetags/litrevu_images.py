@@ -0,0 +1,43 @@
+from django import template
+from django.utils.html import format_html, format_html_join
+from litrevu.images import variant_urls
+
+register = template.Library()
+
+
+@register.simple_tag
+def responsive_image(image_file, alt='', css_class='ticket-image'):
+    """
+    Affiche une image de couverture avec ses déclinaisons dans un attribut srcset.
+
+    Le navigateur télécharge la plus petite déclinaison suffisante pour la taille
+    affichée, plutôt que l'original envoyé par l'utilisateur. Tant que les
+    déclinaisons d'un ticket ne sont pas prêtes, l'original est affiché.
+
+    Usage:
+        {% load litrevu_images %}
+        {% responsive_image post.image alt=post.title %}
+
+    Args:
+        image_file (ImageFieldFile): Image originale
+        alt (str): Texte alternatif
+        css_class (str): Classe CSS de la balise img
+
+    Returns:
+        str: Balise img, ou une chaîne vide si aucune image n'est définie
+    """
+    if not image_file:
+        return ''
+    if not getattr(image_file.instance, 'image_variants_ready', True):
+        # Déclinaisons en cours de génération par process_image_jobs : on affiche l'original
+        return format_html('<img src="{}" alt="{}" class="{}" loading="lazy">', image_file.url, alt, css_class)
+    variants = variant_urls(image_file)
+    srcset = format_html_join(', ', '{} {}w', ((url, width) for width, url in variants))
+    return format_html(
+        '<img src="{}" srcset="{}" sizes="(max-width: 576px) 100vw, {}px" alt="{}" class="{}" loading="lazy">',
+        variants[-1][1],
+        srcset,
+        variants[0][0],
+        alt,
+        css_class,
+    )
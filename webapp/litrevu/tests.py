@@ -1,6 +1,1408 @@
-# from django.test import TestCase
+import asyncio
+import csv
+import json
+import math
+import os
+import shutil
+import tempfile
+import threading
+from datetime import timedelta
+from unittest import mock
+from io import BytesIO, StringIO
+from PIL import Image
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection, transaction, IntegrityError, OperationalError
+from django.db.utils import ConnectionHandler
+from django.db.models import Count, Sum
+from django.test import Client, RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from .models import Ticket, Review, UserFollows, FeedEntry, ImageJob, CoverImage, ImportRun, FollowCounts
+from .feed import (
+    flux_querysets, posts_querysets, get_feed_page, get_timeline_page, decode_cursor, encode_cursor
+)
+from . import (
+    async_views, cards, feed_cache, group_commit, autocomplete, live, login_throttle, sessions, timeline, views,
+    search as full_text
+)
+from .constants import LOGIN_IP_BURST, LOGIN_IP_RATE, LOGIN_USERNAME_BURST, SEARCH_MAX_PAGE, SUCCESS_MESSAGES
+from .images import variant_name
+from .routers import ReadReplicaRouter, read_only
+from .instrumentation import registry
+from .importer import Importer
+from .synthetic import WorldSpec, generate_world, delete_world
+from webapp.database import sqlite_databases
 
-# Create your tests here.
 
+class FluxQueryBudgetTest(TestCase):
+    """
+    Vérifie que le flux s'affiche en un nombre fixe de requêtes SQL,
+    quelle que soit la quantité de posts affichés.
+    """
+    # Session + utilisateur, puis clés de la page, tickets et critiques
+    QUERY_BUDGET = 5
 
-# verifier si is_valid() est bien appelé sur  tous les formulaires
+    def setUp(self):
+        cache.clear()
+        self.viewer = User.objects.create_user(username='lecteur', password='motdepasse')
+        self.authors = [
+            User.objects.create_user(username=f'auteur{i}', password='motdepasse')
+            for i in range(3)
+        ]
+        for author in self.authors:
+            UserFollows.objects.create(user=self.viewer, followed_user=author)
+        self.client.login(username='lecteur', password='motdepasse')
+
+    def create_posts(self, count):
+        """Crée des tickets et des critiques croisées entre les auteurs et le lecteur."""
+        for i in range(count):
+            author = self.authors[i % len(self.authors)]
+            ticket = Ticket.objects.create(title=f'Livre {i}', user=author)
+            reviewer = self.viewer if i % 2 else self.authors[(i + 1) % len(self.authors)]
+            Review.objects.create(ticket=ticket, user=reviewer, rating=i % 6, headline=f'Critique {i}')
+
+    def count_flux_queries(self, query_string=''):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse('flux') + query_string)
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries), response
+
+    def test_flux_query_count_is_constant(self):
+        self.create_posts(3)
+        small_count, _ = self.count_flux_queries()
+
+        self.create_posts(60)
+        large_count, response = self.count_flux_queries()
+
+        self.assertEqual(small_count, large_count)
+        self.assertLessEqual(large_count, self.QUERY_BUDGET)
+        self.assertIsNotNone(response.context['next_cursor'])
+
+    def test_next_page_respects_query_budget(self):
+        self.create_posts(60)
+        _, first_page = self.count_flux_queries()
+        cursor = first_page.context['next_cursor']
+
+        with self.assertNumQueries(self.QUERY_BUDGET):
+            self.client.get(reverse('flux'), {'cursor': cursor})
+
+    def test_has_review_from_user_flag(self):
+        self.create_posts(4)
+        _, response = self.count_flux_queries()
+        for post in response.context['posts']:
+            if post.content_type == 'TICKET':
+                expected = Review.objects.filter(ticket=post, user=self.viewer).exists()
+                self.assertEqual(post.has_review_from_user, expected)
+
+
+class TimelineTest(TestCase):
+    """
+    Vérifie que la timeline matérialisée reste identique au flux calculé
+    par requête après chaque opération d'écriture des vues.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.alice = User.objects.create_user(username='alice', password='motdepasse')
+        self.bob = User.objects.create_user(username='bob', password='motdepasse')
+        self.client.login(username='alice', password='motdepasse')
+
+    def assertTimelineMatchesQuery(self, user):
+        expected, _ = get_feed_page(*flux_querysets(user), page_size=1000)
+        actual, _ = get_timeline_page(user, page_size=1000)
+        self.assertEqual(
+            [(post.content_type, post.id) for post in actual],
+            [(post.content_type, post.id) for post in expected]
+        )
+
+    def test_views_keep_timeline_in_sync(self):
+        bob_ticket = Ticket.objects.create(title='Livre de Bob', user=self.bob)
+        Review.objects.create(ticket=bob_ticket, user=self.bob, rating=4, headline='Avis de Bob')
+
+        self.client.post(reverse('subscriptions'), {'username': 'bob'})
+        self.assertTimelineMatchesQuery(self.alice)
+
+        self.client.post(reverse('create_ticket'), {'title': 'Livre d\'Alice', 'description': ''})
+        alice_ticket = Ticket.objects.get(user=self.alice)
+        self.client.post(
+            reverse('create_review_for_ticket', args=[bob_ticket.id]),
+            {'headline': 'Avis d\'Alice', 'rating': 3, 'body': ''}
+        )
+        self.client.post(
+            reverse('create_review'),
+            {'title': 'Autre livre', 'description': '', 'headline': 'Spontanée', 'rating': 5, 'body': ''}
+        )
+        self.assertTimelineMatchesQuery(self.alice)
+
+        # Une critique de Bob sur un ticket d'Alice reste visible après le désabonnement
+        bob = Client()
+        bob.force_login(self.bob)
+        bob.post(
+            reverse('create_review_for_ticket', args=[alice_ticket.id]),
+            {'headline': 'Réponse', 'rating': 2, 'body': ''}
+        )
+        bob_review = Review.objects.get(user=self.bob, ticket=alice_ticket)
+        self.assertTrue(FeedEntry.objects.filter(owner=self.alice, post_id=bob_review.id).exists())
+        self.client.get(reverse('unfollow_user', args=[self.bob.id]))
+        self.assertTimelineMatchesQuery(self.alice)
+        self.assertTrue(FeedEntry.objects.filter(owner=self.alice, post_id=bob_review.id).exists())
+
+        self.client.post(reverse('delete_ticket', args=[alice_ticket.id]))
+        self.assertTimelineMatchesQuery(self.alice)
+
+    def test_rebuild_timeline_command(self):
+        UserFollows.objects.create(user=self.alice, followed_user=self.bob)
+        ticket = Ticket.objects.create(title='Livre', user=self.bob)
+        Review.objects.create(ticket=ticket, user=self.alice, rating=1, headline='Avis')
+
+        call_command('rebuild_timeline', stdout=StringIO())
+
+        self.assertTimelineMatchesQuery(self.alice)
+        self.assertTimelineMatchesQuery(self.bob)
+
+    @override_settings(FEED_USE_TIMELINE=True)
+    def test_flux_reads_timeline_when_enabled(self):
+        self.client.post(reverse('subscriptions'), {'username': 'bob'})
+        bob = Client()
+        bob.force_login(self.bob)
+        bob.post(reverse('create_ticket'), {'title': 'Livre', 'description': ''})
+        ticket = Ticket.objects.get(user=self.bob)
+        self.assertEqual(
+            set(FeedEntry.objects.filter(post_type='TICKET').values_list('owner', 'post_id')),
+            {(self.alice.id, ticket.id), (self.bob.id, ticket.id)}
+        )
+        response = self.client.get(reverse('flux'))
+        self.assertEqual([post.id for post in response.context['posts']], [ticket.id])
+
+
+class FeedCacheTest(TestCase):
+    """
+    Vérifie que le cache des flux est invalidé pour les seuls utilisateurs concernés.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.alice = User.objects.create_user(username='alice', password='motdepasse')
+        self.bob = User.objects.create_user(username='bob', password='motdepasse')
+        self.carol = User.objects.create_user(username='carol', password='motdepasse')
+        UserFollows.objects.create(user=self.alice, followed_user=self.bob)
+        self.client.login(username='alice', password='motdepasse')
+
+    def flux_ids(self):
+        return [(post.content_type, post.id) for post in self.client.get(reverse('flux')).context['posts']]
+
+    def test_second_read_is_a_cache_hit(self):
+        Ticket.objects.create(title='Livre', user=self.bob)
+        self.flux_ids()
+        with self.assertNumQueries(3):
+            # Session, utilisateur et tickets de la page : plus de requête de tri
+            self.flux_ids()
+        self.assertEqual(feed_cache.stats()['hits'], 1)
+        self.assertEqual(feed_cache.stats()['misses'], 1)
+
+    def test_followed_user_post_invalidates_follower(self):
+        self.flux_ids()
+        ticket = Ticket.objects.create(title='Nouveau livre', user=self.bob)
+        self.assertIn(('TICKET', ticket.id), self.flux_ids())
+
+        ticket.delete()
+        self.assertNotIn(('TICKET', ticket.id), self.flux_ids())
+
+    def test_review_on_own_ticket_invalidates_ticket_owner(self):
+        ticket = Ticket.objects.create(title='Livre d\'Alice', user=self.alice)
+        self.flux_ids()
+        review = Review.objects.create(ticket=ticket, user=self.carol, rating=3, headline='Avis')
+        self.assertIn(('REVIEW', review.id), self.flux_ids())
+
+    def test_follow_changes_invalidate_follower(self):
+        ticket = Ticket.objects.create(title='Livre de Carol', user=self.carol)
+        self.assertNotIn(('TICKET', ticket.id), self.flux_ids())
+        UserFollows.objects.create(user=self.alice, followed_user=self.carol)
+        self.assertIn(('TICKET', ticket.id), self.flux_ids())
+
+    def test_unrelated_post_keeps_version(self):
+        alice_version = feed_cache.get_version(self.alice.id)
+        Ticket.objects.create(title='Livre de Carol', user=self.carol)
+        self.assertEqual(feed_cache.get_version(self.alice.id), alice_version)
+
+
+class UniqueReviewTest(TestCase):
+    """
+    Vérifie qu'une seconde critique sur le même ticket est refusée par la base.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.alice = User.objects.create_user(username='alice', password='motdepasse')
+        self.ticket = Ticket.objects.create(title='Livre', user=self.alice)
+        self.client.login(username='alice', password='motdepasse')
+
+    def test_second_review_is_rejected(self):
+        url = reverse('create_review_for_ticket', args=[self.ticket.id])
+        data = {'headline': 'Avis', 'rating': 4, 'body': ''}
+
+        self.client.post(url, data)
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post(url, data)
+
+        # Pas de requête de vérification préalable : seule l'insertion échoue
+        review_selects = [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith('SELECT') and 'FROM "litrevu_review"' in query['sql']
+        ]
+        self.assertEqual(review_selects, [])
+
+        self.assertRedirects(response, reverse('flux'), fetch_redirect_response=False)
+        self.assertEqual(Review.objects.filter(ticket=self.ticket, user=self.alice).count(), 1)
+
+
+class ResponsiveImageTest(TestCase):
+    """
+    Vérifie la génération paresseuse des déclinaisons d'images et l'attribut srcset.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        override = override_settings(MEDIA_ROOT=self.media_root)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        self.alice = User.objects.create_user(username='alice', password='motdepasse')
+        self.client.login(username='alice', password='motdepasse')
+
+    def upload(self, size=(1600, 2400)):
+        buffer = BytesIO()
+        Image.new('RGB', size, 'navy').save(buffer, format='JPEG')
+        return SimpleUploadedFile('couverture.jpg', buffer.getvalue(), content_type='image/jpeg')
+
+    def test_flux_serves_variants_in_srcset(self):
+        ticket = Ticket.objects.create(
+            title='Livre', user=self.alice, image=self.upload(), image_variants_ready=True
+        )
+        response = self.client.get(reverse('flux'))
+
+        small = variant_name(ticket.image.name, 320)
+        self.assertContains(response, f'{ticket.image.storage.url(small)} 320w')
+        self.assertNotContains(response, f'src="{ticket.image.url}"')
+        with ticket.image.storage.open(small) as variant:
+            self.assertEqual(Image.open(variant).size, (320, 480))
+
+    def test_narrow_image_is_not_enlarged(self):
+        ticket = Ticket.objects.create(
+            title='Livre', user=self.alice, image=self.upload(size=(200, 300)), image_variants_ready=True
+        )
+        self.client.get(reverse('flux'))
+        with ticket.image.storage.open(variant_name(ticket.image.name, 640)) as variant:
+            self.assertEqual(Image.open(variant).size, (200, 300))
+
+    def test_upload_is_processed_by_background_job(self):
+        self.client.post(reverse('create_ticket'), {'title': 'Livre', 'description': '', 'image': self.upload()})
+        ticket = Ticket.objects.get(user=self.alice)
+        job = ImageJob.objects.get(ticket=ticket)
+        self.assertEqual(job.status, ImageJob.PENDING)
+
+        # Tant que la tâche n'est pas traitée, l'original est affiché
+        self.assertContains(self.client.get(reverse('flux')), f'src="{ticket.image.url}"')
+        self.assertFalse(ticket.image.storage.exists(variant_name(ticket.image.name, 320)))
+
+        call_command('process_image_jobs', once=True, workers=0, stdout=StringIO())
+
+        job.refresh_from_db()
+        ticket.refresh_from_db()
+        self.assertEqual(job.status, ImageJob.DONE)
+        self.assertTrue(ticket.image_variants_ready)
+        self.assertContains(self.client.get(reverse('flux')), 'srcset=')
+
+    def test_failed_job_is_retried_then_marked_failed(self):
+        ticket = Ticket.objects.create(title='Livre', user=self.alice, image='absente.jpg')
+        job = ImageJob.objects.create(ticket=ticket, image_name='absente.jpg')
+
+        for attempt in range(1, 4):
+            ImageJob.objects.filter(id=job.id).update(run_after=job.time_created)
+            call_command('process_image_jobs', once=True, workers=0, stdout=StringIO(), stderr=StringIO())
+            job.refresh_from_db()
+            self.assertEqual(job.attempts, attempt)
+
+        self.assertEqual(job.status, ImageJob.FAILED)
+        self.assertIn('absente.jpg', job.last_error)
+        ticket.refresh_from_db()
+        self.assertFalse(ticket.image_variants_ready)
+
+
+class CursorPaginationTest(TestCase):
+    """
+    Vérifie la pagination par curseur du flux sur (time_created, id, content_type).
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.alice = User.objects.create_user(username='alice', password='motdepasse')
+        # Tickets et critiques de mêmes ids, tous publiés au même instant
+        for post_id in (1, 2, 3):
+            ticket = Ticket.objects.create(id=post_id, title=f'Livre {post_id}', user=self.alice)
+            Review.objects.create(id=post_id, ticket=ticket, user=self.alice, rating=3, headline='Avis')
+        self.moment = timezone.now()
+        Ticket.objects.update(time_created=self.moment)
+        Review.objects.update(time_created=self.moment)
+
+    def walk(self, page_size):
+        pages, cursor = [], None
+        while True:
+            posts, next_cursor = get_feed_page(*posts_querysets(self.alice), decode_cursor(cursor), page_size)
+            pages.append([(post.content_type, post.id) for post in posts])
+            if next_cursor is None:
+                return pages
+            cursor = next_cursor
+
+    def test_identical_timestamps_are_split_by_id_then_type(self):
+        pages = self.walk(page_size=3)
+        self.assertEqual(pages, [
+            [('TICKET', 3), ('REVIEW', 3), ('TICKET', 2)],
+            [('REVIEW', 2), ('TICKET', 1), ('REVIEW', 1)],
+        ])
+        # Quelle que soit la taille des pages, chaque post apparaît une fois, dans le même ordre
+        for page_size in (1, 2, 4):
+            self.assertEqual(sum(self.walk(page_size), []), sum(pages, []))
+
+    def test_invalid_cursor_shows_first_page(self):
+        self.client.force_login(self.alice)
+        first = [(post.content_type, post.id) for post in self.client.get(reverse('posts')).context['posts']]
+        for cursor in ('n-importe-quoi', 'hier|3|TICKET', f'{self.moment.isoformat()}|trois|TICKET',
+                       f'{self.moment.isoformat()}|3|USER', f'{self.moment.isoformat()}|3'):
+            self.assertIsNone(decode_cursor(cursor))
+            response = self.client.get(reverse('posts'), {'cursor': cursor})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual([(post.content_type, post.id) for post in response.context['posts']], first)
+
+    def test_tampered_cursor_only_moves_the_position(self):
+        self.client.force_login(self.alice)
+        # Un curseur bien formé mais forgé ne fait que déplacer la position de lecture
+        cursor = encode_cursor(self.moment, 2, 'TICKET')
+        response = self.client.get(reverse('posts'), {'cursor': cursor})
+        self.assertEqual(
+            [(post.content_type, post.id) for post in response.context['posts']],
+            [('REVIEW', 2), ('TICKET', 1), ('REVIEW', 1)],
+        )
+        past = encode_cursor(self.moment - timedelta(days=1), 1, 'TICKET')
+        self.assertEqual(list(self.client.get(reverse('posts'), {'cursor': past}).context['posts']), [])
+
+
+class ContentAddressedCoverTest(TestCase):
+    """
+    Vérifie que les couvertures identiques partagent un seul fichier, compté par référence.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        override = override_settings(MEDIA_ROOT=self.media_root)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.alice = User.objects.create_user(username='alice', password='motdepasse')
+
+    def cover(self, name='couverture.jpg', color='navy'):
+        buffer = BytesIO()
+        Image.new('RGB', (60, 90), color).save(buffer, format='JPEG')
+        return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/jpeg')
+
+    def test_identical_uploads_share_one_file(self):
+        first = Ticket.objects.create(title='Livre', user=self.alice, image=self.cover('a.jpg'))
+        second = Ticket.objects.create(title='Livre', user=self.alice, image=self.cover('b.JPG'))
+
+        self.assertEqual(first.image.name, second.image.name)
+        self.assertTrue(first.image.name.startswith('covers/'))
+        self.assertEqual(CoverImage.objects.get(name=first.image.name).ref_count, 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertTrue(second.image.storage.exists(second.image.name))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            second.delete()
+        self.assertFalse(second.image.storage.exists(second.image.name))
+        self.assertFalse(CoverImage.objects.exists())
+
+    def test_release_during_upload_keeps_shared_file(self):
+        first = Ticket.objects.create(title='Livre', user=self.alice, image=self.cover('a.jpg'))
+        # Le fichier du second envoi est enregistré avant le ticket (voir group_commit.store_files)
+        second = Ticket(title='Livre', user=self.alice, image=self.cover('b.jpg'))
+        group_commit.store_files(second)
+        self.assertEqual(second.image.name, first.image.name)
+
+        # Le dernier ticket enregistré libère le fichier avant l'enregistrement du second
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertTrue(second.image.storage.exists(second.image.name))
+
+        second.save()
+        self.assertEqual(CoverImage.objects.get(name=second.image.name).ref_count, 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            second.delete()
+        self.assertFalse(second.image.storage.exists(second.image.name))
+
+    def test_dedupe_media_command(self):
+        storage = Ticket._meta.get_field('image').storage
+        content = self.cover().read()
+        for legacy in ('ancienne1.jpg', 'ancienne2.jpg'):
+            with open(os.path.join(self.media_root, legacy), 'wb') as legacy_file:
+                legacy_file.write(content)
+        Ticket.objects.bulk_create([
+            Ticket(title='Livre 1', user=self.alice, image='ancienne1.jpg'),
+            Ticket(title='Livre 2', user=self.alice, image='ancienne2.jpg'),
+        ])
+
+        call_command('dedupe_media', stdout=StringIO())
+
+        names = set(Ticket.objects.values_list('image', flat=True))
+        self.assertEqual(len(names), 1)
+        name = names.pop()
+        self.assertTrue(storage.exists(name))
+        self.assertFalse(storage.exists('ancienne1.jpg'))
+        self.assertFalse(storage.exists('ancienne2.jpg'))
+        self.assertEqual(CoverImage.objects.get(name=name).ref_count, 2)
+        self.assertEqual(ImageJob.objects.filter(image_name=name).count(), 2)
+
+
+class ExportTest(TestCase):
+    """
+    Vérifie l'export en flux des posts et abonnements d'un utilisateur.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.alice = User.objects.create_user(username='alice', password='motdepasse')
+        self.bob = User.objects.create_user(username='bob', password='motdepasse')
+        UserFollows.objects.create(user=self.alice, followed_user=self.bob)
+        for i in range(5):
+            ticket = Ticket.objects.create(title=f'Livre {i}', user=self.alice)
+            Review.objects.create(ticket=ticket, user=self.alice, rating=i, headline=f'Critique {i}')
+        Review.objects.create(ticket=ticket, user=self.bob, rating=1, headline='Avis de Bob')
+        self.client.login(username='alice', password='motdepasse')
+
+    def test_ndjson_export_is_streamed_in_chronological_order(self):
+        response = self.client.get(reverse('export_posts'))
+        self.assertTrue(response.streaming)
+
+        records = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        posts = [record for record in records if record['type'] != 'FOLLOW']
+        self.assertEqual(len(posts), 10)
+        dates = [record['time_created'] for record in posts]
+        self.assertEqual(dates, sorted(dates))
+        self.assertEqual(records[-1], {'type': 'FOLLOW', 'id': records[-1]['id'], 'followed_user': 'bob'})
+
+    def test_csv_export(self):
+        response = self.client.get(reverse('export_posts'), {'format': 'csv'})
+        rows = list(csv.DictReader(b''.join(response.streaming_content).decode().splitlines()))
+        self.assertEqual([row['type'] for row in rows].count('REVIEW'), 5)
+        self.assertEqual(rows[-1]['followed_user'], 'bob')
+
+    def test_unknown_format(self):
+        self.assertEqual(self.client.get(reverse('export_posts'), {'format': 'xml'}).status_code, 404)
+
+    def test_export_command(self):
+        output = StringIO()
+        call_command('export_user', 'alice', stdout=output)
+        self.assertEqual(len(output.getvalue().splitlines()), 11)
+
+
+class ImportTest(TestCase):
+    """
+    Vérifie l'import en masse : validation, création par lots et reprise.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.alice = User.objects.create_user(username='alice', password='motdepasse')
+        self.bob = User.objects.create_user(username='bob', password='motdepasse')
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.path = os.path.join(directory, 'import.ndjson')
+
+    def write(self, records):
+        with open(self.path, 'w', encoding='utf-8') as stream:
+            for record in records:
+                stream.write(json.dumps(record) + '\n')
+
+    def records(self):
+        return [
+            {'type': 'TICKET', 'id': 1, 'user': 'alice', 'title': 'Dune', 'time_created': '2020-01-02T10:00:00+00:00'},
+            {'type': 'TICKET', 'id': 2, 'user': 'alice', 'title': ''},
+            {'type': 'REVIEW', 'user': 'bob', 'ticket_id': 1, 'rating': 4, 'headline': 'Très bien'},
+            {'type': 'REVIEW', 'user': 'bob', 'ticket_id': 1, 'rating': 9, 'headline': 'Note invalide'},
+            {'type': 'FOLLOW', 'user': 'bob', 'followed_user': 'alice'},
+        ]
+
+    def test_import_validates_and_creates_rows(self):
+        self.write(self.records())
+        errors = StringIO()
+        call_command('import_data', self.path, '--batch-size', '2', stdout=StringIO(), stderr=errors)
+
+        ticket = Ticket.objects.get()
+        self.assertEqual(ticket.time_created.year, 2020)
+        self.assertEqual(Review.objects.get().ticket, ticket)
+        self.assertTrue(UserFollows.objects.filter(user=self.bob, followed_user=self.alice).exists())
+        self.assertIn('Ligne 2', errors.getvalue())
+        self.assertIn('Ligne 4', errors.getvalue())
+
+    def test_import_resumes_after_last_committed_batch(self):
+        self.write(self.records())
+        call_command('import_data', self.path, '--batch-size', '2', stdout=StringIO(), stderr=StringIO())
+        run = ImportRun.objects.get()
+        self.assertEqual((run.rows_done, run.rows_imported, run.rows_rejected), (5, 3, 2))
+
+        # Simule un arrêt après le premier lot : seules les lignes suivantes sont rejouées
+        Review.objects.all().delete()
+        UserFollows.objects.all().delete()
+        ImportRun.objects.filter(pk=run.pk).update(rows_done=2, finished=False)
+        call_command('import_data', self.path, '--batch-size', '2', stdout=StringIO(), stderr=StringIO())
+
+        self.assertEqual(Ticket.objects.count(), 1)
+        self.assertEqual(Review.objects.count(), 1)
+        self.assertEqual(UserFollows.objects.count(), 1)
+
+    def test_existing_rows_are_rejected_and_not_counted(self):
+        UserFollows.objects.create(user=self.bob, followed_user=self.alice)
+        self.write([
+            {'type': 'TICKET', 'id': 1, 'user': 'alice', 'title': 'Dune'},
+            {'type': 'REVIEW', 'user': 'bob', 'ticket_id': 1, 'rating': 4, 'headline': 'Première'},
+            {'type': 'REVIEW', 'user': 'bob', 'ticket_id': 1, 'rating': 2, 'headline': 'Doublon'},
+            {'type': 'FOLLOW', 'user': 'bob', 'followed_user': 'alice'},
+        ])
+        errors, output = StringIO(), StringIO()
+        call_command('import_data', self.path, stdout=output, stderr=errors)
+
+        run = ImportRun.objects.get()
+        self.assertEqual((run.rows_done, run.rows_imported, run.rows_rejected), (4, 2, 2))
+        self.assertEqual(Review.objects.get().headline, 'Première')
+        self.assertIn('Ligne 3 rejetée : critique déjà publiée', errors.getvalue())
+        self.assertIn('Ligne 4 rejetée : abonnement déjà existant', errors.getvalue())
+        self.assertIn('2 lignes importées', output.getvalue())
+
+    def test_imported_posts_are_added_to_timeline(self):
+        carol = User.objects.create_user(username='carol', password='motdepasse')
+        UserFollows.objects.create(user=carol, followed_user=self.alice)
+        self.write([
+            {'type': 'TICKET', 'id': 1, 'user': 'alice', 'title': 'Dune'},
+            {'type': 'REVIEW', 'user': 'bob', 'ticket_id': 1, 'rating': 4, 'headline': 'Très bien'},
+            {'type': 'FOLLOW', 'user': 'bob', 'followed_user': 'alice'},
+        ])
+        call_command('import_data', self.path, '--batch-size', '2', stdout=StringIO(), stderr=StringIO())
+
+        ticket, review = Ticket.objects.get(), Review.objects.get()
+        entries = set(FeedEntry.objects.values_list('owner__username', 'post_type', 'post_id'))
+        self.assertEqual(entries, {
+            ('alice', 'TICKET', ticket.id), ('carol', 'TICKET', ticket.id), ('bob', 'TICKET', ticket.id),
+            ('alice', 'REVIEW', review.id), ('bob', 'REVIEW', review.id),
+        })
+        # La timeline importée est identique à une reconstruction complète
+        timeline.rebuild(User.objects.all())
+        self.assertEqual(set(FeedEntry.objects.values_list('owner__username', 'post_type', 'post_id')), entries)
+
+    def test_interrupted_run_keeps_cover_references_and_feed_cache_in_sync(self):
+        shared = Ticket.objects.create(title='Existant', user=self.alice, image='covers/dune.jpg')
+        UserFollows.objects.create(user=self.bob, followed_user=self.alice)
+        version = feed_cache.get_version(self.bob.id)
+        self.write([
+            {'type': 'TICKET', 'id': 1, 'user': 'alice', 'title': 'Dune', 'image': 'covers/dune.jpg'},
+            {'type': 'TICKET', 'id': 2, 'user': 'alice', 'title': 'Hypérion'},
+        ])
+        import_batch = Importer.import_batch
+
+        def crash_on_second_batch(importer, rows):
+            if importer.run.rows_done:
+                raise RuntimeError("arrêt brutal")
+            return import_batch(importer, rows)
+
+        with mock.patch.object(Importer, 'import_batch', crash_on_second_batch):
+            with self.assertRaises(RuntimeError):
+                call_command('import_data', self.path, '--batch-size', '1', stdout=StringIO(), stderr=StringIO())
+
+        self.assertEqual(CoverImage.objects.get(name='covers/dune.jpg').ref_count, 2)
+        self.assertNotEqual(feed_cache.get_version(self.bob.id), version)
+        # La suppression de l'autre ticket laisse le fichier au ticket importé
+        shared.delete()
+        self.assertEqual(CoverImage.objects.get(name='covers/dune.jpg').ref_count, 1)
+
+    def test_export_can_be_imported_for_another_user(self):
+        Ticket.objects.create(title='Exporté', user=self.alice)
+        output = StringIO()
+        call_command('export_user', 'alice', stdout=output)
+        with open(self.path, 'w', encoding='utf-8') as stream:
+            stream.write(output.getvalue())
+
+        call_command('import_data', self.path, '--user', 'bob', stdout=StringIO(), stderr=StringIO())
+        self.assertTrue(Ticket.objects.filter(title='Exporté', user=self.bob).exists())
+
+
+class SyntheticDatasetTest(TestCase):
+    """
+    Vérifie le générateur de jeu de données et le rapport de mesure des vues.
+    """
+
+    def setUp(self):
+        cache.clear()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        media_settings = override_settings(MEDIA_ROOT=media_root)
+        media_settings.enable()
+        self.addCleanup(media_settings.disable)
+
+    def test_generated_world_is_reproducible_and_skewed(self):
+        spec = WorldSpec(users=60, mean_follows=6, tickets_per_user=2, reviews_per_user=2, distinct_images=2, seed=3)
+        stats = generate_world(spec)
+        self.assertEqual(stats['users'], 60)
+        self.assertEqual(Ticket.objects.count(), 120)
+        self.assertEqual(Review.objects.count(), stats['reviews'])
+        self.assertEqual(CoverImage.objects.aggregate(total=Sum('ref_count'))['total'], stats['images'])
+
+        follower_counts = sorted(
+            User.objects.annotate(total=Count('followed_by')).values_list('total', flat=True), reverse=True
+        )
+        # Loi de puissance : le compte le plus suivi dépasse largement le compte médian
+        self.assertGreater(follower_counts[0], 4 * max(follower_counts[len(follower_counts) // 2], 1))
+
+        graph = sorted(UserFollows.objects.values_list('user__username', 'followed_user__username'))
+        names = list(CoverImage.objects.values_list('name', flat=True))
+        with self.captureOnCommitCallbacks(execute=True):
+            delete_world()
+        self.assertFalse(Ticket.objects.exists())
+        # Les couvertures libérées sont effacées du stockage, sans fichier orphelin
+        self.assertFalse(CoverImage.objects.exists())
+        self.assertFalse([name for name in names if default_storage.exists(name)])
+        generate_world(spec)
+        self.assertEqual(sorted(UserFollows.objects.values_list('user__username', 'followed_user__username')), graph)
+
+    def test_benchmark_report(self):
+        generate_world(WorldSpec(users=10, mean_follows=3, tickets_per_user=2, reviews_per_user=1, image_ratio=0))
+        output = StringIO()
+        call_command('benchmark_views', '--users', '2', '--iterations', '2', stdout=output)
+
+        report = json.loads(output.getvalue())
+        self.assertEqual(set(report['views']), {'flux', 'posts', 'subscriptions'})
+        self.assertEqual(report['environment']['dataset']['users'], 10)
+        flux = report['views']['flux']
+        self.assertEqual(flux['requests'], 4)
+        self.assertLessEqual(flux['p50_ms'], flux['p99_ms'])
+        self.assertGreater(flux['queries_max'], 0)
+
+
+class ServerTimingTest(TestCase):
+    """
+    Vérifie l'en-tête Server-Timing et l'export Prometheus des histogrammes.
+    """
+
+    def setUp(self):
+        cache.clear()
+        registry.clear()
+        self.alice = User.objects.create_user(username='alice', password='motdepasse')
+        Ticket.objects.create(title='Dune', user=self.alice)
+        self.client.force_login(self.alice)
+
+    def timings(self, response):
+        timings = {}
+        for metric in response['Server-Timing'].split(', '):
+            name, _, value = metric.partition(';')
+            timings[name] = float(value.split('=')[1])
+        return timings
+
+    def test_header_reports_queries_and_template_time(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('flux'))
+        timings = self.timings(response)
+        self.assertEqual(timings['db-queries'], len(queries))
+        self.assertGreater(timings['tpl'], 0)
+        self.assertLessEqual(timings['view'], timings['total'])
+
+    def test_metrics_endpoint_is_staff_only(self):
+        self.client.get(reverse('flux'))
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 302)
+
+        self.alice.is_staff = True
+        self.alice.save()
+        response = self.client.get(reverse('metrics'))
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        self.assertIn('litrevu_request_duration_seconds_count{view="flux"} 1', response.content.decode())
+
+    @override_settings(SERVER_TIMING=False)
+    def test_can_be_disabled(self):
+        self.assertNotIn('Server-Timing', Client().get(reverse('index')))
+
+
+class SearchTest(TestCase):
+    """
+    Vérifie la recherche plein texte et la mise à jour de l'index par les triggers.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.alice = User.objects.create_user(username='alice', password='motdepasse')
+        self.dune = Ticket.objects.create(title='Dune', description='Une épopée sur Arrakis', user=self.alice)
+        self.other = Ticket.objects.create(title='Fondation', description='Hommage à Dune', user=self.alice)
+        self.review = Review.objects.create(
+            ticket=self.other, user=self.alice, rating=4, headline='Très bon', body='Asimov au sommet'
+        )
+        self.client.force_login(self.alice)
+
+    def found(self, query):
+        results, _ = full_text.search(query)
+        return [(result['content_type'], result['post'].id) for result in results]
+
+    def test_prefix_accent_insensitive_and_ranked(self):
+        # Le titre pèse plus que la description
+        self.assertEqual(self.found('dun'), [('TICKET', self.dune.id), ('TICKET', self.other.id)])
+        self.assertEqual(self.found('epopee arrakis'), [('TICKET', self.dune.id)])
+        self.assertEqual(self.found('asimov'), [('REVIEW', self.review.id)])
+        self.assertEqual(self.found('"OR NEAR('), [])
+
+    def test_index_follows_updates_and_deletes(self):
+        self.dune.title = 'Hyperion'
+        self.dune.description = ''
+        self.dune.save()
+        self.review.delete()
+        self.assertEqual(self.found('hyperion'), [('TICKET', self.dune.id)])
+        self.assertEqual(self.found('arrakis'), [])
+        self.assertEqual(self.found('asimov'), [])
+
+    def test_page_is_bounded(self):
+        response = self.client.get(reverse('search'), {'q': 'dune', 'page': '9' * 30})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['page'], SEARCH_MAX_PAGE)
+        self.assertEqual(full_text.search('dune', page=SEARCH_MAX_PAGE + 1), ([], False))
+
+    def test_rebuild_command(self):
+        with connection.cursor() as cursor:
+            cursor.execute("DELETE FROM litrevu_search")
+        call_command('rebuild_search_index', stdout=StringIO())
+        self.assertEqual(self.found('asimov'), [('REVIEW', self.review.id)])
+
+    def test_view_paginates_and_escapes(self):
+        for i in range(3):
+            Ticket.objects.create(title=f'<b>Saga</b> {i}', user=self.alice)
+        response = self.client.get(reverse('search'), {'q': 'saga'})
+        self.assertContains(response, '&lt;b&gt;<mark>Saga</mark>&lt;/b&gt;', count=3)
+
+        first, has_next = full_text.search('saga', page=1, page_size=2)
+        second, has_last_next = full_text.search('saga', page=2, page_size=2)
+        self.assertTrue(has_next)
+        self.assertFalse(has_last_next)
+        self.assertEqual(len({result['post'].id for result in first + second}), 3)
+
+
+class AutocompleteTest(TestCase):
+    """
+    Vérifie l'autocomplétion des noms d'utilisateur de la page des abonnements.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.alice = User.objects.create_user(username='alice', password='motdepasse')
+        for username in ('Albert', 'alfred', 'aline', 'bob'):
+            User.objects.create_user(username=username, password='motdepasse')
+        UserFollows.objects.create(user=self.alice, followed_user=User.objects.get(username='aline'))
+        self.client.force_login(self.alice)
+
+    def test_prefix_excludes_self_and_followed(self):
+        response = self.client.get(reverse('autocomplete_users'), {'q': 'AL'})
+        self.assertEqual(response.json(), {'results': ['Albert', 'alfred']})
+        self.assertEqual(autocomplete.suggest(self.alice, 'al', limit=1), ['Albert'])
+        self.assertEqual(autocomplete.suggest(self.alice, 'a b'), [])
+
+    def test_single_cached_query(self):
+        with CaptureQueriesContext(connection) as context:
+            autocomplete.suggest(self.alice, 'al')
+        self.assertEqual(len(context.captured_queries), 1)
+        with self.assertNumQueries(0):
+            autocomplete.suggest(self.alice, 'al')
+
+        # Une invalidation du flux ne vide pas l'autocomplétion, qui a ses propres compteurs
+        feed_cache.bump_versions([self.alice.id])
+        with self.assertNumQueries(0):
+            autocomplete.suggest(self.alice, 'al')
+        self.assertEqual(autocomplete.stats()['hits'], 2)
+        self.assertEqual(feed_cache.stats()['hits'] + feed_cache.stats()['misses'], 0)
+
+        # Un nouvel abonnement invalide les propositions en cache
+        UserFollows.objects.create(user=self.alice, followed_user=User.objects.get(username='alfred'))
+        self.assertEqual(autocomplete.suggest(self.alice, 'al'), ['Albert'])
+
+    def test_non_ascii_usernames_match_like_sqlite_lower(self):
+        User.objects.create_user(username='Élodie', password='motdepasse')
+        self.assertEqual(autocomplete.suggest(self.alice, 'Élo'), ['Élodie'])
+        self.assertEqual(autocomplete.suggest(self.alice, 'ÉLOD'), ['Élodie'])
+
+
+class SubscriptionsPageTest(TestCase):
+    """
+    Vérifie la pagination des listes d'abonnements et les compteurs FollowCounts.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.alice = User.objects.create_user(username='alice', password='motdepasse')
+        self.others = [User.objects.create_user(username=f'lecteur{i}', password='motdepasse') for i in range(5)]
+        for other in self.others:
+            UserFollows.objects.create(user=other, followed_user=self.alice)
+        self.client.force_login(self.alice)
+
+    def counts(self, user):
+        return FollowCounts.objects.values_list('following', 'followers').get(user=user)
+
+    def test_follower_list_is_paginated_in_constant_queries(self):
+        with CaptureQueriesContext(connection) as small:
+            self.client.get(reverse('subscriptions'))
+        for i in range(5, 60):
+            UserFollows.objects.create(
+                user=User.objects.create_user(username=f'lecteur{i}', password='motdepasse'),
+                followed_user=self.alice
+            )
+        with CaptureQueriesContext(connection) as large:
+            response = self.client.get(reverse('subscriptions'))
+        self.assertEqual(len(small.captured_queries), len(large.captured_queries))
+        self.assertContains(response, 'Abonnés (60)')
+        self.assertContains(response, 'lecteur59')
+        self.assertNotContains(response, 'lecteur9<')
+
+        response = self.client.get(reverse('subscriptions'), {'followers': response.context['next_followers']})
+        self.assertContains(response, 'lecteur9<')
+        self.assertIsNone(response.context['next_followers'])
+
+    def test_counters_follow_views_and_deletions(self):
+        self.assertEqual(self.counts(self.alice), (0, 5))
+        self.client.post(reverse('subscriptions'), {'username': 'lecteur0'})
+        self.assertEqual(self.counts(self.alice), (1, 5))
+        self.assertEqual(self.counts(self.others[0]), (1, 1))
+
+        self.client.get(reverse('unfollow_user', args=[self.others[0].id]))
+        self.others[1].delete()
+        self.assertEqual(self.counts(self.alice), (0, 4))
+
+        FollowCounts.objects.update(following=0, followers=0)
+        call_command('recount_follows', stdout=StringIO())
+        self.assertEqual(self.counts(self.alice), (0, 4))
+        self.assertEqual(self.counts(self.others[0]), (1, 0))
+
+
+class ReviewStatsTest(TestCase):
+    """
+    Vérifie les statistiques des critiques stockées sur les tickets.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.alice = User.objects.create_user(username='alice', password='motdepasse')
+        self.bob = User.objects.create_user(username='bob', password='motdepasse')
+        self.ticket = Ticket.objects.create(title='Dune', user=self.alice)
+
+    def stats(self):
+        ticket = Ticket.objects.get(pk=self.ticket.pk)
+        return ticket.review_count, ticket.rating_sum, [count for _, count in ticket.rating_histogram]
+
+    def test_create_update_and_delete(self):
+        review = Review.objects.create(ticket=self.ticket, user=self.alice, rating=4, headline='Bien')
+        Review.objects.create(ticket=self.ticket, user=self.bob, rating=2, headline='Moyen')
+        self.assertEqual(self.stats(), (2, 6, [0, 0, 1, 0, 1, 0]))
+
+        review.rating = 5
+        review.save()
+        self.assertEqual(self.stats(), (2, 7, [0, 0, 1, 0, 0, 1]))
+
+        # Un ticket chargé avant la critique ne remet pas les statistiques à zéro
+        self.ticket.title = 'Dune (édition révisée)'
+        self.ticket.save()
+        review.delete()
+        self.assertEqual(self.stats(), (1, 2, [0, 0, 1, 0, 0, 0]))
+        self.assertEqual(Ticket.objects.get(pk=self.ticket.pk).title, 'Dune (édition révisée)')
+
+    def test_recount_command(self):
+        Review.objects.bulk_create([
+            Review(ticket=self.ticket, user=self.alice, rating=3, headline='A'),
+            Review(ticket=self.ticket, user=self.bob, rating=5, headline='B'),
+        ])
+        self.assertEqual(self.stats(), (0, 0, [0] * 6))
+        call_command('recount_review_stats', '--batch-size', '1', stdout=StringIO())
+        self.assertEqual(self.stats(), (2, 8, [0, 0, 0, 1, 0, 1]))
+
+    def test_flux_shows_average_without_extra_queries(self):
+        Review.objects.create(ticket=self.ticket, user=self.bob, rating=3, headline='Moyen')
+        self.client.force_login(self.alice)
+        response = self.client.get(reverse('flux'))
+        self.assertContains(response, '1 critique - note moyenne 3,0/5', count=2)
+
+
+class FeedApiTest(TestCase):
+    """
+    Vérifie le flux JSON et ses réponses conditionnelles (ETag).
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.alice = User.objects.create_user(username='alice', password='motdepasse')
+        self.bob = User.objects.create_user(username='bob', password='motdepasse')
+        self.carol = User.objects.create_user(username='carol', password='motdepasse')
+        UserFollows.objects.create(user=self.alice, followed_user=self.bob)
+        self.ticket = Ticket.objects.create(title='Dune', user=self.bob)
+        self.client.force_login(self.alice)
+
+    def test_same_posts_as_flux_with_cursor(self):
+        for i in range(25):
+            Ticket.objects.create(title=f'Livre {i}', user=self.bob)
+        first = self.client.get(reverse('api_flux')).json()
+        html = self.client.get(reverse('flux')).context
+        self.assertEqual([post['id'] for post in first['results']], [post.id for post in html['posts']])
+        self.assertEqual(first['next_cursor'], html['next_cursor'])
+
+        second = self.client.get(reverse('api_flux'), {'cursor': first['next_cursor']}).json()
+        self.assertEqual(second['results'][-1]['title'], 'Dune')
+        self.assertIsNone(second['next_cursor'])
+
+    def test_unchanged_feed_answers_304_without_feed_query(self):
+        response = self.client.get(reverse('api_flux'))
+        etag = response['ETag']
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse('api_flux'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertFalse([query for query in context.captured_queries if 'litrevu_' in query['sql']])
+
+        # Une critique d'un inconnu sur un ticket suivi change ses statistiques
+        Review.objects.create(ticket=self.ticket, user=self.carol, rating=4, headline='Bien')
+        response = self.client.get(reverse('api_flux'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'][0]['review_count'], 1)
+        self.assertNotEqual(response['ETag'], etag)
+
+
+class LiveEventsTest(TestCase):
+    """
+    Vérifie l'annonce en direct des nouveaux posts (Server-Sent Events).
+    """
+
+    def setUp(self):
+        live.reset_broker()
+        self.alice = User.objects.create_user(username='alice', password='motdepasse')
+        self.bob = User.objects.create_user(username='bob', password='motdepasse')
+        UserFollows.objects.create(user=self.alice, followed_user=self.bob)
+
+    def tearDown(self):
+        live.reset_broker()
+
+    def test_new_posts_are_published_to_readers_after_commit(self):
+        broker = live.get_broker()
+        with mock.patch.object(broker, 'publish') as publish:
+            with self.captureOnCommitCallbacks(execute=True):
+                ticket = Ticket.objects.create(title='Dune', user=self.bob)
+            publish.assert_called_once_with({self.alice.id}, live.post_event(ticket, 'TICKET'))
+
+            publish.reset_mock()
+            with self.captureOnCommitCallbacks(execute=True):
+                ticket.title = 'Dune (révisé)'
+                ticket.save()
+                review = Review.objects.create(ticket=ticket, user=self.alice, rating=5, headline='Culte')
+            publish.assert_called_once_with({self.bob.id}, live.post_event(review, 'REVIEW'))
+
+    def test_requires_asgi(self):
+        self.client.force_login(self.alice)
+        self.assertEqual(self.client.get(reverse('live_events')).status_code, 501)
+        # Sous WSGI, le flux n'ouvre pas de connexion vouée à l'échec
+        self.assertNotContains(self.client.get(reverse('flux')), 'EventSource')
+
+    async def test_flux_opens_stream_only_when_enabled(self):
+        await self.async_client.aforce_login(self.alice)
+        response = await self.async_client.get(reverse('flux'))
+        self.assertContains(response, 'EventSource')
+
+        with override_settings(LIVE_EVENTS=False):
+            response = await self.async_client.get(reverse('flux'))
+            self.assertNotContains(response, 'EventSource')
+            self.assertEqual((await self.async_client.get(reverse('live_events'))).status_code, 404)
+
+    async def test_stream_delivers_events_and_limits_connections(self):
+        broker = live.get_broker()
+        broker.max_connections = 1
+        await self.async_client.aforce_login(self.alice)
+        response = await self.async_client.get(reverse('live_events'))
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        stream = response.streaming_content
+        self.assertTrue((await anext(stream)).startswith(b'retry:'))
+        self.assertEqual(broker.connections, 1)
+
+        rejected = await self.async_client.get(reverse('live_events'))
+        self.assertEqual(rejected.status_code, 503)
+
+        # Publication depuis un autre thread, comme depuis une vue synchrone
+        await sync_to_async(broker.publish, thread_sensitive=False)({self.alice.id}, {'type': 'TICKET', 'id': 7})
+        self.assertEqual(await anext(stream), b'event: ticket\ndata: {"type": "TICKET", "id": 7}\n\n')
+
+        # Une déconnexion du client annule la tâche qui attend le prochain événement
+        waiting = asyncio.ensure_future(anext(stream))
+        await asyncio.sleep(0)
+        waiting.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await waiting
+        self.assertEqual(broker.connections, 0)
+
+
+class AsyncViewsTest(TestCase):
+    """
+    Vérifie que les versions asynchrones de flux, posts et subscriptions
+    (ASYNC_VIEWS) affichent le même contenu que les vues synchrones.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.alice = User.objects.create_user(username='alice', password='motdepasse')
+        self.bob = User.objects.create_user(username='bob', password='motdepasse')
+        UserFollows.objects.create(user=self.alice, followed_user=self.bob)
+        UserFollows.objects.create(user=self.bob, followed_user=self.alice)
+        ticket = Ticket.objects.create(title='Dune', user=self.bob)
+        Review.objects.create(ticket=ticket, user=self.alice, rating=4, headline='Culte')
+        Ticket.objects.create(title='Fondation', user=self.alice)
+        self.client.force_login(self.alice)
+
+    def summary(self, context):
+        if 'posts' in context:
+            return [(post.content_type, post.id) for post in context['posts']], context['next_cursor']
+        return (
+            [follow.id for follow in context['followed_users']],
+            [follow.id for follow in context['followers']],
+            (context['counts'].following, context['counts'].followers),
+        )
+
+    async def test_async_views_match_sync_views(self):
+        await self.async_client.aforce_login(self.alice)
+        for name in ('flux', 'posts', 'subscriptions'):
+            expected = await sync_to_async(self.client.get)(reverse(name))
+            with override_settings(ROOT_URLCONF='webapp.urls_async'):
+                response = await self.async_client.get(reverse(name))
+                self.assertIs(response.resolver_match.func, getattr(async_views, name))
+            self.assertEqual(self.summary(response.context), self.summary(expected.context))
+            # Les requêtes exécutées par l'ORM asynchrone sont comptées
+            self.assertIn('db-queries;desc=', response['Server-Timing'])
+            self.assertNotIn('db-queries;desc=0,', response['Server-Timing'])
+
+    @override_settings(ROOT_URLCONF='webapp.urls_async')
+    async def test_subscriptions_form_follows_user(self):
+        charlie = await User.objects.acreate(username='charlie')
+        await self.async_client.aforce_login(self.alice)
+        response = await self.async_client.post(reverse('subscriptions'), {'username': 'charlie'})
+        self.assertIsNone(response.context['error_message'])
+        self.assertTrue(await UserFollows.objects.filter(user=self.alice, followed_user=charlie).aexists())
+        self.assertEqual(response.context['counts'].following, 2)
+
+
+class MediaServingTest(TestCase):
+    """
+    Vérifie le service des fichiers envoyés : en-têtes de cache, requêtes conditionnelles et Range.
+    """
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        override = override_settings(MEDIA_ROOT=self.media_root)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        self.content = bytes(range(256)) * 4
+        self.cover = default_storage.save(f'covers/ab/{"ab" * 32}.jpg', ContentFile(self.content))
+        self.other = default_storage.save('notes.txt', ContentFile(b'texte'))
+
+    def get(self, name, **headers):
+        return self.client.get(f'/media/{name}', headers=headers)
+
+    def test_cover_is_immutable_and_revalidated_without_body(self):
+        response = self.get(self.cover)
+        self.assertEqual(b''.join(response.streaming_content), self.content)
+        self.assertEqual(response['Content-Type'], 'image/jpeg')
+        self.assertEqual(response['ETag'], f'"{"ab" * 32}"')
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertNotIn('immutable', self.get(self.other)['Cache-Control'])
+
+        self.assertEqual(self.get(self.cover, if_none_match=response['ETag']).status_code, 304)
+        self.assertEqual(self.get(self.cover, if_modified_since=response['Last-Modified']).status_code, 304)
+        self.assertEqual(self.get('../settings.py').status_code, 404)
+        self.assertEqual(self.client.post(f'/media/{self.cover}').status_code, 405)
+
+    def test_range_requests(self):
+        response = self.get(self.cover, range='bytes=10-19')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], f'bytes 10-19/{len(self.content)}')
+        self.assertEqual(b''.join(response.streaming_content), self.content[10:20])
+
+        response = self.get(self.cover, range='bytes=-5')
+        self.assertEqual(b''.join(response.streaming_content), self.content[-5:])
+        self.assertEqual(self.get(self.cover, range='bytes=5000-').status_code, 416)
+        # Un If-Range périmé renvoie le fichier entier
+        self.assertEqual(self.get(self.cover, range='bytes=0-1', if_range='"ancien"').status_code, 200)
+
+    def test_sendfile_offload(self):
+        with override_settings(MEDIA_SENDFILE='x-accel-redirect'):
+            response = self.get(self.cover)
+        self.assertEqual(response['X-Accel-Redirect'], f'/protected-media/{self.cover}')
+        self.assertEqual(response.content, b'')
+        with override_settings(MEDIA_SENDFILE='x-sendfile'):
+            response = self.get(self.cover)
+        self.assertEqual(response['X-Sendfile'], os.path.join(self.media_root, self.cover))
+
+
+class DatabaseProfileTest(TestCase):
+    """
+    Vérifie le profil SQLite de production : pragmas, connexion en lecture seule et routage.
+    """
+
+    def test_production_connections_apply_pragmas(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        handler = ConnectionHandler(sqlite_databases(os.path.join(directory, 'db.sqlite3'), 'production'))
+        self.addCleanup(handler.close_all)
+
+        with handler['default'].cursor() as cursor:
+            cursor.execute('CREATE TABLE livre (titre TEXT)')
+            for pragma, expected in (('journal_mode', 'wal'), ('synchronous', 1), ('busy_timeout', 5000)):
+                cursor.execute(f'PRAGMA {pragma}')
+                self.assertEqual(cursor.fetchone()[0], expected)
+        with handler['replica'].cursor() as cursor:
+            cursor.execute('SELECT COUNT(*) FROM livre')
+            self.assertEqual(cursor.fetchone()[0], 0)
+            with self.assertRaises(OperationalError):
+                cursor.execute("INSERT INTO livre VALUES ('Dune')")
+
+    def test_read_only_views_read_from_replica(self):
+        router = ReadReplicaRouter()
+        view = read_only(lambda request: (router.db_for_read(Ticket), router.db_for_write(Ticket)))
+        self.assertEqual(view(RequestFactory().get('/flux/')), ('replica', 'default'))
+        self.assertEqual(view(RequestFactory().post('/flux/')), ('default', 'default'))
+        self.assertEqual(router.db_for_read(Ticket), 'default')
+        self.assertFalse(router.allow_migrate('replica', 'litrevu'))
+
+
+@override_settings(GROUP_COMMIT=True)
+class GroupCommitTest(TransactionTestCase):
+    """
+    Vérifie le regroupement des insertions par le thread d'écriture.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='alice', password='secret')
+        self.addCleanup(group_commit.reset_writer)
+
+    def create_ticket(self, title):
+        ticket = Ticket.objects.create(title=title, user=self.user)
+        # Transaction englobante du lot en cours
+        return ticket.pk, id(transaction.get_connection().atomic_blocks[0])
+
+    def test_concurrent_inserts_share_one_transaction(self):
+        writer = group_commit.GroupCommitWriter(window=0.5, max_batch=3)
+        self.addCleanup(writer.stop)
+        futures = [writer.submit(lambda title=title: self.create_ticket(title)) for title in 'ABC']
+        results = [future.result(timeout=5) for future in futures]
+
+        expected = list(Ticket.objects.order_by('title').values_list('pk', flat=True))
+        self.assertEqual([pk for pk, _ in results], expected)
+        self.assertEqual(len({block for _, block in results}), 1)
+
+    def test_insert_returns_the_new_primary_key(self):
+        ticket = Ticket(title='Dune', user=self.user)
+        ticket_pk = group_commit.run(lambda: views._insert_ticket(ticket))
+        self.assertEqual(ticket_pk, Ticket.objects.get(title='Dune').pk)
+
+        review = Review(ticket_id=ticket_pk, user=self.user, rating=4, headline='Bien')
+        review_pk = group_commit.run(lambda: views._insert_review(review))
+        self.assertEqual(review_pk, Review.objects.get(headline='Bien').pk)
+
+    def test_integrity_error_only_fails_its_caller(self):
+        ticket = Ticket.objects.create(title='Dune', user=self.user)
+        Review.objects.create(ticket=ticket, user=self.user, rating=4, headline='Bien')
+        writer = group_commit.GroupCommitWriter(window=0.5, max_batch=2)
+        self.addCleanup(writer.stop)
+        duplicate = writer.submit(
+            lambda: Review.objects.create(ticket=ticket, user=self.user, rating=1, headline='Bis')
+        )
+        other = writer.submit(lambda: self.create_ticket('Hypérion'))
+
+        with self.assertRaises(IntegrityError):
+            duplicate.result(timeout=5)
+        self.assertEqual(other.result(timeout=5)[0], Ticket.objects.get(title='Hypérion').pk)
+        self.assertEqual(Review.objects.count(), 1)
+
+    def test_timeout_cancels_a_pending_insert(self):
+        started, release = threading.Event(), threading.Event()
+        blocking = group_commit.get_writer().submit(lambda: (started.set(), release.wait(5)))
+        started.wait(5)
+
+        with self.assertRaises(group_commit.WriteTimeout):
+            group_commit.run(lambda: self.create_ticket('Abandonné'), timeout=0.05)
+        release.set()
+        blocking.result(timeout=5)
+        self.assertFalse(Ticket.objects.filter(title='Abandonné').exists())
+
+    def test_running_insert_is_awaited_for_a_bounded_time(self):
+        release = threading.Event()
+        with self.assertRaises(group_commit.WriteTimeout) as raised:
+            group_commit.run(lambda: (release.wait(5), self.create_ticket('Lent')), timeout=0.05)
+        self.assertFalse(raised.exception.cancelled)
+        release.set()
+
+    def test_view_answers_503_when_writer_is_busy(self):
+        self.client.force_login(self.user)
+        started, release = threading.Event(), threading.Event()
+        blocking = group_commit.get_writer().submit(lambda: (started.set(), release.wait(5)))
+        started.wait(5)
+
+        with mock.patch.object(group_commit.run, '__defaults__', (0.05,)):
+            response = self.client.post(reverse('create_ticket'), {'title': 'Dune', 'description': ''})
+        release.set()
+        blocking.result(timeout=5)
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '5')
+        self.assertContains(response, "n&#x27;a pas été enregistrée", status_code=503)
+        self.assertFalse(Ticket.objects.filter(title='Dune').exists())
+
+
+@override_settings(
+    SESSION_ENGINE='litrevu.sessions',
+    MESSAGE_STORAGE='django.contrib.messages.storage.fallback.FallbackStorage',
+)
+class LocalSessionCacheTest(TestCase):
+    """
+    Vérifie les sessions servies par le cache local et les messages stockés dans un cookie.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='alice', password='secret')
+        self.client.force_login(self.user)
+        self.addCleanup(sessions.local_cache.clear)
+
+    def test_cached_session_is_read_without_query(self):
+        self.client.get(reverse('flux'))
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse('flux'))
+        self.assertFalse(any('django_session' in query['sql'] for query in queries))
+
+        # Une session absente du cache est relue en base
+        sessions.local_cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse('flux'))
+        self.assertTrue(any('django_session' in query['sql'] for query in queries))
+
+    def test_unchanged_session_is_not_written(self):
+        session = sessions.SessionStore(self.client.session.session_key)
+        session['theme'] = 'sombre'
+        session.save()
+
+        session = sessions.SessionStore(session.session_key)
+        session['theme'] = 'sombre'
+        with self.assertNumQueries(0):
+            session.save()
+        session['theme'] = 'clair'
+        with CaptureQueriesContext(connection) as queries:
+            session.save()
+        self.assertTrue(any(query['sql'].startswith('UPDATE') for query in queries))
+
+    def test_flash_messages_are_kept_in_cookie(self):
+        response = self.client.post(reverse('create_ticket'), {'title': 'Dune', 'description': ''})
+        self.assertIn('messages', response.cookies)
+        self.assertNotIn('_messages', self.client.session.load())
+
+        response = self.client.get(reverse('flux'))
+        self.assertContains(response, SUCCESS_MESSAGES['TICKET_CREATED'])
+
+
+class PostCardCacheTest(TestCase):
+    """
+    Vérifie que seules les cartes de posts nouvelles ou modifiées sont rendues.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.alice = User.objects.create_user(username='alice', password='secret')
+        self.bob = User.objects.create_user(username='bob', password='secret')
+        UserFollows.objects.create(user=self.bob, followed_user=self.alice)
+        self.dune = Ticket.objects.create(title='Dune', user=self.alice)
+        self.hyperion = Ticket.objects.create(title='Hypérion', user=self.alice)
+
+    def rendered_titles(self, user, url_name='flux'):
+        self.client.force_login(user)
+        with mock.patch.object(cards, 'render_card', wraps=cards.render_card) as render_card:
+            response = self.client.get(reverse(url_name))
+        self.assertEqual(response.status_code, 200)
+        return sorted(call.args[0].title for call in render_card.call_args_list)
+
+    def test_only_changed_cards_are_rendered(self):
+        self.assertEqual(self.rendered_titles(self.alice), ['Dune', 'Hypérion'])
+        self.assertEqual(self.rendered_titles(self.alice), [])
+
+        Ticket.objects.filter(pk=self.dune.pk).update(title='Dune (édition 2021)')
+        self.assertEqual(self.rendered_titles(self.alice), ['Dune (édition 2021)'])
+
+    def test_cards_depend_on_viewer(self):
+        self.rendered_titles(self.alice)
+        self.assertEqual(self.rendered_titles(self.bob), ['Dune', 'Hypérion'])
+        response = self.client.get(reverse('flux'))
+        self.assertContains(response, 'alice a demandé une critique', count=2)
+        self.assertContains(response, 'btn-sm">Créer une critique</a>', count=2)
+
+    def test_posts_page_shows_owner_actions(self):
+        self.client.force_login(self.alice)
+        response = self.client.get(reverse('posts'))
+        self.assertContains(response, reverse('update_ticket', args=[self.dune.id]))
+        self.assertContains(response, 'Vous avez publié un ticket', count=2)
+
+
+class LoginThrottleTest(TestCase):
+    """
+    Vérifie que les tentatives de connexion au-delà des limites sont refusées sans hachage.
+    """
+
+    def setUp(self):
+        cache.clear()
+        User.objects.create_user(username='alice', password='secret')
+
+    def attempt(self, username, **extra):
+        return self.client.post(reverse('login'), {'username': username, 'password': 'faux'}, **extra)
+
+    def test_username_bucket_rejects_before_authenticate(self):
+        with mock.patch('litrevu.views.authenticate', return_value=None) as authenticate:
+            statuses = [self.attempt('Alice').status_code for _ in range(LOGIN_USERNAME_BURST + 1)]
+        self.assertEqual(statuses, [302] * LOGIN_USERNAME_BURST + [429])
+        self.assertEqual(authenticate.call_count, LOGIN_USERNAME_BURST)
+
+        # Le seau est commun aux variantes de casse, et la réponse ne dépend pas de l'existence du compte
+        for username in ('alice', ' ALICE '):
+            response = self.attempt(username)
+            self.assertEqual(response.status_code, 429)
+            self.assertContains(response, 'Trop de tentatives', status_code=429)
+        self.assertEqual(self.attempt('inconnu').status_code, 302)
+        self.assertEqual(login_throttle.stats(), {'rejected_ip': 0, 'rejected_username': 3})
+
+    def test_ip_bucket_limits_attempts_across_usernames(self):
+        with mock.patch('litrevu.views.authenticate', return_value=None) as authenticate:
+            for index in range(LOGIN_IP_BURST):
+                self.assertEqual(self.attempt(f'lecteur{index}').status_code, 302)
+            response = self.attempt('lecteur-suivant')
+            # Une autre adresse n'est pas concernée
+            other = self.attempt('lecteur-suivant', REMOTE_ADDR='203.0.113.7')
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(int(response['Retry-After']), math.ceil(1 / LOGIN_IP_RATE))
+        self.assertEqual(other.status_code, 302)
+        self.assertEqual(authenticate.call_count, LOGIN_IP_BURST + 1)
+        self.assertEqual(login_throttle.stats()['rejected_ip'], 1)
+
+    def test_client_ip(self):
+        factory = RequestFactory()
+        self.assertEqual(
+            login_throttle.client_ip(factory.post('/login/', REMOTE_ADDR='2001:db8::1')),
+            login_throttle.client_ip(factory.post('/login/', REMOTE_ADDR='2001:db8::ffff')),
+        )
+        with override_settings(LOGIN_THROTTLE_IP_HEADER='HTTP_X_FORWARDED_FOR'):
+            request = factory.post('/login/', HTTP_X_FORWARDED_FOR='198.51.100.1, 203.0.113.7')
+            self.assertEqual(login_throttle.client_ip(request), '203.0.113.7')
@@ -0,0 +1,196 @@
+from collections import defaultdict
+from django.conf import settings
+from django.db.models import Q
+from .models import Ticket, Review, UserFollows, FeedEntry
+from .feed import flux_querysets
+
+# Nombre de lignes insérées par requête lors des écritures en masse
+BATCH_SIZE = 1000
+
+
+def is_enabled():
+    """
+    Indique si le flux doit être lu depuis la timeline matérialisée.
+
+    Returns:
+        bool: Valeur du paramètre FEED_USE_TIMELINE (False par défaut)
+    """
+    return getattr(settings, 'FEED_USE_TIMELINE', False)
+
+
+def _followers_of(user):
+    """Retourne les identifiants des utilisateurs qui suivent `user`."""
+    return list(UserFollows.objects.filter(followed_user=user).values_list('user', flat=True))
+
+
+def _fan_out(owner_ids, post_type, post_id, time_created):
+    """Insère un post dans le flux de chacun des propriétaires donnés."""
+    FeedEntry.objects.bulk_create(
+        [
+            FeedEntry(owner_id=owner_id, post_type=post_type, post_id=post_id, time_created=time_created)
+            for owner_id in set(owner_ids)
+        ],
+        batch_size=BATCH_SIZE,
+        ignore_conflicts=True
+    )
+
+
+def add_ticket(ticket):
+    """
+    Publie un nouveau ticket dans le flux de son auteur et de ses abonnés.
+
+    Appelé par le signal post_save de Ticket.
+
+    Args:
+        ticket (Ticket): Le ticket qui vient d'être créé
+    """
+    owners = _followers_of(ticket.user_id) + [ticket.user_id]
+    _fan_out(owners, 'TICKET', ticket.id, ticket.time_created)
+
+
+def add_review(review):
+    """
+    Publie une nouvelle critique dans le flux de son auteur, de ses abonnés
+    et de l'auteur du ticket critiqué.
+
+    Appelé par le signal post_save de Review.
+
+    Args:
+        review (Review): La critique qui vient d'être créée
+    """
+    owners = _followers_of(review.user_id) + [review.user_id, review.ticket.user_id]
+    _fan_out(owners, 'REVIEW', review.id, review.time_created)
+
+
+def remove_ticket(ticket):
+    """
+    Retire un ticket de tous les flux.
+
+    Appelé par le signal post_delete de Ticket ; les critiques supprimées en
+    cascade sont retirées par le signal post_delete de Review.
+
+    Args:
+        ticket (Ticket): Le ticket supprimé
+    """
+    FeedEntry.objects.filter(post_type='TICKET', post_id=ticket.id).delete()
+
+
+def remove_review(review):
+    """
+    Retire une critique de tous les flux.
+
+    Appelé par le signal post_delete de Review.
+
+    Args:
+        review (Review): La critique supprimée
+    """
+    FeedEntry.objects.filter(post_type='REVIEW', post_id=review.id).delete()
+
+
+def add_posts(tickets=(), reviews=()):
+    """
+    Publie des posts créés en masse (import) dans le flux de leurs lecteurs.
+
+    Les abonnés de tous les auteurs et les auteurs des tickets critiqués sont
+    lus en deux requêtes, quel que soit le nombre de posts.
+
+    Args:
+        tickets (list): Tickets enregistrés, avec leur identifiant
+        reviews (list): Critiques enregistrées, avec leur identifiant
+    """
+    followers = defaultdict(set)
+    authors = {post.user_id for post in tickets} | {post.user_id for post in reviews}
+    for user_id, followed_id in UserFollows.objects.filter(followed_user__in=authors).values_list(
+        'user', 'followed_user'
+    ):
+        followers[followed_id].add(user_id)
+    ticket_owners = dict(
+        Ticket.objects.filter(id__in={review.ticket_id for review in reviews}).values_list('id', 'user')
+    )
+    entries = [
+        FeedEntry(owner_id=owner_id, post_type='TICKET', post_id=ticket.id, time_created=ticket.time_created)
+        for ticket in tickets
+        for owner_id in followers[ticket.user_id] | {ticket.user_id}
+    ] + [
+        FeedEntry(owner_id=owner_id, post_type='REVIEW', post_id=review.id, time_created=review.time_created)
+        for review in reviews
+        for owner_id in followers[review.user_id] | {review.user_id, ticket_owners[review.ticket_id]}
+    ]
+    FeedEntry.objects.bulk_create(entries, batch_size=BATCH_SIZE, ignore_conflicts=True)
+
+
+def add_follows(follows):
+    """
+    Ajoute au flux de chaque abonné les posts existants de l'utilisateur suivi.
+
+    Appelé par le signal post_save de UserFollows et par l'import en masse.
+
+    Args:
+        follows (list): Abonnements (UserFollows) enregistrés
+    """
+    followers = defaultdict(set)
+    for follow in follows:
+        followers[follow.followed_user_id].add(follow.user_id)
+    entries = [
+        FeedEntry(owner_id=owner_id, post_type='TICKET', post_id=post_id, time_created=time_created)
+        for post_id, user_id, time_created in Ticket.objects.filter(user__in=list(followers)).values_list(
+            'id', 'user', 'time_created'
+        )
+        for owner_id in followers[user_id]
+    ] + [
+        FeedEntry(owner_id=owner_id, post_type='REVIEW', post_id=post_id, time_created=time_created)
+        for post_id, user_id, time_created in Review.objects.filter(user__in=list(followers)).values_list(
+            'id', 'user', 'time_created'
+        )
+        for owner_id in followers[user_id]
+    ]
+    FeedEntry.objects.bulk_create(entries, batch_size=BATCH_SIZE, ignore_conflicts=True)
+
+
+def unfollow(follow):
+    """
+    Retire du flux de l'abonné les posts de l'utilisateur qui n'y sont plus visibles.
+
+    Les critiques de l'utilisateur suivi portant sur les tickets de l'abonné
+    restent visibles et sont donc conservées. Appelé par le signal post_delete
+    de UserFollows.
+
+    Args:
+        follow (UserFollows): L'abonnement supprimé
+    """
+    ticket_ids = Ticket.objects.filter(user=follow.followed_user_id).values_list('id', flat=True)
+    review_ids = Review.objects.filter(user=follow.followed_user_id).exclude(
+        ticket__user=follow.user_id
+    ).values_list('id', flat=True)
+    FeedEntry.objects.filter(owner=follow.user_id).filter(
+        Q(post_type='TICKET', post_id__in=ticket_ids) |
+        Q(post_type='REVIEW', post_id__in=review_ids)
+    ).delete()
+
+
+def rebuild(users, batch_size=BATCH_SIZE):
+    """
+    Reconstruit entièrement la timeline des utilisateurs donnés à partir des
+    tables Ticket, Review et UserFollows.
+
+    Args:
+        users (iterable): Les utilisateurs dont le flux est reconstruit
+        batch_size (int): Nombre de lignes insérées par requête
+
+    Returns:
+        int: Nombre total d'entrées écrites
+    """
+    total = 0
+    for user in users:
+        FeedEntry.objects.filter(owner=user).delete()
+        tickets, reviews = flux_querysets(user)
+        entries = [
+            FeedEntry(owner=user, post_type='TICKET', post_id=post_id, time_created=time_created)
+            for post_id, time_created in tickets.values_list('id', 'time_created').iterator(chunk_size=batch_size)
+        ] + [
+            FeedEntry(owner=user, post_type='REVIEW', post_id=post_id, time_created=time_created)
+            for post_id, time_created in reviews.values_list('id', 'time_created').iterator(chunk_size=batch_size)
+        ]
+        FeedEntry.objects.bulk_create(entries, batch_size=batch_size)
+        total += len(entries)
+    return total
@@ -1,17 +1,30 @@
-from django.db.models import Value, CharField
+from django.db import transaction, IntegrityError
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse, Http404
+from django.contrib.admin.views.decorators import staff_member_required
 from django.shortcuts import render, redirect, get_object_or_404
-from django.db.models import Q
 from django.contrib.auth import login, authenticate
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth import logout as auth_logout
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_safe
 from .forms import TicketForm, ReviewForm
-from itertools import chain
-from operator import attrgetter
 from .models import Ticket, Review, UserFollows
+from .feed import (
+    flux_querysets, posts_querysets, feed_keys, timeline_keys, load_page, decode_cursor, encode_cursor
+)
+from . import (
+    api, cards, covers, timeline, feed_cache, group_commit, image_jobs, export, autocomplete, follows, live,
+    login_throttle, media, search as full_text
+)
+from .instrumentation import registry
+from .routers import read_only
 from django.contrib.auth.models import User
-from .constants import ERROR_MESSAGES, SUCCESS_MESSAGES, MAX_RATING
+from .constants import (
+    ERROR_MESSAGES, SUCCESS_MESSAGES, MAX_RATING, LIVE_KEEPALIVE_INTERVAL, GROUP_COMMIT_RETRY_AFTER, SEARCH_MAX_PAGE
+)
 
 
 def index(request):
@@ -68,6 +81,9 @@ def user_login(request):
     établit une session si l'authentification réussit et redirige
     vers le flux principal.
 
+    Au-delà des limites de litrevu/login_throttle.py, la tentative est refusée
+    (statut 429) avant authenticate(), sans calcul de hachage.
+
     Args:
         request (HttpRequest): L'objet requête HTTP contenant les identifiants
 
@@ -79,6 +95,14 @@ def user_login(request):
         username = request.POST.get('username')
         password = request.POST.get('password')
 
+        # Tentative refusée sans hachage du mot de passe
+        retry_after = login_throttle.check(request, username)
+        if retry_after:
+            messages.error(request, ERROR_MESSAGES['LOGIN_THROTTLED'].format(seconds=retry_after))
+            response = render(request, 'litrevu/index.html', status=429)
+            response['Retry-After'] = str(retry_after)
+            return response
+
         user = authenticate(request, username=username, password=password)
 
         if user is not None:
@@ -106,6 +130,58 @@ def user_logout(request):
     return redirect('index')
 
 
+def _insert_ticket(ticket):
+    """
+    Enregistre un nouveau ticket et programme le traitement de son image.
+
+    Returns:
+        int: Identifiant du ticket créé, transmis à l'appelant par group_commit.run
+    """
+    ticket.save()
+    # Le traitement de l'image est confié à process_image_jobs
+    image_jobs.enqueue(ticket)
+    return ticket.pk
+
+
+def _insert_review(review):
+    """
+    Enregistre une nouvelle critique.
+
+    Returns:
+        int: Identifiant de la critique créée, transmis à l'appelant par group_commit.run
+    """
+    review.save()
+    return review.pk
+
+
+def _write_timeout_message(error, ticket=None):
+    """
+    Retourne le message à afficher lorsqu'une écriture n'a pas été validée à temps.
+
+    Si l'écriture a été annulée, la référence prise à l'enregistrement de l'image
+    du ticket (voir ContentAddressedStorage.save) est rendue.
+
+    Args:
+        error (WriteTimeout): L'exception levée par group_commit.run
+        ticket (Ticket, optional): Ticket dont l'image a été enregistrée avant l'écriture
+
+    Returns:
+        str: Le message d'erreur
+    """
+    if not error.cancelled:
+        return ERROR_MESSAGES['WRITE_UNCONFIRMED']
+    if ticket is not None and ticket.image:
+        covers.release(ticket.image.name, ticket.image.storage)
+    return ERROR_MESSAGES['WRITE_TIMEOUT']
+
+
+def _render_write_timeout(request, template_name, context):
+    """Réaffiche un formulaire dont l'écriture n'a pas été validée à temps (statut 503)."""
+    response = render(request, template_name, context, status=503)
+    response['Retry-After'] = str(GROUP_COMMIT_RETRY_AFTER)
+    return response
+
+
 @login_required
 def create_ticket(request):
     """
@@ -126,7 +202,12 @@ def create_ticket(request):
         if form.is_valid():
             ticket = form.save(commit=False)
             ticket.user = request.user
-            ticket.save()
+            group_commit.store_files(ticket)
+            try:
+                group_commit.run(lambda: _insert_ticket(ticket))
+            except group_commit.WriteTimeout as error:
+                messages.error(request, _write_timeout_message(error, ticket))
+                return _render_write_timeout(request, 'litrevu/create_ticket.html', {'form': form})
             messages.success(request, SUCCESS_MESSAGES['TICKET_CREATED'])
             return redirect('flux')
     else:
@@ -153,15 +234,17 @@ def create_review(request, ticket_id=None):
                      vers le flux si la critique est créée avec succès
 
     Notes:
-        - Vérifie si l'utilisateur a déjà posté une critique pour le ticket
+        - Refuse une seconde critique du même utilisateur sur un ticket grâce à la
+          contrainte d'unicité (ticket, user), sans requête de vérification préalable
         - Gère deux formulaires lorsqu'un nouveau ticket est créé avec la critique
     """
     # Déterminer si on répond à un ticket existant ou si on crée un nouveau
     existing_ticket = None
     if ticket_id:
         existing_ticket = get_object_or_404(Ticket, id=ticket_id)
-        # Vérifier si l'utilisateur a déjà posté une critique pour ce ticket
-        if Review.objects.filter(ticket=existing_ticket, user=request.user).exists():
+        # Inutile d'afficher le formulaire si l'utilisateur a déjà critiqué ce ticket.
+        # À l'envoi, c'est la contrainte d'unicité (ticket, user) qui fait foi.
+        if request.method != 'POST' and Review.objects.filter(ticket=existing_ticket, user=request.user).exists():
             messages.error(request, ERROR_MESSAGES['ALREADY_REVIEWED'])
             return redirect('flux')
 
@@ -173,24 +256,45 @@ def create_review(request, ticket_id=None):
                 review = review_form.save(commit=False)
                 review.user = request.user
                 review.ticket = existing_ticket
-                review.save()
+                try:
+                    # Une seule insertion : la contrainte d'unicité détecte une critique déjà publiée
+                    group_commit.run(lambda: _insert_review(review))
+                except IntegrityError:
+                    messages.error(request, ERROR_MESSAGES['ALREADY_REVIEWED'])
+                except group_commit.WriteTimeout as error:
+                    messages.error(request, _write_timeout_message(error))
+                    return _render_write_timeout(request, 'litrevu/create_review.html', {
+                        'ticket_form': None,
+                        'review_form': review_form,
+                        'existing_ticket': existing_ticket
+                    })
                 return redirect('flux')
         else:
             # Création d'un nouveau ticket et d'une critique
             ticket_form = TicketForm(request.POST, request.FILES)
             review_form = ReviewForm(request.POST)
             if ticket_form.is_valid() and review_form.is_valid():
-                # Créer le ticket
                 ticket = ticket_form.save(commit=False)
                 ticket.user = request.user
-                ticket.save()
-
-                # Créer la critique associée au ticket
+                group_commit.store_files(ticket)
                 review = review_form.save(commit=False)
                 review.user = request.user
-                review.ticket = ticket
-                review.save()
 
+                def insert_ticket_and_review():
+                    # Créer le ticket, puis la critique associée, dans la même transaction
+                    _insert_ticket(ticket)
+                    review.ticket = ticket
+                    return _insert_review(review)
+
+                try:
+                    group_commit.run(insert_ticket_and_review)
+                except group_commit.WriteTimeout as error:
+                    messages.error(request, _write_timeout_message(error, ticket))
+                    return _render_write_timeout(request, 'litrevu/create_review.html', {
+                        'ticket_form': ticket_form,
+                        'review_form': review_form,
+                        'existing_ticket': None
+                    })
                 return redirect('flux')
     else:
         review_form = ReviewForm()
@@ -203,46 +307,69 @@ def create_review(request, ticket_id=None):
     })
 
 
+@read_only
 @login_required
 def posts(request):
     """
     Affiche tous les posts (tickets et critiques) créés par l'utilisateur connecté.
 
-    Récupère et combine les tickets et critiques de l'utilisateur,
-    les trie par date de création (du plus récent au plus ancien)
-    et les prépare pour l'affichage.
+    Récupère une page des tickets et critiques de l'utilisateur, triés
+    par date de création (du plus récent au plus ancien) directement en base.
+    Le paramètre GET 'cursor' permet de charger la page suivante. L'ordre
+    des posts de chaque page est conservé dans le cache de l'utilisateur.
 
     Args:
         request (HttpRequest): L'objet requête HTTP
 
     Returns:
-        HttpResponse: Rendu de la page contenant tous les posts de l'utilisateur
-    """
-    # Récupérer les tickets de l'utilisateur
-    user_tickets = Ticket.objects.filter(user=request.user)
-    # Pour chaque ticket, ajouter un attribut content_type
-    for ticket in user_tickets:
-        ticket.content_type = 'TICKET'
-
-    # Récupérer les critiques de l'utilisateur
-    user_reviews = Review.objects.filter(user=request.user)
-    # Pour chaque critique, ajouter un attribut content_type
-    for review in user_reviews:
-        review.content_type = 'REVIEW'
-
-    # Combiner les deux querysets
-    posts = sorted(
-        chain(user_tickets, user_reviews),
-        key=attrgetter('time_created'),
-        reverse=True
+        HttpResponse: Rendu de la page contenant les posts de l'utilisateur
+    """
+    cursor = decode_cursor(request.GET.get('cursor'))
+    keys = feed_cache.get_or_compute(
+        request.user.id, 'posts', encode_cursor(*cursor) if cursor else '',
+        lambda: feed_keys(*posts_querysets(request.user), cursor)
     )
+    posts, next_cursor = load_page(keys)
+    cards.attach(posts, request.user, 'posts')
 
     return render(request, 'litrevu/posts.html', {
         'posts': posts,
+        'next_cursor': next_cursor,
         'MAX_RATING': MAX_RATING
     })
 
 
+@read_only
+@login_required
+def search(request):
+    """
+    Recherche plein texte dans les titres et descriptions des tickets et dans
+    les titres et textes des critiques.
+
+    Les résultats sont classés par pertinence par l'index FTS5 (voir litrevu/search.py)
+    et paginés par le paramètre GET 'page', ramené entre 1 et SEARCH_MAX_PAGE.
+
+    Args:
+        request (HttpRequest): L'objet requête HTTP ; le paramètre GET 'q' contient la recherche
+
+    Returns:
+        HttpResponse: Rendu de la page de résultats
+    """
+    query = request.GET.get('q', '').strip()
+    try:
+        page = min(max(int(request.GET.get('page', 1)), 1), SEARCH_MAX_PAGE)
+    except ValueError:
+        page = 1
+    results, has_next = full_text.search(query, page)
+
+    return render(request, 'litrevu/search.html', {
+        'query': query,
+        'results': results,
+        'page': page,
+        'has_next': has_next,
+    })
+
+
 @login_required
 def update_ticket(request, ticket_id):
     """
@@ -266,7 +393,14 @@ def update_ticket(request, ticket_id):
     if request.method == 'POST':
         form = TicketForm(request.POST, request.FILES, instance=ticket)
         if form.is_valid():
-            form.save()
+            image_changed = 'image' in form.changed_data
+            with transaction.atomic():
+                if image_changed:
+                    # L'original est affiché jusqu'au traitement de la nouvelle image
+                    ticket.image_variants_ready = False
+                form.save()
+                if image_changed:
+                    image_jobs.enqueue(ticket)
             messages.success(request, SUCCESS_MESSAGES['TICKET_UPDATED'])
             return redirect('posts')
     else:
@@ -366,6 +500,43 @@ def delete_review(request, review_id):
     return render(request, 'litrevu/delete_review.html', {'review': review})
 
 
+def follow_username(user, username):
+    """
+    Abonne un utilisateur à un autre, désigné par son nom, depuis le formulaire d'abonnement.
+
+    Args:
+        user (User): L'utilisateur qui s'abonne
+        username (str): Nom de l'utilisateur à suivre
+
+    Returns:
+        tuple: (error_message, success_message), l'un des deux ou les deux à None
+    """
+    if not username:
+        return None, None
+    # Vérifier si l'utilisateur cherche à se suivre lui-même
+    if username == user.username:
+        return ERROR_MESSAGES['CANNOT_FOLLOW_SELF'], None
+    try:
+        user_to_follow = User.objects.get(username=username)
+    except User.DoesNotExist:
+        return ERROR_MESSAGES['USER_NOT_FOUND'].format(username=username), None
+
+    # Vérifier si l'utilisateur suit déjà cet utilisateur
+    if UserFollows.objects.filter(user=user, followed_user=user_to_follow).exists():
+        return ERROR_MESSAGES['ALREADY_FOLLOWING'].format(username=username), None
+
+    def insert_follow():
+        # Créer la relation de suivi
+        UserFollows.objects.create(user=user, followed_user=user_to_follow)
+
+    try:
+        group_commit.run(insert_follow)
+    except group_commit.WriteTimeout as error:
+        return _write_timeout_message(error), None
+    return None, SUCCESS_MESSAGES['NOW_FOLLOWING'].format(username=username)
+
+
+@read_only
 @login_required
 def subscriptions(request):
     """
@@ -376,6 +547,11 @@ def subscriptions(request):
     2. Voir les utilisateurs qui le suivent
     3. Rechercher et suivre de nouveaux utilisateurs
 
+    Les deux listes sont paginées par curseur, indépendamment l'une de l'autre
+    (paramètres GET 'following' et 'followers'), et chargées avec les noms
+    d'utilisateur en une requête chacune. Les totaux proviennent des compteurs
+    FollowCounts (voir litrevu/follows.py).
+
     Args:
         request (HttpRequest): L'objet requête HTTP
 
@@ -383,44 +559,29 @@ def subscriptions(request):
         HttpResponse: Rendu de la page des abonnements avec les listes
                      d'abonnés et d'abonnements
     """
-    # Obtenir les utilisateurs suivis par l'utilisateur connecté
-    followed_users = UserFollows.objects.filter(user=request.user)
-
-    # Obtenir les utilisateurs qui suivent l'utilisateur connecté
-    followers = UserFollows.objects.filter(followed_user=request.user)
-
     error_message = None
     success_message = None
 
     # Traitement du formulaire de recherche d'utilisateur
     if request.method == 'POST':
-        username = request.POST.get('username')
+        error_message, success_message = follow_username(request.user, request.POST.get('username'))
 
-        if username:
-            # Vérifier si l'utilisateur cherche à se suivre lui-même
-            if username == request.user.username:
-                error_message = ERROR_MESSAGES['CANNOT_FOLLOW_SELF']
-            else:
-                try:
-                    user_to_follow = User.objects.get(username=username)
-
-                    # Vérifier si l'utilisateur suit déjà cet utilisateur
-                    if UserFollows.objects.filter(user=request.user, followed_user=user_to_follow).exists():
-                        error_message = ERROR_MESSAGES['ALREADY_FOLLOWING'].format(username=username)
-                    else:
-                        # Créer la relation de suivi
-                        UserFollows.objects.create(
-                            user=request.user,
-                            followed_user=user_to_follow
-                        )
-                        success_message = SUCCESS_MESSAGES['NOW_FOLLOWING'].format(username=username)
-
-                except User.DoesNotExist:
-                    error_message = ERROR_MESSAGES['USER_NOT_FOUND'].format(username=username)
+    # Obtenir une page des utilisateurs suivis par l'utilisateur connecté
+    following_cursor = follows.decode_cursor(request.GET.get('following'))
+    followed_users, next_following = follows.following_page(request.user, following_cursor)
+
+    # Obtenir une page des utilisateurs qui suivent l'utilisateur connecté
+    followers_cursor = follows.decode_cursor(request.GET.get('followers'))
+    followers, next_followers = follows.followers_page(request.user, followers_cursor)
 
     context = {
         'followed_users': followed_users,
         'followers': followers,
+        'following_cursor': following_cursor,
+        'followers_cursor': followers_cursor,
+        'next_following': next_following,
+        'next_followers': next_followers,
+        'counts': follows.counts_for(request.user),
         'error_message': error_message,
         'success_message': success_message
     }
@@ -428,6 +589,24 @@ def subscriptions(request):
     return render(request, 'litrevu/subscriptions.html', context)
 
 
+@read_only
+@login_required
+def autocomplete_users(request):
+    """
+    Propose les noms d'utilisateur commençant par la saisie, pour le formulaire d'abonnement.
+
+    L'utilisateur connecté et les utilisateurs qu'il suit déjà ne sont pas proposés.
+    La recherche est réalisée en une requête sur un index (voir litrevu/autocomplete.py).
+
+    Args:
+        request (HttpRequest): L'objet requête HTTP ; le paramètre GET 'q' contient le préfixe
+
+    Returns:
+        JsonResponse: {'results': [noms d'utilisateur]}
+    """
+    return JsonResponse({'results': autocomplete.suggest(request.user, request.GET.get('q', ''))})
+
+
 @login_required
 def unfollow_user(request, user_id):
     """
@@ -462,6 +641,34 @@ def unfollow_user(request, user_id):
     return redirect('subscriptions')
 
 
+def _flux_page(user, cursor):
+    """
+    Retourne une page du flux d'un utilisateur, commune au flux HTML et à l'API JSON.
+
+    Args:
+        user (User): Propriétaire du flux
+        cursor (tuple): Position décodée par decode_cursor, ou None pour la première page
+
+    Returns:
+        tuple: (posts, next_cursor), voir feed.load_page
+    """
+    def compute_keys():
+        if timeline.is_enabled():
+            # Lecture directe de la timeline matérialisée, par un seul parcours d'index
+            return timeline_keys(user, cursor)
+        # Fusion et tri des tickets et critiques visibles, réalisés par la base
+        return feed_keys(*flux_querysets(user), cursor)
+
+    # 1. Récupérer l'ordre des posts de la page depuis le cache, ou le calculer
+    keys = feed_cache.get_or_compute(
+        user.id, 'flux', encode_cursor(*cursor) if cursor else '', compute_keys
+    )
+
+    # 2. Charger les posts de la page avec, pour chaque ticket, l'indicateur has_review_from_user
+    return load_page(keys, viewer=user)
+
+
+@read_only
 @login_required
 def flux(request):
     """
@@ -472,49 +679,223 @@ def flux(request):
     2. Les propres tickets et critiques de l'utilisateur
     3. Les critiques en réponse aux tickets de l'utilisateur
 
-    Pour chaque ticket, la vue vérifie si l'utilisateur y a déjà répondu
-    avec une critique pour adapter l'affichage en conséquence.
+    Les posts sont fusionnés et triés par la base de données puis paginés
+    par curseur sur (time_created, id) : le paramètre GET 'cursor' permet
+    de charger la page suivante ("Charger plus"). Si FEED_USE_TIMELINE est
+    activé, les posts sont lus depuis la timeline matérialisée (FeedEntry).
+    L'ordre des posts de chaque page est conservé dans le cache de l'utilisateur,
+    invalidé par les signaux de litrevu/signals.py.
+
+    Pour chaque ticket, la vue indique si l'utilisateur y a déjà répondu
+    avec une critique pour adapter l'affichage en conséquence. Les relations
+    et cet indicateur sont chargés en un nombre fixe de requêtes.
 
     Args:
         request (HttpRequest): L'objet requête HTTP
 
     Returns:
-        HttpResponse: Rendu de la page de flux avec tous les posts pertinents
-    """
-    # 1. Obtenir les utilisateurs suivis par l'utilisateur connecté
-    followed_users = UserFollows.objects.filter(user=request.user).values_list('followed_user', flat=True)
-
-    # 2. Récupérer les tickets des utilisateurs suivis + tickets de l'utilisateur connecté
-    tickets = Ticket.objects.filter(
-        Q(user__in=followed_users) | Q(user=request.user)
-    ).annotate(content_type=Value('TICKET', CharField()))
-
-    # 3. Récupérer les critiques qui:
-    #    - Sont des utilisateurs suivis
-    #    - Ou sont de l'utilisateur connecté
-    #    - Ou répondent à un ticket de l'utilisateur connecté
-    reviews = Review.objects.filter(
-        Q(user__in=followed_users) |
-        Q(user=request.user) |
-        Q(ticket__user=request.user)
-    ).annotate(content_type=Value('REVIEW', CharField()))
-
-    # 4. Combiner et trier les posts par date de création (les plus récents d'abord)
-    posts = sorted(
-        chain(reviews, tickets),
-        key=lambda post: post.time_created,
-        reverse=True
-    )
-
-    # 5. Pour chaque ticket, déterminer si une critique a déjà été postée par l'utilisateur connecté
-    for post in posts:
-        if hasattr(post, 'content_type') and post.content_type == 'TICKET':
-            post.has_review_from_user = Review.objects.filter(
-                ticket=post,
-                user=request.user
-            ).exists()
+        HttpResponse: Rendu d'une page du flux avec les posts pertinents
+    """
+    posts, next_cursor = _flux_page(request.user, decode_cursor(request.GET.get('cursor')))
+    cards.attach(posts, request.user, 'flux')
 
     return render(request, 'litrevu/flux.html', {
         'posts': posts,
+        'next_cursor': next_cursor,
+        'live_events': live.is_available(request),
         'MAX_RATING': MAX_RATING
     })
+
+
+@read_only
+@login_required
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=lambda request: api.feed_etag(request.user, request.GET.get('cursor')))
+def api_flux(request):
+    """
+    Expose le flux de l'utilisateur connecté en JSON, pour les clients qui l'interrogent périodiquement.
+
+    Le contenu est celui de la vue flux, paginé de la même façon par le paramètre
+    GET 'cursor'. La réponse porte un ETag calculé sans requête sur les posts
+    (voir litrevu/api.py) : une requête If-None-Match dont l'ETag est inchangé
+    reçoit 304 Not Modified sans que le flux soit chargé.
+
+    Args:
+        request (HttpRequest): L'objet requête HTTP
+
+    Returns:
+        JsonResponse: {'results': [posts], 'next_cursor': str ou None}
+    """
+    posts, next_cursor = _flux_page(request.user, decode_cursor(request.GET.get('cursor')))
+    return JsonResponse({'results': api.serialize_posts(posts), 'next_cursor': next_cursor})
+
+
+@login_required
+async def live_events(request):
+    """
+    Annonce en direct (Server-Sent Events) les nouveaux posts du flux de l'utilisateur connecté.
+
+    Chaque nouveau ticket ou critique visible dans le flux est envoyé dès la
+    validation de sa transaction (voir litrevu/signals.py et litrevu/live.py).
+    La vue est asynchrone : une connexion inactive n'occupe aucun thread, mais
+    elle doit être servie par un serveur ASGI (webapp/asgi.py).
+
+    Args:
+        request (HttpRequest): L'objet requête HTTP
+
+    Returns:
+        StreamingHttpResponse: Flux text/event-stream ; 501 hors ASGI, 503 si le
+            nombre maximum de connexions du processus est atteint
+
+    Raises:
+        Http404: Si LIVE_EVENTS est désactivé
+    """
+    if not live.is_enabled():
+        raise Http404("Les événements en direct sont désactivés.")
+    if not isinstance(request, ASGIRequest):
+        # Sous WSGI, la réponse occuperait un thread pour toute la durée de la connexion
+        return HttpResponse("Les événements en direct nécessitent un serveur ASGI.", status=501)
+    broker = live.get_broker()
+    if broker.connections >= broker.max_connections:
+        response = HttpResponse("Trop de connexions en direct.", status=503)
+        response['Retry-After'] = str(LIVE_KEEPALIVE_INTERVAL)
+        return response
+    user = await request.auser()
+
+    async def stream():
+        try:
+            async with broker.subscribe(user.id) as subscription:
+                # Délai de reconnexion conseillé au navigateur, en millisecondes
+                yield f'retry: {LIVE_KEEPALIVE_INTERVAL * 1000}\n\n'
+                while True:
+                    event = await subscription.get(timeout=LIVE_KEEPALIVE_INTERVAL)
+                    # Un commentaire périodique maintient la connexion à travers les proxys
+                    yield live.format_event(event) if event else ': keepalive\n\n'
+        except live.TooManyConnections:
+            yield live.format_event({'type': 'ERROR', 'detail': 'too_many_connections'})
+
+    response = StreamingHttpResponse(stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+@login_required
+def export_posts(request):
+    """
+    Exporte en flux les tickets, critiques et abonnements de l'utilisateur connecté.
+
+    Le fichier est produit au fil de l'eau (StreamingHttpResponse) à partir de
+    requêtes lues par blocs : la mémoire utilisée ne dépend pas de la taille
+    de l'historique.
+
+    Args:
+        request (HttpRequest): L'objet requête HTTP ; le paramètre GET 'format'
+            vaut 'ndjson' (par défaut) ou 'csv'
+
+    Returns:
+        StreamingHttpResponse: Le fichier d'export en pièce jointe
+
+    Raises:
+        Http404: Si le format demandé n'est pas pris en charge
+    """
+    export_format = request.GET.get('format', 'ndjson')
+    if export_format not in export.FORMATS:
+        raise Http404("Format d'export inconnu")
+    serializer, content_type, extension = export.FORMATS[export_format]
+
+    response = StreamingHttpResponse(
+        serializer(export.export_records(request.user)),
+        content_type=f'{content_type}; charset=utf-8'
+    )
+    response['Content-Disposition'] = f'attachment; filename="litrevu-{request.user.username}.{extension}"'
+    return response
+
+
+@staff_member_required
+def feed_cache_stats(request):
+    """
+    Expose les compteurs de succès et d'échecs du cache des flux.
+
+    Réservé aux membres du staff.
+
+    Args:
+        request (HttpRequest): L'objet requête HTTP
+
+    Returns:
+        JsonResponse: Les compteurs hits, misses et hit_ratio
+    """
+    return JsonResponse(feed_cache.stats())
+
+
+@staff_member_required
+def autocomplete_stats(request):
+    """
+    Expose les compteurs de succès et d'échecs du cache de l'autocomplétion.
+
+    Réservé aux membres du staff.
+
+    Args:
+        request (HttpRequest): L'objet requête HTTP
+
+    Returns:
+        JsonResponse: Les compteurs hits, misses et hit_ratio
+    """
+    return JsonResponse(autocomplete.stats())
+
+
+@staff_member_required
+def login_throttle_stats(request):
+    """
+    Expose les compteurs de tentatives de connexion refusées.
+
+    Réservé aux membres du staff.
+
+    Args:
+        request (HttpRequest): L'objet requête HTTP
+
+    Returns:
+        JsonResponse: Les compteurs rejected_ip et rejected_username
+    """
+    return JsonResponse(login_throttle.stats())
+
+
+@staff_member_required
+def metrics(request):
+    """
+    Expose les histogrammes de ServerTimingMiddleware au format texte de Prometheus.
+
+    Réservé aux membres du staff. Les valeurs sont propres au processus qui répond.
+
+    Args:
+        request (HttpRequest): L'objet requête HTTP
+
+    Returns:
+        HttpResponse: Les histogrammes par nom d'URL
+    """
+    return HttpResponse(registry.prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+@require_safe
+def serve_media(request, path):
+    """
+    Sert les fichiers envoyés (images de couverture et leurs déclinaisons).
+
+    Les images adressées par contenu sont mises en cache un an par les navigateurs
+    et les CDN. Les requêtes conditionnelles et Range sont traitées à partir de
+    os.stat(), sans lire le fichier ni interroger la base (voir litrevu/media.py).
+
+    Args:
+        request (HttpRequest): L'objet requête HTTP
+        path (str): Chemin du fichier dans MEDIA_ROOT
+
+    Returns:
+        HttpResponse: Le fichier, un intervalle du fichier ou 304 Not Modified
+
+    Raises:
+        Http404: Si le fichier n'existe pas
+    """
+    response = media.serve(request, path)
+    if response is None:
+        raise Http404
+    return response
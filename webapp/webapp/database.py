@@ -0,0 +1,97 @@
+"""
+Profils de configuration de la base SQLite, utilisés par settings.py.
+
+- development : la configuration par défaut de Django, une connexion par requête ;
+- production : journal WAL, pragmas réglés à chaque nouvelle connexion, transactions
+  IMMEDIATE, connexions persistantes et alias en lecture seule (REPLICA_ALIAS) vers
+  lequel litrevu.routers.ReadReplicaRouter envoie les lectures des vues en lecture seule.
+"""
+from pathlib import Path
+
+PROFILES = ('development', 'production')
+
+# Alias de la connexion en lecture seule du profil de production
+REPLICA_ALIAS = 'replica'
+
+# Pragmas communs aux connexions du profil de production
+SHARED_PRAGMAS = {
+    # Attente (ms) d'un verrou tenu par une autre connexion avant l'erreur "database is locked"
+    'busy_timeout': 5000,
+    # Fichier projeté en mémoire (octets) : les lectures évitent une copie par read()
+    'mmap_size': 256 * 1024 * 1024,
+    # Cache de pages par connexion, en Kio lorsque la valeur est négative
+    'cache_size': -64 * 1024,
+    'temp_store': 'MEMORY',
+}
+
+# Pragmas de la connexion en écriture
+WRITE_PRAGMAS = {
+    # Les lecteurs ne bloquent plus l'écrivain, ni l'écrivain les lecteurs
+    'journal_mode': 'WAL',
+    # Sans fsync à chaque transaction en WAL : une coupure peut perdre les dernières
+    # transactions validées, sans corrompre la base
+    'synchronous': 'NORMAL',
+}
+
+# Pragmas de la connexion en lecture seule
+READ_PRAGMAS = {
+    'query_only': 1,
+}
+
+
+def init_command(pragmas):
+    """
+    Construit l'option init_command exécutée par Django à chaque nouvelle connexion.
+
+    Args:
+        pragmas (dict): Valeur de chaque pragma
+
+    Returns:
+        str: Instructions PRAGMA séparées par des points-virgules
+    """
+    return ';'.join(f'PRAGMA {name}={value}' for name, value in pragmas.items())
+
+
+def sqlite_databases(path, profile='development', conn_max_age=600):
+    """
+    Retourne le réglage DATABASES d'une base SQLite selon un profil.
+
+    Args:
+        path (Path): Chemin du fichier de la base
+        profile (str): 'development' ou 'production'
+        conn_max_age (int): Durée de vie (en secondes) des connexions persistantes
+            du profil de production ; None les garde indéfiniment
+
+    Returns:
+        dict: Le réglage DATABASES
+
+    Raises:
+        ValueError: Si le profil est inconnu
+    """
+    if profile not in PROFILES:
+        raise ValueError(f"Profil de base de données inconnu : {profile} (attendu : {', '.join(PROFILES)})")
+    if profile == 'development':
+        return {'default': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': path}}
+
+    persistent = {'CONN_MAX_AGE': conn_max_age, 'CONN_HEALTH_CHECKS': True}
+    return {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': path,
+            'OPTIONS': {
+                'init_command': init_command({**WRITE_PRAGMAS, **SHARED_PRAGMAS}),
+                # Le verrou d'écriture est pris dès BEGIN : une transaction qui lit puis
+                # écrit attend son tour (busy_timeout) au lieu d'échouer immédiatement
+                'transaction_mode': 'IMMEDIATE',
+            },
+            **persistent,
+        },
+        REPLICA_ALIAS: {
+            'ENGINE': 'django.db.backends.sqlite3',
+            # Même fichier, ouvert en lecture seule : aucune requête ne peut y prendre un verrou d'écriture
+            'NAME': f'{Path(path).resolve().as_uri()}?mode=ro',
+            'OPTIONS': {'init_command': init_command({**READ_PRAGMAS, **SHARED_PRAGMAS})},
+            'TEST': {'MIRROR': 'default'},
+            **persistent,
+        },
+    }
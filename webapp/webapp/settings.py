@@ -13,6 +13,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 from pathlib import Path
 import os
 from dotenv import load_dotenv
+from .database import REPLICA_ALIAS, sqlite_databases
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -44,6 +45,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'litrevu.middleware.ServerTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -53,11 +55,15 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
-ROOT_URLCONF = 'webapp.urls'
+# Vues flux, posts et subscriptions asynchrones (ORM asynchrone), à activer sous ASGI
+ASYNC_VIEWS = os.getenv('ASYNC_VIEWS', 'False').lower() == 'true'
+
+ROOT_URLCONF = 'webapp.urls_async' if ASYNC_VIEWS else 'webapp.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates dont le temps de rendu est mesuré par ServerTimingMiddleware
+        'BACKEND': 'litrevu.instrumentation.InstrumentedDjangoTemplates',
         'DIRS': [],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -77,10 +83,32 @@ WSGI_APPLICATION = 'webapp.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-DATABASES = {
+# Profil 'production' : journal WAL, pragmas réglés, connexions persistantes pendant
+# DB_CONN_MAX_AGE secondes et lectures des vues en lecture seule sur un alias 'replica'
+# (voir webapp/database.py). Sous ASGI, garder DB_CONN_MAX_AGE=0.
+DATABASE_PROFILE = os.getenv('DATABASE_PROFILE', 'development')
+
+DATABASES = sqlite_databases(
+    BASE_DIR / 'db.sqlite3', DATABASE_PROFILE, conn_max_age=int(os.getenv('DB_CONN_MAX_AGE', '600'))
+)
+
+DATABASE_ROUTERS = ['litrevu.routers.ReadReplicaRouter'] if REPLICA_ALIAS in DATABASES else []
+
+# Insertions des tickets, critiques et abonnements regroupées par un thread d'écriture
+# unique, en une transaction par lot (voir litrevu/group_commit.py). Un thread d'écriture
+# par processus : le regroupement profite surtout aux serveurs à plusieurs threads.
+GROUP_COMMIT = os.getenv('GROUP_COMMIT', 'False').lower() == 'true'
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Mémoire locale par défaut ; pour un cache fichier partagé entre processus :
+# CACHE_BACKEND='django.core.cache.backends.filebased.FileBasedCache' et CACHE_LOCATION='/chemin/du/cache'
+
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', 'litrevu'),
     }
 }
 
@@ -132,4 +160,38 @@ LOGIN_REDIRECT_URL = 'flux'  # Page où rediriger après une connexion réussie
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
-MESSAGE_STORAGE = 'django.contrib.messages.storage.session.SessionStorage'
+# Envoi des fichiers de MEDIA_ROOT délégué au serveur frontal : 'x-sendfile' (Apache,
+# lighttpd) ou 'x-accel-redirect' (nginx, emplacement interne MEDIA_ACCEL_REDIRECT_PREFIX).
+# Vide : les fichiers sont envoyés par Django.
+MEDIA_SENDFILE = os.getenv('MEDIA_SENDFILE') or None
+MEDIA_ACCEL_REDIRECT_PREFIX = os.getenv('MEDIA_ACCEL_REDIRECT_PREFIX', '/protected-media/')
+
+# Sessions servies depuis un cache local au processus placé devant la base, et messages
+# stockés dans un cookie signé tant qu'ils sont courts (voir litrevu/sessions.py)
+SESSION_LOCAL_CACHE = os.getenv('SESSION_LOCAL_CACHE', 'False').lower() == 'true'
+SESSION_ENGINE = 'litrevu.sessions' if SESSION_LOCAL_CACHE else 'django.contrib.sessions.backends.db'
+
+MESSAGE_STORAGE = (
+    'django.contrib.messages.storage.fallback.FallbackStorage' if SESSION_LOCAL_CACHE
+    else 'django.contrib.messages.storage.session.SessionStorage'
+)
+
+# Limitation des tentatives de connexion par adresse IP et par nom d'utilisateur, avant
+# tout calcul de hachage (voir litrevu/login_throttle.py)
+LOGIN_THROTTLE = os.getenv('LOGIN_THROTTLE', 'True').lower() == 'true'
+# Clé de request.META contenant l'adresse du client : 'HTTP_X_FORWARDED_FOR' derrière un proxy qui l'ajoute
+LOGIN_THROTTLE_IP_HEADER = os.getenv('LOGIN_THROTTLE_IP_HEADER', 'REMOTE_ADDR')
+
+# Lecture du flux depuis la timeline matérialisée (FeedEntry) plutôt que par
+# jointure sur UserFollows. Lancer `python manage.py rebuild_timeline` avant d'activer.
+FEED_USE_TIMELINE = os.getenv('FEED_USE_TIMELINE', 'False').lower() == 'true'
+
+# Mesure de chaque requête (en-tête Server-Timing et histogrammes exposés sur /stats/metrics/)
+SERVER_TIMING = os.getenv('SERVER_TIMING', 'True').lower() == 'true'
+
+# Annonce en direct des nouveaux posts du flux (/live/), disponible uniquement sous ASGI
+LIVE_EVENTS = os.getenv('LIVE_EVENTS', 'True').lower() == 'true'
+
+# Diffusion des événements en direct (/live/) : classe exposant publish() et subscribe().
+# LocalBroker ne relie que les connexions d'un même processus.
+LIVE_EVENTS_BACKEND = os.getenv('LIVE_EVENTS_BACKEND', 'litrevu.live.LocalBroker')
@@ -18,7 +18,6 @@ from django.contrib import admin
 from django.urls import path
 from litrevu import views
 from django.conf import settings
-from django.conf.urls.static import static
 
 
 urlpatterns = [
@@ -36,10 +35,21 @@ urlpatterns = [
     path('update-review/<int:review_id>/', views.update_review, name='update_review'),
     path('delete-review/<int:review_id>/', views.delete_review, name='delete_review'),
     path('subscriptions/', views.subscriptions, name='subscriptions'),
+    path('subscriptions/autocomplete/', views.autocomplete_users, name='autocomplete_users'),
     path('unfollow-user/<int:user_id>/', views.unfollow_user, name='unfollow_user'),
     path('create-review/<int:ticket_id>/', views.create_review, name='create_review_for_ticket'),
+    path('search/', views.search, name='search'),
+    path('api/flux/', views.api_flux, name='api_flux'),
+    path('live/', views.live_events, name='live_events'),
+    path('export/', views.export_posts, name='export_posts'),
+    path('stats/feed-cache/', views.feed_cache_stats, name='feed_cache_stats'),
+    path('stats/autocomplete/', views.autocomplete_stats, name='autocomplete_stats'),
+    path('stats/login-throttle/', views.login_throttle_stats, name='login_throttle_stats'),
+    path('stats/metrics/', views.metrics, name='metrics'),
 
 ]
 
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+# Les fichiers envoyés sont servis par Django, en production aussi (voir litrevu/media.py),
+# sauf si MEDIA_URL désigne un autre serveur
+if settings.MEDIA_URL.startswith('/'):
+    urlpatterns.append(path(f"{settings.MEDIA_URL.lstrip('/')}<path:path>", views.serve_media, name='media'))
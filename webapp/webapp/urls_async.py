@@ -0,0 +1,21 @@
+"""
+Configuration d'URL utilisée lorsque ASYNC_VIEWS est activé.
+
+Identique à webapp/urls.py, sauf pour les vues flux, posts et subscriptions,
+remplacées par leurs versions asynchrones (litrevu/async_views.py).
+"""
+from django.urls import path
+from litrevu import async_views
+from .urls import urlpatterns as sync_urlpatterns
+
+ASYNC_VIEWS = {
+    'flux': async_views.flux,
+    'posts': async_views.posts,
+    'subscriptions': async_views.subscriptions,
+}
+
+urlpatterns = [
+    path(str(pattern.pattern), ASYNC_VIEWS[pattern.name], name=pattern.name)
+    if getattr(pattern, 'name', None) in ASYNC_VIEWS else pattern
+    for pattern in sync_urlpatterns
+]